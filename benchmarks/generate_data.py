@@ -0,0 +1,154 @@
+"""
+Benchmark için sentetik veri üretir.
+
+2XO5DS XML feed'i (3 sayfa) ve FaprikaOrderXls sipariş Excel'i canlı kaynaklarla
+aynı biçimde üretilir: bedenler "S : 31 // M : 53 // L : 14" ve "Beden: M" gibi
+gerçek string formatında yazılır. Aynı tohum (seed) her zaman aynı veriyi verir.
+
+Kullanım:
+    python benchmarks/generate_data.py --sizes 1000,10000
+"""
+import argparse
+import os
+import random
+from xml.sax.saxutils import escape
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+FEED_PAGES = 3  # Canlı feed 3 sayfa (XML_FEED_URLS)
+EXCEL_MAX_ROWS = 1_048_575  # Başlık satırı hariç Excel sınırı
+
+LETTER_SIZES = ["S", "M", "L", "XL"]
+NUMERIC_SIZES = ["36", "38", "40", "42", "44", "46"]
+CATEGORIES = ["Elbise", "Pantolon", "Gömlek", "Etek", "Ceket", "Tişört", "Bluz"]
+SEASONS = ["Yaz", "Kış", "İlkbahar-Yaz", "Sonbahar-Kış", "Dört Mevsim"]
+
+
+def generate_product(rng: random.Random, index: int) -> dict:
+    """Tek bir ürünü canlı feed'deki alanlarla üretir."""
+    sizes = LETTER_SIZES if rng.random() < 0.5 else NUMERIC_SIZES
+    # Bazı ürünlerde sadece 1-2 beden satışta olur (filter_products eler)
+    active_sizes = sizes if rng.random() < 0.85 else sizes[:rng.randint(1, 2)]
+
+    base_stock = rng.randint(0, 40)
+    # Ürünlerin bir kısmında küçük beden şişkin (SismeOrani >= 40)
+    inflation = rng.choice([1.0, 1.0, 1.0, 2.0, 3.5])
+    stocks = {}
+    for size in active_sizes:
+        stock = max(0, int(rng.gauss(base_stock, 6)))
+        if size in ("S", "36"):
+            stock = int(stock * inflation) + rng.randint(0, 5)
+        stocks[size] = stock
+
+    price = rng.randint(150, 1500) + rng.choice([0.0, 0.5, 0.9, 0.99])
+    category = rng.choice(CATEGORIES)
+    return {
+        'IdUrun': str(100000 + index),
+        'UrunAdi': f"{category} Model {index}",
+        'StokKodu': f"HG.{index // 100:05d}.{index % 100:02d}",
+        'SatistakiStokAdedi': str(sum(stocks.values())),
+        'SatistaOlduguGunlerVeBedenlerinSatistakiStokAdetleri': " // ".join(
+            f"{size} : {stock}" for size, stock in stocks.items()
+        ),
+        'Kategori': category,
+        'Mevsim': rng.choice(SEASONS),
+        'UrununAktifBedenOrani': str(rng.randint(20, 100)),
+        'GuncelSatisFiyati': f"{price:.2f}".replace(".", ","),
+        '_sizes': list(stocks),
+    }
+
+
+def write_feed_page(path: str, products) -> None:
+    """Ürünleri 2XO5DS feed'i biçiminde XML olarak yazar (akış halinde, bellekte tutmadan)."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<Products>\n')
+        for product in products:
+            f.write("  <Product>\n")
+            for field, value in product.items():
+                if field.startswith("_"):
+                    continue
+                f.write(f"    <{field}>{escape(value)}</{field}>\n")
+            f.write("  </Product>\n")
+        f.write("</Products>\n")
+
+
+def write_order_workbook(path: str, order_rows) -> int:
+    """Sipariş satırlarını FaprikaOrderXls biçiminde yazar; yazılan satır sayısını döner."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Siparisler")
+    sheet.append(["SiparisNo", "SiparisTarihi", "UrunAdi", "StokKodu", "Varyant", "Adet", "BirimFiyat"])
+    written = 0
+    for row in order_rows:
+        if written >= EXCEL_MAX_ROWS:
+            break
+        sheet.append(row)
+        written += 1
+    workbook.save(path)
+    return written
+
+
+def generate_orders(rng: random.Random, products):
+    """Her ürünün bedenleri için 0-3 sipariş satırı üretir (StokKodu beden ekiyle)."""
+    order_no = 500000
+    for product in products:
+        for size in product['_sizes']:
+            if rng.random() < 0.5:
+                continue
+            for _ in range(rng.randint(1, 3)):
+                order_no += 1
+                yield [
+                    order_no,
+                    f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                    product['UrunAdi'],
+                    f"{product['StokKodu']}.{size}",
+                    f"Beden: {size}",
+                    # Canlı dosyada Adet bazen "2,0" gibi string gelir
+                    rng.choice([rng.randint(1, 20), f"{rng.randint(1, 20)},0"]),
+                    product['GuncelSatisFiyati'],
+                ]
+
+
+def generate(size: int, seed: int = 42, data_dir: str = DATA_DIR) -> str:
+    """
+    Verilen ürün sayısı için feed sayfalarını ve sipariş Excel'ini üretir.
+    Dosyalar zaten varsa tekrar üretilmez. Veri dizinini döner.
+    """
+    target_dir = os.path.join(data_dir, str(size))
+    outputs = [f"xml_{page}.xml" for page in range(1, FEED_PAGES + 1)] + ["orders.xlsx"]
+    if all(os.path.exists(os.path.join(target_dir, name)) for name in outputs):
+        return target_dir
+
+    os.makedirs(target_dir, exist_ok=True)
+    rng = random.Random(f"{seed}-{size}")
+    products = [generate_product(rng, index) for index in range(size)]
+
+    page_size = -(-size // FEED_PAGES)
+    for page in range(FEED_PAGES):
+        write_feed_page(
+            os.path.join(target_dir, f"xml_{page + 1}.xml"),
+            products[page * page_size:(page + 1) * page_size],
+        )
+
+    written = write_order_workbook(os.path.join(target_dir, "orders.xlsx"), generate_orders(rng, products))
+    if written >= EXCEL_MAX_ROWS:
+        print(f"⚠️ {size} ürün: sipariş satırları Excel sınırında ({EXCEL_MAX_ROWS}) kesildi.")
+
+    print(f"✅ {size} ürün, {written} sipariş satırı üretildi: {target_dir}")
+    return target_dir
+
+
+def parse_sizes(text: str):
+    return [int(part.replace("_", "")) for part in text.split(",") if part.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark için sentetik feed ve sipariş verisi üretir.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Virgülle ayrılmış ürün sayıları")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for size in parse_sizes(args.sizes):
+        generate(size, seed=args.seed)
@@ -0,0 +1,539 @@
+"""
+Yerel sahte admin paneli.
+
+Selenium ve HTTP adımlarının kullandığı sayfaları canlı panelle aynı seçicilerle
+servis eder: giriş formu, /admin/product/edit/{id} (Kendo benzeri kombinasyon
+tablosu, etiket ve kategori sekmeleri; kategori eşlemesi eklenip silinebilir), editattributecombinationpopup/{id}
+(OverriddenPrice), toplu düzenleme sayfası ve NE6ZAB feed'i. Gecikme ve hata
+enjekte edilebilir; her yazma işlemi kaydedilir (/mock/writes, --writes dosyası).
+
+Kullanım:
+    python benchmarks/mock_admin.py --port 8765 --products 500 --latency-ms 150 --failure-rate 0.02
+    ADMIN_BASE_URL=http://127.0.0.1:8765 HAYDIGIY_USER=x HAYDIGIY_PASS=y python run_automation.py
+
+Ürün ID'leri generate_data.py ile aynı (100000 + sıra) olduğundan sentetik
+veriyle birlikte kullanılabilir.
+"""
+import argparse
+import html
+import json
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DISCOUNT_TAG_ID = "241"
+DISCOUNT_CATEGORY_ID = "632"
+LETTER_SIZES = ["S", "M", "L", "XL"]
+NUMERIC_SIZES = ["36", "38", "40", "42", "44", "46"]
+SESSION_COOKIE = "MockAdminAuth"
+
+# Sayfaların kullandığı jQuery / select2 / Kendo çağrılarının en küçük karşılığı
+JQUERY_SHIM = """
+(function () {
+  function Wrapped(elements) { this.elements = elements; this.length = elements.length; }
+  Wrapped.prototype.val = function (value) {
+    if (arguments.length === 0) {
+      var el = this.elements[0];
+      if (!el) return undefined;
+      if (el.multiple) {
+        return Array.prototype.filter.call(el.options, function (o) { return o.selected; })
+          .map(function (o) { return o.value; });
+      }
+      return el.value;
+    }
+    this.elements.forEach(function (el) {
+      if (el.multiple) {
+        var values = [].concat(value).map(String);
+        Array.prototype.forEach.call(el.options, function (o) { o.selected = values.indexOf(o.value) !== -1; });
+      } else {
+        el.value = value;
+      }
+    });
+    return this;
+  };
+  Wrapped.prototype.trigger = function (name) {
+    this.elements.forEach(function (el) { el.dispatchEvent(new Event(name, {bubbles: true})); });
+    return this;
+  };
+  Wrapped.prototype.data = function (key) {
+    var el = this.elements[0];
+    return el && el.__data ? el.__data[key] : undefined;
+  };
+  Wrapped.prototype.one = function (name, handler) {
+    this.elements.forEach(function (el) { el.addEventListener(name, handler, {once: true}); });
+    return this;
+  };
+  function $(selector) {
+    if (typeof selector === 'string') {
+      return new Wrapped(Array.prototype.slice.call(document.querySelectorAll(selector)));
+    }
+    return new Wrapped([selector]);
+  }
+  $.active = 0;
+  $.post = function (url, data, done) {
+    $.active++;
+    var xhr = new XMLHttpRequest();
+    xhr.open('POST', url);
+    xhr.setRequestHeader('Content-Type', 'application/x-www-form-urlencoded');
+    xhr.onloadend = function () {
+      $.active--;
+      document.dispatchEvent(new Event('ajaxComplete'));
+      if (done) done(xhr);
+    };
+    xhr.send(new URLSearchParams(data).toString());
+  };
+  window.jQuery = window.$ = $;
+})();
+function showTab(name) {
+  document.querySelectorAll('.tab-content').forEach(function (el) {
+    el.style.display = el.id === name ? 'block' : 'none';
+  });
+}
+"""
+
+
+class MockState:
+    """Ürünler, kombinasyonlar, etiket/kategori atamaları ve kaydedilen yazmalar."""
+
+    def __init__(self, product_count, discounted_ratio=0.3, seed=42, writes_file=None):
+        rng = random.Random(seed)
+        self.products = {}
+        self.combinations = {}
+        self.writes = []
+        self.writes_file = writes_file
+        self.sessions = set()
+        self._lock = threading.Lock()
+
+        combination_id = 500000
+        for index in range(product_count):
+            product_id = str(100000 + index)
+            discounted = rng.random() < discounted_ratio
+            sizes = LETTER_SIZES if rng.random() < 0.5 else NUMERIC_SIZES
+            combination_ids = []
+            for size in sizes:
+                combination_id += 1
+                price = None
+                if discounted and size in ("S", "36"):
+                    price = rng.randint(100, 900) - 0.01
+                self.combinations[str(combination_id)] = {
+                    'product_id': product_id,
+                    'text': f"Beden: {size}",
+                    'price': price,
+                }
+                combination_ids.append(str(combination_id))
+
+            self.products[product_id] = {
+                'tags': {DISCOUNT_TAG_ID} if discounted else set(),
+                'categories': {DISCOUNT_CATEGORY_ID} if discounted else set(),
+                'combination_ids': combination_ids,
+            }
+
+    def record(self, kind, **fields):
+        entry = {'time': time.time(), 'kind': kind, **fields}
+        with self._lock:
+            self.writes.append(entry)
+            if self.writes_file:
+                with open(self.writes_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                product_id: {
+                    'tags': sorted(product['tags']),
+                    'categories': sorted(product['categories']),
+                    'combinations': [
+                        {'combination_id': cid, **self.combinations[cid]}
+                        for cid in product['combination_ids']
+                    ],
+                }
+                for product_id, product in self.products.items()
+            }
+
+
+def format_price(price):
+    """Kendo grid'in gösterdiği biçim: 149,9900 (fiyat yoksa boş)."""
+    return "" if price is None else f"{price:.4f}".replace(".", ",")
+
+
+def page(title, body, script=""):
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(title)}</title>
+<script src="/mock/jquery-shim.js"></script></head>
+<body>{body}<script>{script}</script></body></html>"""
+
+
+class MockAdminHandler(BaseHTTPRequestHandler):
+    state: MockState = None
+    latency = 0.0
+    jitter = 0.0
+    failure_rate = 0.0
+    write_failure_rate = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    # Yardımcılar
+
+    def send_html(self, body, status=200, headers=None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_body(self, body, content_type):
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def redirect(self, location, headers=None):
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def authenticated(self):
+        for part in self.headers.get("Cookie", "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == SESSION_COOKIE and value in self.state.sessions:
+                return True
+        return False
+
+    def form(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return parse_qs(self.rfile.read(length).decode("utf-8"), keep_blank_values=True)
+
+    def inject(self, write=False):
+        """Yapılandırılan gecikmeyi uygular; hata enjekte edildiyse 500 döner ve True verir."""
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        rate = self.write_failure_rate if write else self.failure_rate
+        if rate and random.random() < rate:
+            self.send_html(page("Hata", "<h1>500 - Sunucu hatası (enjekte)</h1>"), status=500)
+            return True
+        return False
+
+    # Yönlendirme
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        path = url.path.rstrip("/").lower() or "/"
+        query = parse_qs(url.query)
+
+        if path == "/mock/jquery-shim.js":
+            return self.send_body(JQUERY_SHIM, "application/javascript")
+        if path == "/mock/state":
+            return self.send_body(json.dumps(self.state.snapshot(), ensure_ascii=False), "application/json")
+        if path == "/mock/writes":
+            return self.send_body(json.dumps(self.state.writes, ensure_ascii=False), "application/json")
+        if path == "/robots.txt":
+            return self.send_body("User-agent: *\nDisallow: /admin\n", "text/plain")
+        if path == "/faprikaxml/ne6zab/1":
+            return self.send_body(self.render_discount_feed(), "application/xml")
+        if path == "/kullanici-giris":
+            return self.send_html(self.render_login(query.get("ReturnUrl", ["/admin"])[0]))
+
+        if not path.startswith("/admin"):
+            return self.send_html(page("Bulunamadı", "<h1>404</h1>"), status=404)
+        if not self.authenticated():
+            return self.redirect(f"/kullanici-giris/?ReturnUrl={url.path}")
+        if self.inject():
+            return
+
+        if path == "/admin":
+            return self.send_html(page("Yönetim", "<h1>Yönetim Paneli</h1>"))
+        if path.startswith("/admin/product/edit/"):
+            return self.render_product(path.rsplit("/", 1)[-1])
+        if path.startswith("/admin/product/editattributecombinationpopup/"):
+            return self.render_popup(path.rsplit("/", 1)[-1])
+        if path == "/admin/product/bulkedit":
+            return self.send_html(self.render_bulkedit(query))
+        return self.send_html(page("Bulunamadı", "<h1>404</h1>"), status=404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        path = url.path.rstrip("/").lower()
+        form = self.form()
+
+        if path == "/kullanici-giris":
+            if not form.get("EmailOrPhone", [""])[0] or not form.get("Password", [""])[0]:
+                return self.send_html(self.render_login("/admin", error=True))
+            token = secrets.token_hex(16)
+            self.state.sessions.add(token)
+            return_url = parse_qs(url.query).get("ReturnUrl", ["/admin"])[0]
+            return self.redirect(return_url, {"Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/; HttpOnly"})
+
+        if not self.authenticated():
+            return self.redirect("/kullanici-giris/?ReturnUrl=/admin")
+        if self.inject(write=True):
+            return
+
+        if path.startswith("/admin/product/edit/"):
+            return self.save_product(path.rsplit("/", 1)[-1], form)
+        if path.startswith("/admin/product/editattributecombinationpopup/"):
+            return self.save_popup(path.rsplit("/", 1)[-1], form)
+        if path == "/admin/product/productcategoryinsert":
+            return self.save_category(form)
+        if path == "/admin/product/productcategorydelete":
+            return self.delete_category(form)
+        if path == "/admin/product/bulkedit":
+            return self.save_bulkedit(form)
+        return self.send_html(page("Bulunamadı", "<h1>404</h1>"), status=404)
+
+    # Sayfalar
+
+    def render_login(self, return_url, error=False):
+        message = "<p class='error'>Giriş bilgileri hatalı</p>" if error else ""
+        return page("Giriş", f"""
+<form method="post" action="/kullanici-giris/?ReturnUrl={html.escape(return_url)}">
+  {message}
+  <input type="text" name="EmailOrPhone">
+  <input type="password" name="Password">
+  <button type="submit">Giriş Yap</button>
+</form>""")
+
+    def render_discount_feed(self):
+        items = "".join(
+            f"<item><g:id>{product_id}</g:id></item>"
+            for product_id, product in self.state.products.items()
+            if DISCOUNT_TAG_ID in product['tags']
+        )
+        return ('<?xml version="1.0" encoding="utf-8"?>'
+                '<rss xmlns:g="http://base.google.com/ns/1.0"><channel>'
+                f'{items}</channel></rss>')
+
+    def render_product(self, product_id):
+        product = self.state.products.get(product_id)
+        if product is None:
+            return self.send_html(page("Bulunamadı", "<h1>Ürün bulunamadı</h1>"), status=404)
+
+        rows = []
+        for combination_id in product['combination_ids']:
+            combination = self.state.combinations[combination_id]
+            rows.append(f"""
+<tr>
+  <td>{combination_id}</td>
+  <td>{html.escape(combination['text'])}</td>
+  <td>{product_id}-{combination_id}</td>
+  <td>10</td>
+  <td>True</td>
+  <td>{format_price(combination['price'])}</td>
+  <td><a class="k-button" onclick="OpenWindow('/Admin/Product/EditAttributeCombinationPopup/{combination_id}?btnId=btnRefresh&amp;formId=product-form', 800, 600, true); return false;">Düzenle</a></td>
+</tr>""")
+
+        tag_options = "".join(
+            f"<option value='{tag}'{' selected' if tag in product['tags'] else ''}>{tag}</option>"
+            for tag in sorted(product['tags'] | {DISCOUNT_TAG_ID, "100"})
+        )
+        body = f"""
+<form method="post" id="product-form" action="/admin/product/edit/{product_id}/">
+  <button type="submit" name="save-continue">Kaydet ve Devam Et</button>
+  <select id="SelectedProductTagIds" name="SelectedProductTagIds" multiple>{tag_options}</select>
+</form>
+<ul class="nav-tabs">
+  <li data-tab-name="tab-info" onclick="showTab('tab-info')"><span>Ürün Bilgileri</span></li>
+  <li data-tab-name="tab-mappings" onclick="showTab('tab-mappings')"><span>Kategori / Marka</span></li>
+  <li data-tab-name="tab-product-attributes" onclick="showTab('tab-product-attributes')"><span>Ürün Varyasyonları</span></li>
+</ul>
+<div class="tab-content" id="tab-info" style="display:block">Ürün {product_id}</div>
+<div class="tab-content" id="tab-mappings" style="display:none">
+  <div class="k-grid" id="productcategories-grid">
+    <p>Kategoriler: {", ".join(sorted(product['categories'])) or "-"}</p>
+    <a class="k-button k-button-icontext k-grid-add" href="#" onclick="document.getElementById('new-mapping').style.display='block'; return false;">Yeni Kayıt Ekle</a>
+    <div id="new-mapping" style="display:none">
+      <input data-role="dropdownlist" id="CategoryMapping">
+      <a class="k-button k-button-icontext k-grid-update" href="#" onclick="$.post('/admin/product/productcategoryinsert', {{productId: '{product_id}', categoryId: document.getElementById('CategoryMapping').value}}); return false;">Güncelle</a>
+    </div>
+  </div>
+</div>
+<div class="tab-content" id="tab-product-attributes" style="display:none">
+  <table class="k-grid"><tbody role="rowgroup">{"".join(rows)}</tbody></table>
+</div>"""
+        categories = json.dumps([{'CategoryId': category_id} for category_id in sorted(product['categories'])])
+        script = """
+var mapping = document.getElementById('CategoryMapping');
+mapping.__data = {kendoDropDownList: {
+  value: function (v) { if (arguments.length === 0) return mapping.value; mapping.value = v; },
+  trigger: function () {}
+}};
+var categoryItems = %s, removedCategories = [];
+document.getElementById('productcategories-grid').__data = {kendoGrid: {dataSource: {
+  data: function () { return categoryItems; },
+  remove: function (item) { categoryItems.splice(categoryItems.indexOf(item), 1); removedCategories.push(item); },
+  sync: function () {
+    removedCategories.splice(0).forEach(function (item) {
+      $.post('/admin/product/productcategorydelete', {productId: '%s', categoryId: item.CategoryId});
+    });
+  }
+}}};""" % (categories, product_id)
+        self.send_html(page(f"Ürün {product_id}", body, script))
+
+    def render_popup(self, combination_id):
+        combination = self.state.combinations.get(combination_id)
+        if combination is None:
+            return self.send_html(page("Bulunamadı", "<h1>Kombinasyon bulunamadı</h1>"), status=404)
+
+        price = "" if combination['price'] is None else f"{combination['price']:.4f}"
+        body = f"""
+<form method="post" action="/admin/product/editattributecombinationpopup/{combination_id}/">
+  <input type="text" id="OverriddenPrice" name="OverriddenPrice" value="{price}" style="display:none">
+  <span class="k-numeric-wrap"><input type="text" class="k-formatted-value" value="{price.replace('.', ',')}"></span>
+  <button type="submit" name="save">Kaydet</button>
+</form>"""
+        script = """
+var input = document.getElementById('OverriddenPrice');
+input.__data = {kendoNumericTextBox: {value: function (v) {
+  if (arguments.length === 0) return input.value;
+  input.value = (v === null || v === undefined) ? '' : v;
+}}};"""
+        self.send_html(page("Kombinasyon", body, script))
+
+    def render_bulkedit(self, query):
+        category_ids = query.get("SearchInCategoryIds", [])
+        searched = "search" in query
+
+        results = ""
+        if searched:
+            matches = self.match_bulk_products(category_ids)
+            hidden = "".join(
+                f"<input type='hidden' name='SearchInCategoryIds' value='{html.escape(cid)}'>" for cid in category_ids
+            )
+            results = f"""
+<form method="post" action="/admin/product/bulkedit/">
+  {hidden}
+  <p>{len(matches)} ürün bulundu</p>
+  <input type="checkbox" id="ProductTag_Update" name="ProductTag_Update" value="true">
+  <select id="ProductTagId" name="ProductTagId" multiple><option value="{DISCOUNT_TAG_ID}">{DISCOUNT_TAG_ID}</option></select>
+  <select id="ProductTagTransactionId" name="ProductTagTransactionId"><option value="0">Etiket Ekle</option><option value="1">Etiketi Çıkar</option></select>
+  <input type="checkbox" id="Category_Update" name="Category_Update" value="true">
+  <select id="CategoryId" name="CategoryId" multiple><option value="{DISCOUNT_CATEGORY_ID}">{DISCOUNT_CATEGORY_ID}</option></select>
+  <select id="CategoryTransactionId" name="CategoryTransactionId"><option value="0">Kategoriye Ekle</option><option value="1">Kategoriden Çıkar</option></select>
+  <button type="submit" id="bulk-update-submit">Kaydet</button>
+</form>"""
+
+        return page("Toplu Düzenleme", f"""
+<form method="get" action="/admin/product/bulkedit/">
+  <input type="hidden" name="search" value="1">
+  <select id="SearchInCategoryIds" name="SearchInCategoryIds" multiple>
+    <option value="{DISCOUNT_CATEGORY_ID}">{DISCOUNT_CATEGORY_ID}</option><option value="1">1</option>
+  </select>
+  <button type="submit" id="search-products">Ara</button>
+</form>
+{results}""")
+
+    # Yazmalar
+
+    def match_bulk_products(self, category_ids):
+        return [
+            product_id for product_id, product in self.state.products.items()
+            if not category_ids or product['categories'] & set(category_ids)
+        ]
+
+    def save_product(self, product_id, form):
+        product = self.state.products.get(product_id)
+        if product is None:
+            return self.send_html(page("Bulunamadı", "<h1>Ürün bulunamadı</h1>"), status=404)
+        tags = set(form.get("SelectedProductTagIds", []))
+        self.state.record('product_tags', product_id=product_id, before=sorted(product['tags']), after=sorted(tags))
+        product['tags'] = tags
+        self.redirect(f"/admin/product/edit/{product_id}/")
+
+    def save_popup(self, combination_id, form):
+        combination = self.state.combinations.get(combination_id)
+        if combination is None:
+            return self.send_html(page("Bulunamadı", "<h1>Kombinasyon bulunamadı</h1>"), status=404)
+        text = form.get("OverriddenPrice", [""])[0].strip().replace(",", ".")
+        price = round(float(text), 2) if text else None
+        self.state.record('combination_price', product_id=combination['product_id'],
+                          combination_id=combination_id, before=combination['price'], after=price)
+        combination['price'] = price
+        self.render_popup(combination_id)
+
+    def save_category(self, form):
+        product_id = form.get("productId", [""])[0]
+        category_id = form.get("categoryId", [""])[0]
+        product = self.state.products.get(product_id)
+        if product is None or not category_id:
+            return self.send_body(json.dumps({'success': False}), "application/json")
+        self.state.record('product_category', product_id=product_id, category_id=category_id)
+        product['categories'].add(category_id)
+        self.send_body(json.dumps({'success': True}), "application/json")
+
+    def delete_category(self, form):
+        product_id = form.get("productId", [""])[0]
+        category_id = form.get("categoryId", [""])[0]
+        product = self.state.products.get(product_id)
+        if product is None or category_id not in product['categories']:
+            return self.send_body(json.dumps({'success': False}), "application/json")
+        self.state.record('product_category_delete', product_id=product_id, category_id=category_id)
+        product['categories'].discard(category_id)
+        self.send_body(json.dumps({'success': True}), "application/json")
+
+    def save_bulkedit(self, form):
+        matches = self.match_bulk_products(form.get("SearchInCategoryIds", []))
+        changes = {}
+        if form.get("ProductTag_Update"):
+            changes['tags'] = (form.get("ProductTagId", []), form.get("ProductTagTransactionId", ["0"])[0])
+        if form.get("Category_Update"):
+            changes['categories'] = (form.get("CategoryId", []), form.get("CategoryTransactionId", ["0"])[0])
+
+        for product_id in matches:
+            product = self.state.products[product_id]
+            for field, (values, transaction) in changes.items():
+                if transaction == "1":
+                    product[field] -= set(values)
+                else:
+                    product[field] |= set(values)
+
+        self.state.record('bulk_edit', product_ids=matches,
+                          changes={field: {'ids': values, 'transaction': transaction}
+                                   for field, (values, transaction) in changes.items()})
+        self.redirect("/admin/product/bulkedit/")
+
+
+def serve(port, state, latency=0.0, jitter=0.0, failure_rate=0.0, write_failure_rate=0.0):
+    """Sahte paneli başlatır ve sunucuyu döner (serve_forever çağıran tarafta)."""
+    handler = type("ConfiguredMockAdminHandler", (MockAdminHandler,), {
+        'state': state,
+        'latency': latency,
+        'jitter': jitter,
+        'failure_rate': failure_rate,
+        'write_failure_rate': write_failure_rate,
+    })
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yerel sahte admin paneli.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--products", type=int, default=200, help="Ürün sayısı")
+    parser.add_argument("--discounted-ratio", type=float, default=0.3, help="Şu an indirimde olan ürün oranı")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Admin isteklerine eklenen gecikme")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Gecikmeye eklenen rastgele süre (üst sınır)")
+    parser.add_argument("--failure-rate", type=float, default=0, help="Admin GET isteklerinde 500 oranı")
+    parser.add_argument("--write-failure-rate", type=float, default=0, help="Yazma isteklerinde 500 oranı")
+    parser.add_argument("--writes", default=None, help="Yazmaların JSONL olarak ekleneceği dosya")
+    args = parser.parse_args()
+
+    state = MockState(args.products, args.discounted_ratio, args.seed, args.writes)
+    server = serve(args.port, state, args.latency_ms / 1000, args.jitter_ms / 1000,
+                   args.failure_rate, args.write_failure_rate)
+    print(f"Sahte admin paneli: http://127.0.0.1:{args.port} ({args.products} ürün)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,234 @@
+"""
+Veri adımlarının (XML, sipariş Excel'i, birleştirme) uçtan uca benchmark'ı.
+
+Sentetik veri (generate_data.py) yerel bir HTTP sunucusundan servis edilir;
+run_automation'daki feed adresleri bu sunucuya yönlendirilir ve Supabase
+sorgusu kapatılır. Her boyut ayrı bir süreçte çalışır, böylece tepe bellek
+(peak RSS) boyutlar arasında karışmaz. Aşama süreleri run_automation'daki
+METRICS ölçümlerinden alınır ve kayıtlı baseline ile karşılaştırılır.
+Varsayılan boyutların baseline'ı (baseline.json) ölçüldüğü makinenin
+bilgisiyle birlikte depoda tutulur; farklı bir makinede oranlar yalnızca
+yol göstericidir.
+
+Kullanım:
+    python benchmarks/run_benchmarks.py --sizes 1000,10000
+    python benchmarks/run_benchmarks.py --sizes 1000,10000 --save-baseline
+"""
+import argparse
+import functools
+import http.server
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+RESULTS_FILE = os.path.join(BENCH_DIR, "results.json")
+DEFAULT_SIZES = "1000,10000"
+REGRESSION_THRESHOLD = 0.20  # Baseline'dan %20 yavaşsa gerileme say
+
+# Raporlanan aşamalar (METRICS adları)
+REPORT_STAGES = [
+    "stage_xml", "get_xml_data", "parse_feed_pages", "filter_products",
+    "stage_orders", "download_excel_file", "process_excel_data",
+    "stage_merge", "product_fingerprints", "merge_changed_products", "calculate_beden_ratios", "calculate_sisme_orani",
+    "filter_sisme_orani", "clean_beden_names", "calculate_varyant_fiyati",
+]
+
+sys.path.insert(0, BENCH_DIR)
+from generate_data import DATA_DIR, FEED_PAGES, generate, parse_sizes  # noqa: E402
+
+
+def machine_info() -> dict:
+    """Ölçümün yapıldığı makineyi ve kütüphane sürümlerini döner."""
+    import numpy
+    import pandas
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'pandas': pandas.__version__,
+        'numpy': numpy.__version__,
+    }
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    """İstek loglarını basmayan statik dosya sunucusu."""
+
+    def log_message(self, format, *args):
+        pass
+
+
+@functools.lru_cache(maxsize=None)
+def start_server(directory: str) -> str:
+    """Veri dizinini rastgele bir portta servis eder ve taban URL'i döner."""
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def run_worker(size: int, base_url: str, output: str) -> None:
+    """
+    Tek bir boyut için veri adımlarını çalıştırır ve ölçümleri JSON olarak yazar.
+    Çalışma dizini geçici bir dizindir; Excel çıktıları oraya yazılır.
+    """
+    sys.path.insert(0, REPO_DIR)
+    import run_automation as automation
+
+    automation.setup_logging()
+    automation.XML_FEED_URLS = [f"{base_url}/{size}/xml_{page}.xml" for page in range(1, FEED_PAGES + 1)]
+    automation.ORDER_XLS_URL = f"{base_url}/{size}/orders.xlsx"
+    # Supabase ağ sorgusu benchmark kapsamı dışında
+    automation.connect_supabase = lambda: None
+
+    stages = [stage for stage in automation.build_stages() if stage['name'] != 'selenium']
+    start = time.perf_counter()
+    ok = automation.run_stages(stages, use_cache=False)
+    wall = time.perf_counter() - start
+
+    summary = automation.METRICS.summary()
+    result = {
+        'size': size,
+        'ok': ok,
+        'machine': machine_info(),
+        'wall_seconds': round(wall, 4),
+        'products_per_second': round(size / wall, 1) if wall else None,
+        'peak_rss_bytes': summary['peak_rss_bytes'],
+        'http_bytes': summary['http_bytes'],
+        'stages': {
+            name: {
+                'wall_seconds': values['wall_seconds'],
+                'cpu_seconds': values['cpu_seconds'],
+                'rows_in': values['rows_in'],
+                'rows_out': values['rows_out'],
+            }
+            for name, values in summary['stages'].items()
+        },
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+
+def run_size(size: int, verbose: bool = False, timeout: float = None) -> dict:
+    """Veriyi hazırlar ve boyutu ayrı bir süreçte ölçer."""
+    generate(size)
+    base_url = start_server(DATA_DIR)
+
+    with tempfile.TemporaryDirectory(prefix=f"bench-{size}-") as work_dir:
+        output = os.path.join(work_dir, "result.json")
+        command = [sys.executable, os.path.abspath(__file__), "--worker",
+                   "--size", str(size), "--base-url", base_url, "--output", output]
+        env = dict(os.environ, STAGE_CACHE="0", METRICS="1")
+        try:
+            completed = subprocess.run(
+                command, cwd=work_dir, env=env, timeout=timeout,
+                stdout=None if verbose else subprocess.DEVNULL,
+                stderr=None if verbose else subprocess.PIPE,
+            )
+        except subprocess.TimeoutExpired:
+            return {'size': size, 'ok': False, 'error': f"{timeout} sn zaman aşımı"}
+
+        if completed.returncode != 0 or not os.path.exists(output):
+            error = (completed.stderr or b"").decode("utf-8", "replace")[-2000:]
+            return {'size': size, 'ok': False, 'error': error or f"çıkış kodu {completed.returncode}"}
+
+        with open(output, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+def load_baseline() -> dict:
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(result: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD):
+    """Aşama sürelerini baseline ile karşılaştırır; (aşama, oran, gerileme mi) listesi döner."""
+    rows = []
+    base = baseline.get(str(result['size']))
+    for name in ["total"] + REPORT_STAGES:
+        current = result['wall_seconds'] if name == "total" else result['stages'].get(name, {}).get('wall_seconds')
+        if current is None:
+            continue
+        previous = None
+        if base:
+            previous = base['wall_seconds'] if name == "total" else base['stages'].get(name, {}).get('wall_seconds')
+        ratio = current / previous if previous else None
+        rows.append((name, current, previous, ratio, ratio is not None and ratio > 1 + threshold))
+    return rows
+
+
+def print_report(result: dict, baseline: dict) -> bool:
+    """Boyut sonucunu tablo olarak basar; gerileme varsa False döner."""
+    print(f"\n=== {result['size']} ürün ===")
+    if not result.get('ok'):
+        print(f"❌ Başarısız: {result.get('error', 'veri adımları başarısız')}")
+        return False
+
+    peak_mb = (result['peak_rss_bytes'] or 0) / 1024 / 1024
+    print(f"Toplam: {result['wall_seconds']:.2f} sn, {result['products_per_second']} ürün/sn, tepe bellek {peak_mb:.0f} MB")
+    print(f"{'Aşama':<26}{'Süre (sn)':>12}{'Baseline':>12}{'Oran':>8}")
+
+    regressed = False
+    for name, current, previous, ratio, is_regression in compare(result, baseline):
+        previous_text = f"{previous:.3f}" if previous is not None else "-"
+        ratio_text = f"{ratio:.2f}x" if ratio is not None else "-"
+        marker = " ⚠️" if is_regression else ""
+        print(f"{name:<26}{current:>12.3f}{previous_text:>12}{ratio_text:>8}{marker}")
+        regressed = regressed or is_regression
+
+    base = baseline.get(str(result['size']))
+    if base is None:
+        print("Baseline yok; --save-baseline ile oluşturulabilir.")
+    elif base.get('machine') != result.get('machine'):
+        print(f"Baseline farklı bir makinede ölçülmüş: {base.get('machine')}")
+    return not regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Veri adımlarını sentetik veriyle ölçer.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Virgülle ayrılmış ürün sayıları (örn. 1000,10000,100000,1000000)")
+    parser.add_argument("--save-baseline", action="store_true", help="Sonuçları baseline olarak kaydet")
+    parser.add_argument("--timeout", type=float, default=None, help="Boyut başına en fazla süre (sn)")
+    parser.add_argument("--verbose", action="store_true", help="Betiğin çıktısını göster")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.size, args.base_url, args.output)
+        return 0
+
+    baseline = load_baseline()
+    results = {}
+    all_ok = True
+    for size in parse_sizes(args.sizes):
+        result = run_size(size, verbose=args.verbose, timeout=args.timeout)
+        results[str(size)] = result
+        all_ok = print_report(result, baseline) and all_ok
+
+    with open(RESULTS_FILE, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        baseline.update({size: result for size, result in results.items() if result.get('ok')})
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\nBaseline kaydedildi: {BASELINE_FILE}")
+
+    return 0 if all_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
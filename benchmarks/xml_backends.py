@@ -0,0 +1,98 @@
+"""
+XML ayrıştırıcı arka uçlarının (ElementTree ve lxml) karşılaştırması.
+
+Sentetik 2XO5DS feed sayfaları (generate_data.py) ve aynı ürünlerden üretilen
+NE6ZAB biçimli (<item><g:id>) feed her arka uçla ayrıştırılır. Çıktıların
+ElementTree ile birebir aynı olduğu doğrulanır; en iyi süre ve saniyedeki ürün
+sayısı raporlanır. lxml kurulu değilse yalnızca ElementTree ölçülür.
+
+Kullanım:
+    python benchmarks/xml_backends.py --sizes 10000,100000 --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_SIZES = "10000,100000"
+
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+from generate_data import FEED_PAGES, generate, parse_sizes  # noqa: E402
+import run_automation as automation  # noqa: E402
+
+
+def discount_feed(size: int) -> str:
+    """Ürün ID'lerinin yarısını NE6ZAB feed'i biçiminde yazar (mock_admin ile aynı yapı)."""
+    items = "".join(f"<item><g:id>{100000 + index}</g:id></item>" for index in range(0, size, 2))
+    return f'<?xml version="1.0" encoding="utf-8"?><rss xmlns:g="http://base.google.com/ns/1.0"><channel>{items}</channel></rss>'
+
+
+def best_time(func, repeat: int):
+    """func'ı repeat kez çalıştırır; en kısa süreyi ve son sonucu döner."""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_size(size: int, backends, repeat: int) -> bool:
+    """Bir boyut için tüm arka uçları ölçer ve tabloyu basar; çıktı farkı varsa False döner."""
+    data_dir = generate(size)
+    pages = []
+    for page in range(1, FEED_PAGES + 1):
+        with open(os.path.join(data_dir, f"xml_{page}.xml"), "r", encoding="utf-8") as f:
+            pages.append(f.read())
+    feed = discount_feed(size)
+
+    print(f"\n=== {size} ürün ({sum(len(page) for page in pages) / 1024 / 1024:.1f} MB feed) ===")
+    print(f"{'Arka uç':<10}{'Ürünler (sn)':>14}{'ürün/sn':>12}{'ID (sn)':>10}{'Oran':>8}  Çıktı")
+
+    reference = None
+    reference_seconds = None
+    identical = True
+    for backend in backends:
+        product_seconds, columns = best_time(
+            lambda: [automation.parse_product_columns(page, backend) for page in pages], repeat)
+        id_seconds, product_ids = best_time(lambda: automation.parse_item_ids(feed, backend), repeat)
+
+        if reference is None:
+            reference, reference_seconds = (columns, product_ids), product_seconds
+        same = (columns, product_ids) == reference
+        identical = identical and same
+
+        count = sum(len(page_columns['IdUrun']) for page_columns in columns)
+        print(f"{backend:<10}{product_seconds:>14.3f}{count / product_seconds:>12.0f}{id_seconds:>10.3f}"
+              f"{reference_seconds / product_seconds:>7.2f}x  {'aynı' if same else 'FARKLI'}")
+    return identical
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XML ayrıştırıcı arka uçlarını karşılaştırır.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Virgülle ayrılmış ürün sayıları")
+    parser.add_argument("--repeat", type=int, default=3, help="Ölçüm tekrarı (en iyi süre alınır)")
+    args = parser.parse_args()
+
+    automation.setup_logging()
+    backends = ['etree']
+    if automation.xml_backend('lxml') == 'lxml':
+        backends.append('lxml')
+    else:
+        print("lxml kurulu değil; yalnızca ElementTree ölçülüyor.")
+
+    all_identical = True
+    for size in parse_sizes(args.sizes):
+        all_identical = run_size(size, backends, args.repeat) and all_identical
+
+    if not all_identical:
+        print("\n❌ Arka uçların çıktıları farklı!")
+    return 0 if all_identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,749 @@
-import requests
+from __future__ import annotations
+
 import xml.etree.ElementTree as ET
-import pandas as pd
 import time
+import json
+import base64
+import hashlib
+import threading
+import heapq
+import shutil
+import random
+import functools
+import logging
+import logging.handlers
+import queue
+import sys
+import atexit
+import subprocess
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from typing import List, Dict, Any
 import os
 import re
+import importlib
 from io import BytesIO
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import Select
-from selenium.webdriver.common.keys import Keys
 
 
+class LazyModule:
+    """
+    Modülü ilk öznitelik erişiminde içe aktaran vekil. Sadece fetch/reset gibi
+    kısa komutlar pandas/openpyxl yüklemeden çalışır (açılış süresi düşer).
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+# Ağır kütüphaneler ilk kullanımda yüklenir
+requests = LazyModule("requests")
+pd = LazyModule("pandas")
+np = LazyModule("numpy")
+
+# Selenium sadece tarayıcı gereken adımlarda yüklenir (bkz. load_selenium)
+webdriver = Options = By = WebDriverWait = EC = Select = None
+
+
+def load_selenium():
+    """Selenium modüllerini ilk ihtiyaç anında yükler; plan modu Selenium'u hiç yüklemez."""
+    global webdriver, Options, By, WebDriverWait, EC, Select
+    if webdriver is not None:
+        return
+
+    from selenium import webdriver as selenium_webdriver
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+    from selenium.webdriver.common.by import By as SeleniumBy
+    from selenium.webdriver.support.ui import WebDriverWait as SeleniumWait, Select as SeleniumSelect
+    from selenium.webdriver.support import expected_conditions
+
+    Options, By, WebDriverWait, EC, Select = ChromeOptions, SeleniumBy, SeleniumWait, expected_conditions, SeleniumSelect
+    webdriver = selenium_webdriver
+
+
+# ─────────── GÜNLÜK ───────────
+# LOG_LEVEL=DEBUG ile satır/kombinasyon bazında ayrıntılar da yazılır.
+# LOG_FORMAT=json ile her satır tek bir JSON nesnesi olur. Uzun döngüler
+# her LOG_PROGRESS_EVERY öğede bir ilerleme ve hız özeti yazar.
+LOG_LEVEL          = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT         = os.environ.get("LOG_FORMAT", "text")
+LOG_PROGRESS_EVERY = int(os.environ.get("LOG_PROGRESS_EVERY", "50"))
+# ──────────────────────────────
+
+log = logging.getLogger("haydigiy")
+
+class JsonLogFormatter(logging.Formatter):
+    """Kayıtları zaman, seviye, thread, mesaj ve ek alanlarla tek satır JSON olarak biçimlendirir."""
+
+    def format(self, record):
+        entry = {
+            'ts': self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            'level': record.levelname,
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+def setup_logging(level=LOG_LEVEL, fmt=LOG_FORMAT):
+    """
+    Günlüğü kuyruk üzerinden yazar: çağıran thread sadece kuyruğa ekler,
+    stdout'a yazma ayrı bir dinleyici thread'inde yapılır. Birden fazla çağrı zararsızdır.
+    """
+    if getattr(log, '_listener', None) is not None:
+        return log
+
+    handler = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        handler.setFormatter(JsonLogFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(message)s", "%H:%M:%S"))
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=False)
+    listener.start()
+    atexit.register(listener.stop)
+
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    log.setLevel(level)
+    log.propagate = False
+    log._listener = listener
+    return log
+
+class ProgressLog:
+    """Uzun döngülerde her N öğede bir (ve sonda) INFO seviyesinde ilerleme, hız ve kalan süre yazar."""
+
+    def __init__(self, label, total, every=LOG_PROGRESS_EVERY):
+        self.label = label
+        self.total = total
+        self.every = max(1, every)
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+
+    def step(self, ok=True):
+        self.done += 1
+        if not ok:
+            self.failed += 1
+        if self.done % self.every == 0 or self.done == self.total:
+            self.report()
+
+    def report(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        rate = self.done / elapsed
+        remaining = (self.total - self.done) / rate if rate and self.total > self.done else 0
+        log.info(
+            f"{self.label}: {self.done}/{self.total}, {rate:.2f} öğe/sn, "
+            f"başarısız {self.failed}, kalan ~{remaining / 60:.1f} dk",
+            extra={'fields': {
+                'progress': self.label, 'done': self.done, 'total': self.total,
+                'failed': self.failed, 'rate_per_sec': round(rate, 3),
+            }},
+        )
+
+
+# ─────────── ÖLÇÜMLER ───────────
+# Çalışma sonunda aşama bazında süre/bellek/HTTP ölçümleri JSON ve Prometheus textfile olarak yazılır.
+# METRICS=0 ile kapatılır.
+METRICS_ENABLED   = os.environ.get("METRICS", "1") != "0"
+METRICS_JSON_FILE = os.environ.get("METRICS_JSON_FILE", "metrics.json")
+METRICS_PROM_FILE = os.environ.get("METRICS_PROM_FILE", "metrics.prom")
+METRICS_PREFIX    = "varyasyon"
+# ────────────────────────────────
+
+def peak_rss_bytes():
+    """Sürecin şimdiye kadarki en yüksek bellek kullanımı (byte); ölçülemezse None."""
+    try:
+        import resource
+    except ImportError:
+        # Windows'ta resource modülü yok
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS byte döner
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+def percentile(values, q):
+    """Sıralı olmayan listeden q (0-100) yüzdelik değerini doğrusal aradeğerlemeyle döner."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+class StageMetrics:
+    """
+    Aşama bazında duvar süresi, CPU süresi, satır sayıları, HTTP istek/byte sayıları
+    ve çağrı gecikmelerini toplar. Aşamalar farklı thread'lerde çalışabildiği için
+    CPU süresi thread bazında ölçülür; HTTP sayaçları o thread'de açık olan tüm
+    aşamalara (iç içe aşamalar dahil) yazılır.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.http_requests = 0
+        self.http_bytes = 0
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _entry(self, name):
+        return self.stages.setdefault(name, {
+            'calls': 0, 'errors': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+            'rows_in': 0, 'rows_out': 0, 'http_requests': 0, 'http_bytes': 0,
+            'peak_rss_bytes': None, 'latencies': [],
+        })
+
+    def _active(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Bir aşama çağrısını ölçer. Dönen sözlüğe 'rows_in' / 'rows_out' yazılabilir.
+        Her çağrının süresi gecikme yüzdelikleri için ayrıca saklanır.
+        """
+        counters = {'rows_in': None, 'rows_out': None, 'http_requests': 0, 'http_bytes': 0}
+        stack = self._active()
+        stack.append(counters)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        failed = False
+        try:
+            yield counters
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            stack.pop()
+            rss = peak_rss_bytes()
+            with self._lock:
+                entry = self._entry(name)
+                entry['calls'] += 1
+                entry['errors'] += int(failed)
+                entry['wall_seconds'] += wall
+                entry['cpu_seconds'] += cpu
+                entry['rows_in'] += counters['rows_in'] or 0
+                entry['rows_out'] += counters['rows_out'] or 0
+                entry['http_requests'] += counters['http_requests']
+                entry['http_bytes'] += counters['http_bytes']
+                entry['peak_rss_bytes'] = rss
+                entry['latencies'].append(wall)
+
+    def add_http(self, nbytes):
+        """Bir HTTP yanıtını genel sayaçlara ve bu thread'de açık aşamalara ekler."""
+        for counters in self._active():
+            counters['http_requests'] += 1
+            counters['http_bytes'] += nbytes
+        with self._lock:
+            self.http_requests += 1
+            self.http_bytes += nbytes
+
+    def summary(self):
+        """Ölçümleri JSON'a yazılabilir özet olarak döner (ham gecikmeler yerine yüzdelikler)."""
+        with self._lock:
+            stages = {}
+            for name, entry in self.stages.items():
+                stage = {k: v for k, v in entry.items() if k != 'latencies'}
+                stage['wall_seconds'] = round(stage['wall_seconds'], 4)
+                stage['cpu_seconds'] = round(stage['cpu_seconds'], 4)
+                stage['latency_seconds'] = {
+                    f"p{q}": round(percentile(entry['latencies'], q), 4)
+                    for q in (50, 90, 95, 99)
+                }
+                stages[name] = stage
+
+            return {
+                'started_at': self.started_at,
+                'finished_at': time.time(),
+                'peak_rss_bytes': peak_rss_bytes(),
+                'http_requests': self.http_requests,
+                'http_bytes': self.http_bytes,
+                'stages': stages,
+            }
+
+    def to_prometheus(self, summary):
+        """Özeti node_exporter textfile collector biçimine çevirir."""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {METRICS_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRICS_PREFIX}_{name} {kind}")
+            for labels, value in samples:
+                if value is None:
+                    continue
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                label_part = f"{{{label_text}}}" if label_text else ""
+                lines.append(f"{METRICS_PREFIX}_{name}{label_part} {value}")
+
+        stages = summary['stages']
+        per_stage = [
+            ('stage_calls_total', 'counter', "Aşama çağrı sayısı", 'calls'),
+            ('stage_errors_total', 'counter', "Hata ile biten aşama çağrısı", 'errors'),
+            ('stage_wall_seconds', 'gauge', "Aşamanın toplam duvar süresi", 'wall_seconds'),
+            ('stage_cpu_seconds', 'gauge', "Aşamanın toplam CPU süresi (thread)", 'cpu_seconds'),
+            ('stage_rows_in', 'gauge', "Aşamaya giren satır sayısı", 'rows_in'),
+            ('stage_rows_out', 'gauge', "Aşamadan çıkan satır sayısı", 'rows_out'),
+            ('stage_http_requests_total', 'counter', "Aşamadaki HTTP istek sayısı", 'http_requests'),
+            ('stage_http_bytes_total', 'counter', "Aşamada indirilen byte", 'http_bytes'),
+            ('stage_peak_rss_bytes', 'gauge', "Aşama bitiminde sürecin tepe bellek kullanımı", 'peak_rss_bytes'),
+        ]
+        for name, kind, help_text, field in per_stage:
+            metric(name, kind, help_text, [({'stage': stage}, values[field]) for stage, values in stages.items()])
+
+        metric('stage_latency_seconds', 'gauge', "Aşama çağrı süresi yüzdelikleri", [
+            ({'stage': stage, 'quantile': str(int(q[1:]) / 100)}, value)
+            for stage, values in stages.items()
+            for q, value in values['latency_seconds'].items()
+        ])
+        metric('http_requests_total', 'counter', "Toplam HTTP istek sayısı", [({}, summary['http_requests'])])
+        metric('http_bytes_total', 'counter', "Toplam indirilen byte", [({}, summary['http_bytes'])])
+        metric('peak_rss_bytes', 'gauge', "Sürecin tepe bellek kullanımı", [({}, summary['peak_rss_bytes'])])
+        metric('last_run_timestamp_seconds', 'gauge', "Son çalışmanın bitiş zamanı", [({}, round(summary['finished_at']))])
+
+        return "\n".join(lines) + "\n"
+
+    def export(self, json_file=METRICS_JSON_FILE, prom_file=METRICS_PROM_FILE):
+        """Ölçümleri JSON ve Prometheus textfile olarak yazar (textfile atomik olarak değiştirilir)."""
+        summary = self.summary()
+        with open(json_file, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        # node_exporter yarım yazılmış dosyayı okumasın
+        tmp_file = f"{prom_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus(summary))
+        os.replace(tmp_file, prom_file)
+        log.info(f"Ölçümler kaydedildi: {json_file}, {prom_file}")
+
+METRICS = StageMetrics()
+
+# ─────────── PROFİLLEME ───────────
+# PROFILE_STAGES ile virgülle ayrılmış aşamalar profillenir; adlar metrics.json'daki
+# aşama adlarıdır (örn. stage_merge,calculate_sisme_orani,process_product).
+# PROFILE_MODE: cprofile (varsayılan), tracemalloc veya sample. Boşken hiçbir ek yük yoktur.
+PROFILE_STAGES          = frozenset(name.strip() for name in os.environ.get("PROFILE_STAGES", "").split(",") if name.strip())
+PROFILE_MODE            = os.environ.get("PROFILE_MODE", "cprofile")
+PROFILE_DIR             = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_TOP_N           = int(os.environ.get("PROFILE_TOP_N", "30"))
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get("PROFILE_SAMPLE_INTERVAL", "0.005"))
+# ──────────────────────────────────
+
+class StageProfiler:
+    """
+    Seçilen aşamaları cProfile, tracemalloc veya örnekleyici profiler ile sarar.
+    Aynı aşamanın tekrar eden çağrıları (örn. process_product) tek profilde birikir.
+    Çıktılar çalışma dizinine yazılır:
+    - cprofile:    <aşama>.prof (snakeviz/flameprof) ve <aşama>_top.txt
+    - tracemalloc: <aşama>_alloc.txt (ilk giriş ile son çıkış arasındaki en büyük N ayırma)
+    - sample:      <aşama>.folded (flamegraph.pl / speedscope için katlanmış yığınlar)
+    """
+
+    def __init__(self, mode=PROFILE_MODE, output_dir=PROFILE_DIR, top_n=PROFILE_TOP_N,
+                 interval=PROFILE_SAMPLE_INTERVAL):
+        self.mode = mode
+        self.run_dir = os.path.join(output_dir, time.strftime("%Y%m%d-%H%M%S"))
+        self.top_n = top_n
+        self.interval = interval
+        self.profiles = {}
+        self.samples = {}
+        self.snapshots = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def stage(self, name):
+        active = getattr(self._local, 'active', None)
+        if active is None:
+            active = self._local.active = set()
+        if name in active:
+            # Özyinelemeli / iç içe aynı aşama: dıştaki profil yeterli
+            yield
+            return
+
+        active.add(name)
+        try:
+            runner = {
+                'cprofile': self._cprofile,
+                'tracemalloc': self._tracemalloc,
+                'sample': self._sample,
+            }.get(self.mode)
+            if runner is None:
+                log.warning(f"⚠️ Bilinmeyen PROFILE_MODE: {self.mode}")
+                yield
+                return
+            with runner(name):
+                yield
+        finally:
+            active.discard(name)
+
+    @contextmanager
+    def _cprofile(self, name):
+        import cProfile
+
+        with self._lock:
+            profile = self.profiles.setdefault(name, cProfile.Profile())
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Python 3.12+: aynı anda tek profiler etkin olabilir (paralel aşamalar)
+            log.warning(f"⚠️ {name} profillenemedi, başka bir profil etkin: {e}")
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+
+    @contextmanager
+    def _tracemalloc(self, name):
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+        with self._lock:
+            if name not in self.snapshots:
+                self.snapshots[name] = {'first': tracemalloc.take_snapshot(), 'last': None, 'peak': 0}
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            with self._lock:
+                entry = self.snapshots[name]
+                entry['last'] = snapshot
+                entry['peak'] = max(entry['peak'], peak)
+
+    @contextmanager
+    def _sample(self, name):
+        target = threading.get_ident()
+        stop = threading.Event()
+        with self._lock:
+            counts = self.samples.setdefault(name, {})
+
+        def sampler():
+            while not stop.wait(self.interval):
+                frame = sys._current_frames().get(target)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if stack:
+                    key = ";".join(reversed(stack))
+                    with self._lock:
+                        counts[key] = counts.get(key, 0) + 1
+
+        thread = threading.Thread(target=sampler, name=f"profiler-{name}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def export(self):
+        """Biriken profilleri çalışma dizinine yazar."""
+        if not (self.profiles or self.snapshots or self.samples):
+            return
+        os.makedirs(self.run_dir, exist_ok=True)
+
+        for name, profile in self.profiles.items():
+            import pstats
+            profile.dump_stats(os.path.join(self.run_dir, f"{name}.prof"))
+            with open(os.path.join(self.run_dir, f"{name}_top.txt"), "w", encoding="utf-8") as f:
+                pstats.Stats(profile, stream=f).sort_stats("cumulative").print_stats(self.top_n)
+
+        for name, entry in self.snapshots.items():
+            if entry['last'] is None:
+                continue
+            stats = entry['last'].compare_to(entry['first'], 'lineno')[:self.top_n]
+            with open(os.path.join(self.run_dir, f"{name}_alloc.txt"), "w", encoding="utf-8") as f:
+                f.write(f"Tepe izlenen bellek: {entry['peak'] / 1024 / 1024:.1f} MB\n")
+                f.write(f"En büyük {self.top_n} ayırma farkı (satır bazında):\n")
+                for stat in stats:
+                    f.write(f"{stat}\n")
+
+        for name, counts in self.samples.items():
+            with open(os.path.join(self.run_dir, f"{name}.folded"), "w", encoding="utf-8") as f:
+                for stack, count in sorted(counts.items(), key=lambda item: -item[1]):
+                    f.write(f"{stack} {count}\n")
+
+        log.info(f"Profil çıktıları kaydedildi: {self.run_dir}")
+
+PROFILER = StageProfiler()
+
+@contextmanager
+def profiled(name):
+    """Aşama PROFILE_STAGES içindeyse profiller, değilse hiçbir şey yapmaz."""
+    if name not in PROFILE_STAGES:
+        yield
+        return
+    with PROFILER.stage(name):
+        yield
+
+def measured(name, rows_in=False, rows_out=False):
+    """
+    Fonksiyonu METRICS altında bir aşama olarak ölçen dekoratör.
+    rows_in: ilk argümanın, rows_out: dönüş değerinin uzunluğu satır sayısı olarak yazılır.
+    Aşama PROFILE_STAGES içindeyse ayrıca profillenir.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if name in PROFILE_STAGES:
+                with PROFILER.stage(name):
+                    return call(*args, **kwargs)
+            return call(*args, **kwargs)
+
+        def call(*args, **kwargs):
+            if not METRICS_ENABLED:
+                return func(*args, **kwargs)
+            with METRICS.stage(name) as counters:
+                if rows_in and args and hasattr(args[0], '__len__'):
+                    counters['rows_in'] = len(args[0])
+                result = func(*args, **kwargs)
+                if rows_out and hasattr(result, '__len__'):
+                    counters['rows_out'] = len(result)
+                return result
+        return wrapper
+    return decorator
+
+# ─────────── KURALLAR ───────────
+# RULES_FILE (JSON ya da PyYAML kuruluysa YAML) ile varsayılan kurallar değiştirilir.
+# Dosyada yalnızca değişen alanlar yazılabilir; eksikler DEFAULT_RULES'tan gelir.
+# Kurallar açılışta doğrulanır; hatalı dosyayla hiçbir adım çalışmaz.
+RULES_FILE = os.environ.get("RULES_FILE", "")
+SIMULATION_FILE = "simulasyon_sonucu.json"
+RAW_PRODUCTS_FILE = "ham_urun_verileri.pkl"           # Süzülmemiş feed (simülasyon girdisi)
+LAUNCH_DATES_FILE = "satisa_girme_tarihleri.json"     # Supabase SatisaGirmeTarihi önbelleği
+# ────────────────────────────────
+
+# ─────────── ÜRÜN PARMAK İZLERİ ───────────
+# Birleştirme adımı her ürünün feed alanlarını ve sipariş adetlerini özetler; özeti önceki
+# çalışmayla aynı olan ürünlerin sonucu PRODUCT_CACHE_FILE'dan alınır. PRODUCT_CACHE=0 ile kapatılır.
+PRODUCT_CACHE_ENABLED = os.environ.get("PRODUCT_CACHE", "1") != "0"
+PRODUCT_CACHE_FILE    = os.environ.get("PRODUCT_CACHE_FILE", "urun_parmak_izleri.pkl")
+FINGERPRINT_COLUMN    = "_parmak_izi"
+# ──────────────────────────────────────────
+
+STOCK_COLUMN = 'SatistaOlduguGunlerVeBedenlerinSatistakiStokAdetleri'
+
+DEFAULT_RULES = {
+    'name': "varsayilan",
+    'product_filter': {
+        'min_size_separators': 2,     # Beden/stok kolonunda en az bu kadar "//"
+        'min_stock': 25,              # SatistakiStokAdedi alt sınırı
+        'min_active_size_ratio': 51,  # UrununAktifBedenOrani alt sınırı
+    },
+    'inflation': {
+        'reference_sizes': ["36", "S"],  # Şişmesi ölçülen (ve indirim yazılan) beden
+        'min_compare_stock': 10,         # Karşılaştırmaya girecek bedenin en az stoğu
+        'min_ratio': 40,                 # SismeOrani alt sınırı
+    },
+    'launch_window_days': 5,  # Son bu kadar günde satışa girenler indirime girmez
+    # İlk eşleşen kademe uygulanır; hiçbiri eşleşmezse fiyat değişmez
+    'discount_tiers': [
+        {'min': 40, 'max': 70, 'multiplier': 0.75},
+        {'min': 70, 'multiplier': 0.70},
+    ],
+}
+
+def load_config_file(path: str):
+    """JSON ya da (.yaml/.yml uzantılı ve PyYAML kuruluysa) YAML yapılandırma dosyasını okur."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("YAML için PyYAML gerekli ('pip install pyyaml')")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+def _check_number(path, value, minimum=None, maximum=None, integer=False):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or (integer and not isinstance(value, int)):
+        raise ValueError(f"{path}: {'tam sayı' if integer else 'sayı'} olmalı, {value!r} verildi")
+    if minimum is not None and value < minimum:
+        raise ValueError(f"{path}: en az {minimum} olmalı, {value!r} verildi")
+    if maximum is not None and value > maximum:
+        raise ValueError(f"{path}: en fazla {maximum} olmalı, {value!r} verildi")
+
+def validate_rules(config) -> dict:
+    """
+    Kural dosyasını DEFAULT_RULES ile birleştirip doğrular; tam kural sözlüğünü döner.
+    Bilinmeyen alan, yanlış tür veya min'i max'ından büyük kademe varsa ValueError fırlatır.
+    Kademelerin çakışması ya da aralarında boşluk olması hata değildir: ilk eşleşen kademe
+    uygulanır (varsayılanlarda 70 iki kademede de vardır, ×0.75 geçerlidir), hiçbiri
+    eşleşmezse fiyat değişmez.
+    """
+    if not isinstance(config, dict):
+        raise ValueError("Kural dosyası bir nesne olmalı")
+    unknown = set(config) - set(DEFAULT_RULES)
+    if unknown:
+        raise ValueError(f"Bilinmeyen kural alan(lar)ı: {', '.join(sorted(unknown))}")
+
+    rules = json.loads(json.dumps(DEFAULT_RULES))
+    for section in ('product_filter', 'inflation'):
+        values = config.get(section, {})
+        if not isinstance(values, dict):
+            raise ValueError(f"{section}: nesne olmalı")
+        unknown = set(values) - set(DEFAULT_RULES[section])
+        if unknown:
+            raise ValueError(f"{section}: bilinmeyen alan(lar): {', '.join(sorted(unknown))}")
+        rules[section].update(values)
+    for key in ('name', 'launch_window_days', 'discount_tiers'):
+        if key in config:
+            rules[key] = config[key]
+
+    if not isinstance(rules['name'], str) or not rules['name']:
+        raise ValueError("name: boş olmayan bir metin olmalı")
+    for key, value in rules['product_filter'].items():
+        _check_number(f"product_filter.{key}", value, minimum=0, integer=True)
+    sizes = rules['inflation']['reference_sizes']
+    if not isinstance(sizes, list) or not sizes or not all(isinstance(size, str) and size for size in sizes):
+        raise ValueError("inflation.reference_sizes: boş olmayan metin listesi olmalı")
+    _check_number("inflation.min_compare_stock", rules['inflation']['min_compare_stock'], minimum=0)
+    _check_number("inflation.min_ratio", rules['inflation']['min_ratio'])
+    _check_number("launch_window_days", rules['launch_window_days'], minimum=0, integer=True)
+
+    tiers = rules['discount_tiers']
+    if not isinstance(tiers, list) or not tiers:
+        raise ValueError("discount_tiers: boş olmayan bir liste olmalı")
+    for index, tier in enumerate(tiers):
+        path = f"discount_tiers[{index}]"
+        if not isinstance(tier, dict) or 'multiplier' not in tier or ('min' not in tier and 'max' not in tier):
+            raise ValueError(f"{path}: 'multiplier' ve en az 'min' ya da 'max' içermeli")
+        unknown = set(tier) - {'min', 'max', 'multiplier'}
+        if unknown:
+            raise ValueError(f"{path}: bilinmeyen alan(lar): {', '.join(sorted(unknown))}")
+        _check_number(f"{path}.multiplier", tier['multiplier'], minimum=0, maximum=1)
+        for bound in ('min', 'max'):
+            if bound in tier:
+                _check_number(f"{path}.{bound}", tier[bound])
+        if 'min' in tier and 'max' in tier and tier['min'] > tier['max']:
+            raise ValueError(f"{path}: min ({tier['min']}) max'tan ({tier['max']}) büyük olamaz")
+    return rules
+
+class RuleSet:
+    """
+    Doğrulanmış kuralların derlenmiş hali. Her kural DataFrame kolonları üzerinde
+    tek seferde çalışan vektörel bir maske ya da kademe tablosudur (satır döngüsü yok).
+    """
+
+    def __init__(self, config=None, source="varsayılan"):
+        self.config = validate_rules(config or {})
+        self.source = source
+        self.name = self.config['name']
+
+        product_filter = self.config['product_filter']
+        self.min_size_separators = product_filter['min_size_separators']
+        self.min_stock = product_filter['min_stock']
+        self.min_active_size_ratio = product_filter['min_active_size_ratio']
+
+        inflation = self.config['inflation']
+        self.reference_sizes = list(inflation['reference_sizes'])
+        self.min_compare_stock = inflation['min_compare_stock']
+        self.min_ratio = inflation['min_ratio']
+
+        self.launch_window_days = self.config['launch_window_days']
+        self.tiers = [
+            (tier.get('min', float('-inf')), tier.get('max', float('inf')), float(tier['multiplier']))
+            for tier in self.config['discount_tiers']
+        ]
+        payload = json.dumps(self.config, sort_keys=True)
+        self.digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def from_file(cls, path: str) -> "RuleSet":
+        try:
+            return cls(load_config_file(path), source=path)
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}") from None
+
+    def product_mask(self, df):
+        """filter_products kuralları: "//" sayısı, satıştaki stok ve aktif beden oranı."""
+        separators = df[STOCK_COLUMN].fillna("").astype(str).str.count("//")
+        return (
+            (separators >= self.min_size_separators)
+            & (integer_column(df['SatistakiStokAdedi']) >= self.min_stock)
+            & (integer_column(df['UrununAktifBedenOrani']) >= self.min_active_size_ratio)
+        )
+
+    def multipliers(self, sisme_orani):
+        """Kademe tablosu: her SismeOrani için ilk eşleşen kademenin çarpanı (yoksa 1.0)."""
+        conditions = [(sisme_orani >= low) & (sisme_orani <= high) for low, high, _ in self.tiers]
+        return pd.Series(
+            np.select(conditions, [multiplier for _, _, multiplier in self.tiers], default=1.0),
+            index=sisme_orani.index,
+        )
+
+    def describe(self) -> str:
+        tiers = ", ".join(
+            f"{'' if low == float('-inf') else low}–{'' if high == float('inf') else high} ×{multiplier}"
+            for low, high, multiplier in self.tiers
+        )
+        return (f"{self.name} ({self.source}): stok>={self.min_stock}, aktif beden>={self.min_active_size_ratio}, "
+                f"şişme>={self.min_ratio}, son {self.launch_window_days} gün hariç, kademeler: {tiers}")
+
+RULES = RuleSet()
+
+def integer_column(series):
+    """
+    Metin/sayı kolonunu int() gibi çevirir; tam sayı olmayan değerler NaN olur.
+    int() gibi basamaklar arasındaki alt çizgiyi ("1_000") ve ASCII dışı rakamları kabul eder.
+    """
+    text = series.astype(str).str.strip()
+    matched = text.where(text.str.fullmatch(r"[+-]?\d+(?:_\d+)*"))
+    values = pd.to_numeric(matched.str.replace("_", "", regex=False), errors="coerce")
+    # to_numeric yalnızca ASCII rakamları çevirir; kalanlar (nadir) int() ile çevrilir
+    unconverted = matched.notna() & values.isna()
+    if unconverted.any():
+        values = values.astype(float)
+        values[unconverted] = matched[unconverted].map(int)
+    return values
+
+def sequential_mean(values):
+    """
+    Aynı indeksli değerlerin ortalaması; toplam sum() gibi soldan sağa alınır. pandas'ın
+    mean'i telafili toplama yapar ve yarım kuruş sınırında round() sonucunu değiştirebilir.
+    Döngü satırlar değil grup içi sıra üzerindedir (en fazla beden sayısı kadar).
+    """
+    position = values.groupby(level=0).cumcount()
+    totals = pd.Series(0.0, index=values.index.unique())
+    for index in range(int(position.max()) + 1 if len(values) else 0):
+        step = values[position == index]
+        totals[step.index] += step.to_numpy()
+    return totals / values.groupby(level=0).size()
+
+def size_stock_pairs(column):
+    """
+    "L : 7 // M : 27 // S : 31" kolonunu (satır indeksi, beden, stok) uzun tabloya açar.
+    Stok tam sayı değilse NaN olur. Tüm satırlar tek seferde işlenir.
+    Bilerek yapılan fark: birden fazla " : " içeren parça ("M : 10 : 3") ilk " : "tan
+    bölünür ve stoğu okunamadığı için atlanır. Satır satır eski kodda bu parça hata
+    fırlatıyor ve bütün tablonun SismeOrani kolonu boş kalıyordu.
+    """
+    parts = column.str.split(" // ").explode().dropna()
+    parts = parts[parts.str.contains(" : ", regex=False)]
+    pairs = parts.str.split(" : ", n=1, expand=True)
+    if pairs.empty:
+        return pd.DataFrame({'beden': pd.Series(dtype=object), 'stok': pd.Series(dtype=float)})
+    return pd.DataFrame({'beden': pairs[0].str.strip(), 'stok': integer_column(pairs[1])})
+
+@measured("get_xml_data")
 def get_xml_data(url: str, max_retries: int = 10) -> str:
     """
     Belirtilen URL'den XML verisini indirir.
@@ -23,192 +751,465 @@ def get_xml_data(url: str, max_retries: int = 10) -> str:
     """
     for attempt in range(max_retries):
         try:
-            print(f"İstek gönderiliyor: {url} (Deneme {attempt + 1})")
+            log.info(f"İstek gönderiliyor: {url} (Deneme {attempt + 1})")
             response = requests.get(url, timeout=9999)
+            METRICS.add_http(len(response.content))
             response.raise_for_status()
-            print(f"Başarılı: {url}")
+            log.info(f"Başarılı: {url}")
             return response.text
         except Exception as e:
-            print(f"Hata (Deneme {attempt + 1}): {url} - {str(e)}")
+            log.warning(f"Hata (Deneme {attempt + 1}): {url} - {str(e)}")
             if attempt < max_retries - 1:
-                print("5 saniye bekleniyor...")
+                log.info("5 saniye bekleniyor...")
                 time.sleep(5)
             else:
-                print(f"Maksimum deneme sayısına ulaşıldı: {url}")
+                log.info(f"Maksimum deneme sayısına ulaşıldı: {url}")
                 raise e
 
+# ─────────── FEED AYRIŞTIRMA ───────────
+# Büyük feed sayfaları <Product> sınırlarından PARSE_CHUNK_BYTES'lık parçalara bölünür ve
+# PARSE_WORKERS süreçte ayrıştırılır. Toplam içerik PARSE_PARALLEL_MIN_BYTES'tan küçükse
+# (süreç açma maliyeti kazançtan büyük) aynı parçalar bu süreçte ayrıştırılır.
+PARSE_WORKERS            = int(os.environ.get("PARSE_WORKERS", "0")) or os.cpu_count() or 1
+PARSE_CHUNK_BYTES        = int(os.environ.get("PARSE_CHUNK_BYTES", str(4 * 1024 * 1024)))
+PARSE_PARALLEL_MIN_BYTES = int(os.environ.get("PARSE_PARALLEL_MIN_BYTES", str(8 * 1024 * 1024)))
+# XML_BACKEND: auto (lxml kuruluysa lxml, değilse ElementTree), lxml ya da etree.
+XML_BACKEND              = os.environ.get("XML_BACKEND", "auto").lower()
+PRODUCT_FIELDS = [
+    'IdUrun', 'UrunAdi', 'StokKodu', 'SatistakiStokAdedi',
+    'SatistaOlduguGunlerVeBedenlerinSatistakiStokAdetleri',
+    'Kategori', 'Mevsim', 'UrununAktifBedenOrani', 'GuncelSatisFiyati',
+]
+GOOGLE_ID_TAG = '{http://base.google.com/ns/1.0}id'  # NE6ZAB feed'indeki g:id
+# ───────────────────────────────────────
+
+@measured("parse_xml_products", rows_out=True)
 def parse_xml_products(xml_content: str) -> List[Dict[str, Any]]:
     """
     XML içeriğini parse eder ve ürün verilerini liste olarak döner.
     """
-    products = []
     try:
-        root = ET.fromstring(xml_content)
-        
-        for product in root.findall('.//Product'):
-            product_data = {}
-            
-            # Her bir XML alanını kontrol edip değeri al
-            fields = [
-                'IdUrun', 'UrunAdi', 'StokKodu', 'SatistakiStokAdedi',
-                'SatistaOlduguGunlerVeBedenlerinSatistakiStokAdetleri',
-                    'Kategori', 'Mevsim', 'UrununAktifBedenOrani', 'GuncelSatisFiyati'
-            ]
-            
-            for field in fields:
-                element = product.find(field)
-                if element is not None:
-                    product_data[field] = element.text.strip() if element.text else ""
-                else:
-                    product_data[field] = ""
-            
-            products.append(product_data)
-            
+        columns = parse_product_columns(xml_content)
     except ET.ParseError as e:
-        print(f"XML parse hatası: {str(e)}")
+        log.error(f"XML parse hatası: {str(e)}")
         return []
-    
-    return products
 
-def filter_products(products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [dict(zip(PRODUCT_FIELDS, values)) for values in zip(*columns.values())]
+
+def etree_product_columns(xml_content: str) -> Dict[str, List[str]]:
+    """ElementTree arka ucu: tüm ağacı kurar, her ürünün alanlarını find ile okur."""
+    columns = {field: [] for field in PRODUCT_FIELDS}
+    root = ET.fromstring(xml_content)
+    for product in root.iterfind('.//Product'):
+        for field in PRODUCT_FIELDS:
+            element = product.find(field)
+            columns[field].append(element.text.strip() if element is not None and element.text else "")
+    return columns
+
+def lxml_product_columns(xml_content: str) -> Dict[str, List[str]]:
+    """
+    lxml arka ucu: yalnızca <Product> etiketlerini akış halinde (iterparse) işler, alanları
+    tek geçişte çocuk elemanlardan okur (find ile aynı: ilk eşleşen) ve okunan ürünü
+    bellekten atar. Çok büyük metin düğümlerine izin verilir (huge_tree).
+    """
+    from lxml import etree
+
+    columns = {field: [] for field in PRODUCT_FIELDS}
+    wanted = set(PRODUCT_FIELDS)
+    source = BytesIO(xml_content.encode("utf-8"))
+    try:
+        for _, product in etree.iterparse(source, events=("end",), tag="Product", encoding="utf-8", huge_tree=True):
+            values = {}
+            for child in product:
+                if child.tag in wanted and child.tag not in values:
+                    values[child.tag] = child.text
+            for field in PRODUCT_FIELDS:
+                columns[field].append((values.get(field) or "").strip())
+            product.clear(keep_tail=True)
+            while product.getprevious() is not None:
+                del product.getparent()[0]
+    except etree.XMLSyntaxError as e:
+        raise ET.ParseError(str(e)) from None
+    return columns
+
+def etree_item_ids(xml_content: str) -> List[str]:
+    """ElementTree arka ucu: <item> başına g:id, yoksa id değeri."""
+    product_ids = []
+    root = ET.fromstring(xml_content)
+    for item in root.iterfind('.//item'):
+        product_id = item.findtext(GOOGLE_ID_TAG) or item.findtext('id')
+        if product_id:
+            product_ids.append(product_id)
+    return product_ids
+
+def lxml_item_ids(xml_content: str) -> List[str]:
+    """
+    lxml arka ucu: NE6ZAB feed'i küçük olduğundan ağaç bir kerede kurulur (iterparse'ın
+    olay maliyeti kazançtan büyük); ID'ler <item> çocuklarından tek geçişte okunur.
+    """
+    from lxml import etree
+
+    product_ids = []
+    try:
+        root = etree.fromstring(xml_content.encode("utf-8"), parser=etree.XMLParser(encoding="utf-8", huge_tree=True))
+    except etree.XMLSyntaxError as e:
+        raise ET.ParseError(str(e)) from None
+    for item in root.iterdescendants('item'):
+        values = {}
+        for child in item:
+            if child.tag in (GOOGLE_ID_TAG, 'id') and child.tag not in values:
+                values[child.tag] = child.text
+        product_id = values.get(GOOGLE_ID_TAG) or values.get('id')
+        if product_id:
+            product_ids.append(product_id)
+    return product_ids
+
+# Arka uçlar aynı kayıtları üretir; hatalı XML'de ikisi de ET.ParseError fırlatır
+XML_BACKENDS = {
+    'etree': {'products': etree_product_columns, 'item_ids': etree_item_ids},
+    'lxml': {'products': lxml_product_columns, 'item_ids': lxml_item_ids},
+}
+
+@functools.lru_cache(maxsize=None)
+def xml_backend(name: str = None) -> str:
+    """
+    Kullanılacak arka ucun adını döner. auto'da lxml kuruluysa lxml seçilir;
+    lxml istenip kurulu değilse ElementTree'ye dönülür.
+    """
+    name = name or XML_BACKEND
+    if name not in XML_BACKENDS and name != "auto":
+        log.warning(f"Bilinmeyen XML_BACKEND '{name}', auto kullanılıyor.")
+        name = "auto"
+    if name in ("auto", "lxml"):
+        try:
+            importlib.import_module("lxml.etree")
+            return 'lxml'
+        except ImportError:
+            if name == "lxml":
+                log.warning("lxml kurulu değil ('pip install lxml'), ElementTree kullanılıyor.")
+    return 'etree'
+
+def parse_product_columns(xml_content: str, backend: str = None) -> Dict[str, List[str]]:
+    """
+    Feed'i (ya da bir parçasını) ayrıştırır, ürünleri kolon listeleri olarak döner:
+    {alan: [değer, ...]}. Olmayan alan boş string olur. Süreç havuzunda çalıştığı için
+    log yazmaz; hatalı XML'de ET.ParseError fırlatır.
+    """
+    return XML_BACKENDS[backend or xml_backend()]['products'](xml_content)
+
+def parse_item_ids(xml_content: str, backend: str = None) -> List[str]:
+    """NE6ZAB feed'indeki ürün ID'lerini sırayla döner; hatalı XML'de ET.ParseError fırlatır."""
+    return XML_BACKENDS[backend or xml_backend()]['item_ids'](xml_content)
+
+def parse_product_chunk(xml_content: str, backend: str = None):
+    """Süreç havuzu görevi: parse_product_columns sonucu ya da ET.ParseError (fırlatılmadan)."""
+    try:
+        return parse_product_columns(xml_content, backend)
+    except ET.ParseError as e:
+        return e
+
+def split_product_chunks(xml_content: str, chunk_bytes: int = PARSE_CHUNK_BYTES) -> List[str]:
+    """
+    Feed'i <Product> sınırlarından yaklaşık chunk_bytes büyüklüğünde, her biri tek başına
+    ayrıştırılabilen parçalara böler. <Product> bulunamazsa içerik tek parça döner.
+    """
+    start = xml_content.find("<Product>")
+    end = xml_content.rfind("</Product>")
+    if start == -1 or end == -1 or end - start <= chunk_bytes:
+        return [xml_content]
+    end += len("</Product>")
+
+    chunks = []
+    while start < end:
+        boundary = xml_content.find("<Product>", start + chunk_bytes, end)
+        if boundary == -1:
+            boundary = end
+        chunks.append("<Products>" + xml_content[start:boundary] + "</Products>")
+        start = boundary
+    return chunks
+
+@measured("parse_feed_pages", rows_out=True)
+def parse_feed_pages(pages: List[str], workers: int = PARSE_WORKERS) -> pd.DataFrame:
+    """
+    İndirilen feed sayfalarını parçalara bölüp süreç havuzunda ayrıştırır ve kolon
+    parçalarını sırayla birleştirerek ürün tablosunu döner. Parçası ayrıştırılamayan
+    sayfa bütün olarak tekrar denenir; o da olmazsa atlanır.
+    """
+    backend = xml_backend()
+    log.info(f"XML ayrıştırıcı: {backend}")
+
+    # Küçük feed'lerde ya da tek çekirdekte sayfalar bölünmeden bu süreçte ayrıştırılır
+    parallel = workers > 1 and sum(len(page) for page in pages) >= PARSE_PARALLEL_MIN_BYTES
+    if parallel:
+        chunks = [(index, chunk) for index, page in enumerate(pages) for chunk in split_product_chunks(page)]
+    else:
+        chunks = list(enumerate(pages))
+
+    batches = None
+    if parallel and len(chunks) > 1:
+        workers = min(workers, len(chunks))
+        log.info(f"{len(chunks)} parça {workers} süreçte ayrıştırılıyor...")
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                batches = list(executor.map(parse_product_chunk, [chunk for _, chunk in chunks],
+                                            [backend] * len(chunks)))
+        except Exception as e:
+            log.warning(f"Süreç havuzu kullanılamadı, bu süreçte ayrıştırılıyor: {e}")
+    if batches is None:
+        batches = [parse_product_chunk(chunk, backend) for _, chunk in chunks]
+
+    # Sayfa sırasıyla kolonları birleştir
+    columns = {field: [] for field in PRODUCT_FIELDS}
+    for index, page in enumerate(pages):
+        page_batches = [batch for (chunk_page, _), batch in zip(chunks, batches) if chunk_page == index]
+        if parallel and any(isinstance(batch, ET.ParseError) for batch in page_batches):
+            try:
+                page_batches = [parse_product_columns(page, backend)]
+            except ET.ParseError as e:
+                page_batches = [e]
+        if isinstance(page_batches[0], ET.ParseError):
+            log.error(f"{index + 1}. sayfa: XML parse hatası: {str(page_batches[0])}")
+            continue
+        count = 0
+        for batch in page_batches:
+            for field in PRODUCT_FIELDS:
+                columns[field].extend(batch[field])
+            count += len(batch[PRODUCT_FIELDS[0]])
+        log.info(f"{index + 1}. sayfa: {count} ürün bulundu")
+
+    return pd.DataFrame(columns, columns=PRODUCT_FIELDS)
+
+@measured("filter_products", rows_in=True, rows_out=True)
+def filter_products(products: pd.DataFrame, rules: RuleSet = None) -> pd.DataFrame:
     """
-    Ürünleri belirtilen kriterlere göre filtreler:
+    Ürünleri kurallara (varsayılanlar parantez içinde) göre filtreler:
     1. SatistaOlduguGunlerVeBedenlerinSatistakiStokAdetleri kolonunda en az 2 adet // içerenler
     2. SatistakiStokAdedi 25'ten küçük olanlar silinir
     3. UrununAktifBedenOrani 51'den küçük olanlar silinir
+    Sayıya çevrilemeyen değerli ürünler de silinir.
     """
-    filtered_products = []
-    
-    for product in products:
-        # 1. SatistaOlduguGunlerVeBedenlerinSatistakiStokAdetleri kontrolü
-        stok_bedenler = product.get('SatistaOlduguGunlerVeBedenlerinSatistakiStokAdetleri', '')
-        if stok_bedenler.count('//') < 2:
-            continue  # Bu ürünü atla
-        
-        # 2. SatistakiStokAdedi kontrolü
-        try:
-            satistaki_stok = int(product.get('SatistakiStokAdedi', '0'))
-            if satistaki_stok < 25:
-                continue  # Bu ürünü atla
-        except (ValueError, TypeError):
-            continue  # Sayıya çevrilemiyorsa atla
-        
-        # 3. UrununAktifBedenOrani kontrolü
-        try:
-            aktif_beden_orani = int(product.get('UrununAktifBedenOrani', '0'))
-            if aktif_beden_orani < 51:
-                continue  # Bu ürünü atla
-        except (ValueError, TypeError):
-            continue  # Sayıya çevrilemiyorsa atla
-        
-        # Tüm kriterleri geçen ürünü listeye ekle
-        filtered_products.append(product)
-    
-    return filtered_products
+    rules = rules or RULES
+    return products[rules.product_mask(products)]
+
+def merge_order_counts(urun_df: pd.DataFrame, islenmis_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Beden stoklarının yanına sipariş adedini ekler: "S : 31" → "S : 31-4".
+    Eşleşme StokKodu + beden ile yapılır, eşleşme yoksa "-0" eklenir.
+    """
+    # (StokKoduDuzenlenmis, Varyant) → ilk eşleşen satırın EtoplaAdet değeri
+    order_counts = {}
+    for key, etopla_adet in zip(zip(islenmis_df['StokKoduDuzenlenmis'], islenmis_df['Varyant']),
+                                islenmis_df['EtoplaAdet']):
+        if not (pd.isna(key[0]) or pd.isna(key[1])):
+            order_counts.setdefault(key, etopla_adet)
+
+    def update_beden_stok(stok_kodu, beden_stok_str):
+        if pd.isna(beden_stok_str) or not isinstance(beden_stok_str, str):
+            return beden_stok_str
+
+        # Beden stok verilerini parçala
+        updated_parts = []
+        for part in beden_stok_str.split(' // '):
+            if ' : ' in part:
+                beden, stok = part.split(' : ')
+                beden = beden.strip()
+                stok = stok.strip()
+
+                etopla_adet = order_counts.get((stok_kodu, beden))
+                if etopla_adet is not None:
+                    updated_parts.append(f"{beden} : {stok}-{int(etopla_adet)}")
+                else:
+                    # Eşleşme bulunamadı, 0 ekle
+                    updated_parts.append(f"{beden} : {stok}-0")
+            else:
+                updated_parts.append(part)
+
+        return ' // '.join(updated_parts)
 
+    urun_df[STOCK_COLUMN] = [
+        update_beden_stok(stok_kodu, beden_stok_str)
+        for stok_kodu, beden_stok_str in zip(urun_df['StokKodu'], urun_df[STOCK_COLUMN])
+    ]
+    return urun_df
+
+@measured("product_fingerprints", rows_in=True)
+def product_fingerprints(urun_df: pd.DataFrame, islenmis_df: pd.DataFrame) -> pd.Series:
+    """
+    Her ürün satırı için 64 bitlik parmak izi: feed alanları ve StokKodu'nun tüm
+    (Varyant, EtoplaAdet) sipariş kayıtları. Parmak izi aynıysa birleştirme sonucu da aynıdır.
+    """
+    orders = {}
+    for stok_kodu, varyant, etopla_adet in zip(islenmis_df['StokKoduDuzenlenmis'], islenmis_df['Varyant'],
+                                               islenmis_df['EtoplaAdet']):
+        if not (pd.isna(stok_kodu) or pd.isna(varyant)):
+            orders.setdefault(stok_kodu, {}).setdefault(str(varyant), str(etopla_adet))
+
+    order_text = [repr(sorted(orders.get(stok_kodu, {}).items())) for stok_kodu in urun_df['StokKodu']]
+    fields = urun_df.astype(str).assign(**{FINGERPRINT_COLUMN: order_text})
+    return pd.util.hash_pandas_object(fields, index=False)
+
+def product_cache_meta(urun_df: pd.DataFrame, rules: RuleSet) -> dict:
+    """Önbellekteki sonuçların geçerli olduğu koşullar; biri değişirse önbellek kullanılmaz."""
+    return {'code': code_version(), 'pandas': pd.__version__, 'rules': rules.digest,
+            'columns': list(urun_df.columns)}
+
+def load_product_cache(meta: dict) -> Dict[str, Any]:
+    """Önceki çalışmanın parmak izi tablosunu döner; yoksa ya da koşullar değiştiyse boş tablo."""
+    empty = {'meta': meta, 'fingerprints': np.array([], dtype=np.uint64), 'rows': pd.DataFrame()}
+    if not os.path.exists(PRODUCT_CACHE_FILE):
+        return empty
+    try:
+        cache = pd.read_pickle(PRODUCT_CACHE_FILE)
+    except Exception as e:
+        log.warning(f"Ürün parmak izi tablosu okunamadı, tüm ürünler hesaplanacak: {e}")
+        return empty
+    if cache.get('meta') != meta:
+        log.info("Kod, kurallar ya da feed kolonları değişmiş; ürün parmak izi tablosu kullanılmayacak.")
+        return empty
+    return cache
+
+def save_product_cache(cache: Dict[str, Any]):
+    tmp_filename = PRODUCT_CACHE_FILE + ".tmp"
+    try:
+        pd.to_pickle(cache, tmp_filename)
+        os.replace(tmp_filename, PRODUCT_CACHE_FILE)
+    except OSError as e:
+        log.warning(f"Ürün parmak izi tablosu kaydedilemedi: {e}")
+
+@measured("merge_changed_products", rows_in=True, rows_out=True)
+def merge_changed_products(urun_df: pd.DataFrame, islenmis_df: pd.DataFrame, rules: RuleSet = None) -> pd.DataFrame:
+    """
+    Sipariş adetlerini ekler ve tarihe bağlı olmayan hesaplamaları (compute_product_results) yapar.
+    Parmak izi önceki çalışmadakiyle aynı olan ürünler yeniden hesaplanmaz, sonuçları
+    PRODUCT_CACHE_FILE'dan alınır. Satırlar feed sırasını korur.
+    """
+    rules = rules or RULES
+    if not PRODUCT_CACHE_ENABLED:
+        return compute_product_results(merge_order_counts(urun_df, islenmis_df), rules)
+
+    fingerprints = product_fingerprints(urun_df, islenmis_df)
+    cache = load_product_cache(product_cache_meta(urun_df, rules))
+    known = fingerprints.isin(cache['fingerprints'])
+    changed = urun_df[~known].copy()
+    log.info(f"Parmak izi: {int(known.sum())} ürün değişmemiş, {len(changed)} ürün yeniden hesaplanacak")
+
+    rows = cache['rows']
+    if len(changed):
+        computed = compute_product_results(merge_order_counts(changed, islenmis_df), rules)
+        computed = computed.assign(**{FINGERPRINT_COLUMN: fingerprints.loc[computed.index]})
+        rows = pd.concat([rows, computed]) if len(rows) else computed
+
+    # Artık feed'de olmayan ürünlerin sonuçları tablodan atılır
+    if len(rows):
+        rows = rows[rows[FINGERPRINT_COLUMN].isin(fingerprints)].drop_duplicates(FINGERPRINT_COLUMN, keep='last')
+    save_product_cache({'meta': cache['meta'], 'fingerprints': fingerprints.unique(), 'rows': rows})
+
+    if not len(rows):
+        return urun_df.iloc[0:0]
+    kept = fingerprints[fingerprints.isin(rows[FINGERPRINT_COLUMN])]
+    result = rows.set_index(FINGERPRINT_COLUMN).loc[kept.values]
+    result.index = kept.index
+    return result
+
+def compute_product_results(urun_df: pd.DataFrame, rules: RuleSet = None) -> pd.DataFrame:
+    """
+    Sipariş adetleri eklenmiş ürünlerin yalnızca kendi satırına bağlı sonuçları:
+    beden oranları, SismeOrani filtresi, referans beden temizliği ve VaryantFiyati.
+    """
+    rules = rules or RULES
+
+    # Beden oranlarını hesapla
+    log.info("Beden oranları hesaplanıyor...")
+    urun_df = calculate_beden_ratios(urun_df)
+
+    # SismeOrani kolonunu ekle
+    log.info("SismeOrani kolonu ekleniyor...")
+    urun_df = calculate_sisme_orani(urun_df, rules)
+
+    # SismeOrani alt sınırdan küçük değerleri filtrele
+    log.info(f"SismeOrani {rules.min_ratio}'tan küçük değerler filtreleniyor...")
+    urun_df = filter_sisme_orani(urun_df, rules)
+
+    # Referans bedenleri (S ve 36) temizle
+    log.info("S ve 36 bedenleri temizleniyor...")
+    urun_df = clean_beden_names(urun_df, rules)
+
+    # VaryantFiyati kolonunu ekle
+    log.info("VaryantFiyati kolonu ekleniyor...")
+    return calculate_varyant_fiyati(urun_df, rules)
+
+def apply_launch_dates(urun_df: pd.DataFrame, rules: RuleSet = None, launch_dates=None) -> pd.DataFrame:
+    """
+    SatisaGirmeTarihi'ni ekler ve son günlerde satışa girenleri siler (tarihe bağlı adım).
+    launch_dates verilirse ({StokKodu: SatisaGirmeTarihi}) Supabase'e bağlanılmaz (simülasyon).
+    """
+    rules = rules or RULES
+
+    if launch_dates is not None:
+        urun_df['SatisaGirmeTarihi'] = urun_df['StokKodu'].map(launch_dates)
+        urun_df = filter_recent_dates(urun_df, rules)
+    else:
+        # Supabase'e bağlan
+        log.info("Supabase veritabanına bağlanılıyor...")
+        supabase = connect_supabase()
+
+        if supabase:
+            # SatisaGirmeTarihi verilerini çek
+            log.info("SatisaGirmeTarihi verileri çekiliyor...")
+            urun_df = get_satisa_girme_tarihi(urun_df, supabase)
+
+            # Son günlerde satışa girenleri filtrele
+            log.info(f"Son {rules.launch_window_days} gün içindeki tarihler filtreleniyor...")
+            urun_df = filter_recent_dates(urun_df, rules)
+
+    # VaryantFiyati son kolon kalır
+    if 'VaryantFiyati' in urun_df.columns:
+        urun_df = urun_df[[column for column in urun_df.columns if column != 'VaryantFiyati'] + ['VaryantFiyati']]
+    return urun_df
+
+def apply_discount_rules(urun_df: pd.DataFrame, rules: RuleSet = None, launch_dates=None) -> pd.DataFrame:
+    """
+    Sipariş adetleri eklenmiş ürünlere indirim kurallarını uygular ve VaryantFiyati'nı hesaplar.
+    launch_dates verilirse ({StokKodu: SatisaGirmeTarihi}) Supabase'e bağlanılmaz (simülasyon).
+    """
+    return apply_launch_dates(compute_product_results(urun_df, rules), rules, launch_dates)
+
+@measured("merge_excel_data")
 def merge_excel_data():
     """
     urun_verileri.xlsx ve islenmis_veriler.xlsx dosyalarını birleştirir.
     StokKodu eşleşmesi yaparak beden stok bilgilerini günceller.
     """
     try:
-        print("\nExcel dosyaları birleştiriliyor...")
+        log.info("Excel dosyaları birleştiriliyor...")
         
         # Excel dosyalarını oku
         urun_df = pd.read_excel("urun_verileri.xlsx")
         islenmis_df = pd.read_excel("islenmis_veriler.xlsx")
         
-        print(f"urun_verileri.xlsx: {len(urun_df)} satır")
-        print(f"islenmis_veriler.xlsx: {len(islenmis_df)} satır")
+        log.info(f"urun_verileri.xlsx: {len(urun_df)} satır")
+        log.info(f"islenmis_veriler.xlsx: {len(islenmis_df)} satır")
         
-        # StokKodu eşleşmesi yap
-        def update_beden_stok(row):
-            stok_kodu = row['StokKodu']
-            beden_stok_str = row['SatistaOlduguGunlerVeBedenlerinSatistakiStokAdetleri']
-            
-            if pd.isna(beden_stok_str) or not isinstance(beden_stok_str, str):
-                return beden_stok_str
-            
-            # Beden stok verilerini parçala
-            beden_parts = beden_stok_str.split(' // ')
-            updated_parts = []
-            
-            for part in beden_parts:
-                if ' : ' in part:
-                    beden, stok = part.split(' : ')
-                    beden = beden.strip()
-                    stok = stok.strip()
-                    
-                    # Bu bedeni islenmis_veriler.xlsx'de ara
-                    matching_rows = islenmis_df[
-                        (islenmis_df['StokKoduDuzenlenmis'] == stok_kodu) & 
-                        (islenmis_df['Varyant'] == beden)
-                    ]
-                    
-                    if not matching_rows.empty:
-                        # Eşleşme bulundu, EtoplaAdet değerini al
-                        etopla_adet = matching_rows.iloc[0]['EtoplaAdet']
-                        updated_part = f"{beden} : {stok}-{int(etopla_adet)}"
-                    else:
-                        # Eşleşme bulunamadı, 0 ekle
-                        updated_part = f"{beden} : {stok}-0"
-                    
-                    updated_parts.append(updated_part)
-                else:
-                    updated_parts.append(part)
-            
-            return ' // '.join(updated_parts)
-        
-        # Beden stok kolonunu güncelle
-        urun_df['SatistaOlduguGunlerVeBedenlerinSatistakiStokAdetleri'] = urun_df.apply(update_beden_stok, axis=1)
-        
-        # Beden oranlarını hesapla
-        print("\nBeden oranları hesaplanıyor...")
-        urun_df = calculate_beden_ratios(urun_df)
-        
-        # SismeOrani kolonunu ekle
-        print("\nSismeOrani kolonu ekleniyor...")
-        urun_df = calculate_sisme_orani(urun_df)
-        
-        # SismeOrani 40'tan küçük değerleri filtrele
-        print("\nSismeOrani 40'tan küçük değerler filtreleniyor...")
-        urun_df = filter_sisme_orani(urun_df)
-        
-        # Supabase'e bağlan
-        print("\nSupabase veritabanına bağlanılıyor...")
-        supabase = connect_supabase()
-        
-        if supabase:
-            # SatisaGirmeTarihi verilerini çek
-            print("\nSatisaGirmeTarihi verileri çekiliyor...")
-            urun_df = get_satisa_girme_tarihi(urun_df, supabase)
-            
-            # Son 5 gün içindeki tarihleri filtrele
-            print("\nSon 5 gün içindeki tarihler filtreleniyor...")
-            urun_df = filter_recent_dates(urun_df)
-        
-        # S ve 36 bedenlerini temizle
-        print("\nS ve 36 bedenleri temizleniyor...")
-        urun_df = clean_beden_names(urun_df)
+        # StokKodu eşleşmesi yap, değişen ürünlerin sonuçlarını hesapla
+        urun_df = merge_changed_products(urun_df, islenmis_df)
         
-        # VaryantFiyati kolonunu ekle
-        print("\nVaryantFiyati kolonu ekleniyor...")
-        urun_df = calculate_varyant_fiyati(urun_df)
+        urun_df = apply_launch_dates(urun_df)
         
         # Güncellenmiş dosyayı kaydet
         output_filename = "guncellenmis_urun_verileri.xlsx"
         urun_df.to_excel(output_filename, index=False, engine='openpyxl')
         
-        print(f"\n✅ Excel dosyaları başarıyla birleştirildi!")
-        print(f"📁 Güncellenmiş dosya: {output_filename}")
-        print(f"📊 Toplam satır: {len(urun_df)}")
+        log.info("✅ Excel dosyaları başarıyla birleştirildi!")
+        log.info(f"📁 Güncellenmiş dosya: {output_filename}")
+        log.info(f"📊 Toplam satır: {len(urun_df)}")
         
         return True
         
     except Exception as e:
-        print(f"\n❌ Excel birleştirme hatası: {str(e)}")
+        log.error(f"❌ Excel birleştirme hatası: {str(e)}")
         return False
 
+@measured("calculate_beden_ratios", rows_in=True, rows_out=True)
 def calculate_beden_ratios(df: pd.DataFrame) -> pd.DataFrame:
     """
     SatistaOlduguGunlerVeBedenlerinSatistakiStokAdetleri kolonundaki verileri hesaplar:
@@ -262,14 +1263,15 @@ def calculate_beden_ratios(df: pd.DataFrame) -> pd.DataFrame:
         # Beden stok kolonunu güncelle
         df['SatistaOlduguGunlerVeBedenlerinSatistakiStokAdetleri'] = df['SatistaOlduguGunlerVeBedenlerinSatistakiStokAdetleri'].apply(calculate_ratio)
         
-        print("✅ Beden oranları hesaplandı ve güncellendi!")
+        log.info("✅ Beden oranları hesaplandı ve güncellendi!")
         return df
         
     except Exception as e:
-        print(f"❌ Beden oranları hesaplama hatası: {str(e)}")
+        log.error(f"❌ Beden oranları hesaplama hatası: {str(e)}")
         return df
 
-def calculate_sisme_orani(df: pd.DataFrame) -> pd.DataFrame:
+@measured("calculate_sisme_orani", rows_in=True, rows_out=True)
+def calculate_sisme_orani(df: pd.DataFrame, rules: RuleSet = None) -> pd.DataFrame:
     """
     SismeOrani kolonunu ekler ve 36/S bedeninin diğer bedenlere olan ortalama uzaklık yüzdesini hesaplar.
     Sadece stok değeri en az 10 olan bedenler karşılaştırmaya dahil edilir.
@@ -278,101 +1280,69 @@ def calculate_sisme_orani(df: pd.DataFrame) -> pd.DataFrame:
     - 36(17) ile 40(18): %-5.88 (17-18)/17 * 100 = -5.88% (18>=10 ✓)
     - 36(17) ile 42(16): %5.88 (17-16)/17 * 100 = 5.88% (16>=10 ✓)
     - vs... sonra ortalaması alınır
+    Referans bedenler ve stok alt sınırı kurallardan (inflation) gelir; hesap tüm
+    satırlar için beden/stok uzun tablosu üzerinde tek seferde yapılır.
     """
     try:
-        def calculate_sisme_percentage(beden_stok_str):
-            if pd.isna(beden_stok_str) or not isinstance(beden_stok_str, str):
-                return None
-            
-            # Beden stok verilerini parçala
-            beden_parts = beden_stok_str.split(' // ')
-            percentages = []
-            
-            # Referans beden (36 veya S) bul
-            reference_beden = None
-            reference_value = None
-            
-            for part in beden_parts:
-                if ' : ' in part:
-                    beden, stok = part.split(' : ')
-                    beden = beden.strip()
-                    stok = stok.strip()
-                    
-                    # Referans beden kontrolü (36 veya S)
-                    if beden == '36' or beden == 'S':
-                        try:
-                            reference_beden = beden
-                            reference_value = int(stok)
-                            break
-                        except ValueError:
-                            continue
-            
-            # Referans beden bulunamadıysa None döndür
-            if reference_beden is None or reference_value is None:
-                return None
-            
-            # Diğer bedenlerle karşılaştır ve yüzde hesapla
-            for part in beden_parts:
-                if ' : ' in part:
-                    beden, stok = part.split(' : ')
-                    beden = beden.strip()
-                    stok = stok.strip()
-                    
-                    # Referans beden değilse hesapla
-                    if beden != reference_beden:
-                        try:
-                            compare_value = int(stok)
-                            
-                            # Sadece stok değeri en az 10 olan bedenleri hesaplamaya dahil et
-                            if compare_value >= 10:
-                                # Yüzde hesapla: (referans - karşılaştırılan) / referans * 100
-                                if reference_value != 0:  # Sıfıra bölme kontrolü
-                                    percentage = ((reference_value - compare_value) / reference_value) * 100
-                                    percentages.append(percentage)
-                        except ValueError:
-                            continue
-            
-            # Ortalama yüzdeyi hesapla
-            if percentages:
-                average_percentage = sum(percentages) / len(percentages)
-                return round(average_percentage, 2)  # 2 ondalık basamağa yuvarla
-            else:
-                return None
-        
-        # Yeni kolonu ekle
-        df['SismeOrani'] = df['SatistaOlduguGunlerVeBedenlerinSatistakiStokAdetleri'].apply(calculate_sisme_percentage)
+        rules = rules or RULES
+        pairs = size_stock_pairs(df[STOCK_COLUMN])
+
+        # Satırdaki ilk geçerli referans beden (36 veya S) ve stoğu
+        is_reference = pairs['beden'].isin(rules.reference_sizes) & pairs['stok'].notna()
+        references = pairs[is_reference].groupby(level=0).first()
+        reference_beden = references['beden'].reindex(pairs.index)
+        reference_value = references['stok'].reindex(pairs.index)
+
+        # Diğer bedenlerle karşılaştır: (referans - karşılaştırılan) / referans * 100
+        compared = (
+            pairs['stok'].notna()
+            & (pairs['beden'] != reference_beden)
+            & (pairs['stok'] >= rules.min_compare_stock)
+            & reference_value.notna()
+            & (reference_value != 0)
+        )
+        percentages = (reference_value - pairs['stok'])[compared] / reference_value[compared] * 100
+
+        # Ortalama yüzde, 2 ondalık basamağa yuvarlanmış; karşılaştırma yoksa boş
+        df['SismeOrani'] = sequential_mean(percentages).map(lambda value: round(value, 2)).reindex(df.index)
         
-        print("✅ SismeOrani kolonu başarıyla eklendi!")
-        print(f"📊 Toplam {len(df)} satırdan {df['SismeOrani'].notna().sum()} satırda SismeOrani hesaplandı")
+        log.info("✅ SismeOrani kolonu başarıyla eklendi!")
+        log.info(f"📊 Toplam {len(df)} satırdan {df['SismeOrani'].notna().sum()} satırda SismeOrani hesaplandı")
         return df
         
     except Exception as e:
-        print(f"❌ SismeOrani hesaplama hatası: {str(e)}")
+        log.error(f"❌ SismeOrani hesaplama hatası: {str(e)}")
         return df
 
-def filter_sisme_orani(df: pd.DataFrame) -> pd.DataFrame:
+@measured("filter_sisme_orani", rows_in=True, rows_out=True)
+def filter_sisme_orani(df: pd.DataFrame, rules: RuleSet = None) -> pd.DataFrame:
     """
-    SismeOrani kolonunda 40'tan küçük değerleri olan satırları siler.
+    SismeOrani kolonunda alt sınırdan (varsayılan 40) küçük değerleri olan satırları siler.
     """
     try:
+        rules = rules or RULES
         initial_rows = len(df)
         
-        # SismeOrani kolonunda 40'tan küçük değerleri olan satırları sil
-        df = df[df['SismeOrani'] >= 40]
+        # SismeOrani kolonunda alt sınırdan küçük değerleri olan satırları sil
+        df = df[df['SismeOrani'] >= rules.min_ratio]
         
         final_rows = len(df)
         removed_rows = initial_rows - final_rows
         
-        print(f"✅ SismeOrani filtrelendi!")
-        print(f"📊 {removed_rows} satır silindi (40'tan küçük değerler)")
-        print(f"📊 Kalan satır: {final_rows}")
+        log.info("✅ SismeOrani filtrelendi!")
+        log.info(f"📊 {removed_rows} satır silindi ({rules.min_ratio}'tan küçük değerler)")
+        log.info(f"📊 Kalan satır: {final_rows}")
         
         return df
         
     except Exception as e:
-        print(f"❌ SismeOrani filtreleme hatası: {str(e)}")
+        log.error(f"❌ SismeOrani filtreleme hatası: {str(e)}")
         return df
 
+def supabase_configured() -> bool:
+    """Supabase bağlantı bilgileri tanımlı mı (satışa giriş tarihleri her çalışmada sorgulanır)."""
+    return bool(os.environ.get("SUPABASE_URL") and os.environ.get("SUPABASE_KEY"))
+
 def connect_supabase():
     """
     Supabase veritabanına bağlanır.
@@ -388,29 +1358,32 @@ def connect_supabase():
         # Supabase istemcisini oluştur
         supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
         
-        print("✅ Supabase veritabanına başarıyla bağlandı!")
+        log.info("✅ Supabase veritabanına başarıyla bağlandı!")
         return supabase
         
     except ImportError:
-        print("❌ Supabase kütüphanesi bulunamadı! 'pip install supabase' komutunu çalıştırın.")
+        log.error("❌ Supabase kütüphanesi bulunamadı! 'pip install supabase' komutunu çalıştırın.")
         return None
     except Exception as e:
-        print(f"❌ Supabase bağlantı hatası: {str(e)}")
+        log.error(f"❌ Supabase bağlantı hatası: {str(e)}")
         return None
 
+@measured("supabase_lookup", rows_in=True, rows_out=True)
 def get_satisa_girme_tarihi(df: pd.DataFrame, supabase) -> pd.DataFrame:
     """
     Supabase'den SatisaGirmeTarihi verilerini çeker ve yeni kolon olarak ekler.
+    Sorgu sonuçları LAUNCH_DATES_FILE'a da yazılır (simülasyon ağsız çalışır).
     """
     try:
         if supabase is None:
-            print("❌ Supabase bağlantısı bulunamadı!")
+            log.error("❌ Supabase bağlantısı bulunamadı!")
             return df
         
-        print("📊 SatisaGirmeTarihi verileri çekiliyor...")
+        log.info("📊 SatisaGirmeTarihi verileri çekiliyor...")
         
         # Yeni kolonu ekle
         df['SatisaGirmeTarihi'] = None
+        launch_dates = load_launch_dates()
         
         # Her StokKodu için veritabanında ara
         for index, row in df.iterrows():
@@ -424,83 +1397,99 @@ def get_satisa_girme_tarihi(df: pd.DataFrame, supabase) -> pd.DataFrame:
                     # İlk eşleşen kaydın SatisaGirmeTarihi'ni al
                     satisa_girme_tarihi = response.data[0]['SatisaGirmeTarihi']
                     df.at[index, 'SatisaGirmeTarihi'] = satisa_girme_tarihi
+                    launch_dates[str(stok_kodu)] = satisa_girme_tarihi
+                else:
+                    launch_dates[str(stok_kodu)] = None
                 
             except Exception as e:
-                print(f"⚠️ StokKodu {stok_kodu} için veri çekilemedi: {str(e)}")
+                log.warning(f"⚠️ StokKodu {stok_kodu} için veri çekilemedi: {str(e)}")
                 continue
         
+        save_launch_dates(launch_dates)
+        
         # Başarılı şekilde veri çekilen satır sayısını göster
         successful_rows = df['SatisaGirmeTarihi'].notna().sum()
-        print(f"✅ SatisaGirmeTarihi kolonu eklendi!")
-        print(f"📊 {successful_rows} satırda veri bulundu")
+        log.info("✅ SatisaGirmeTarihi kolonu eklendi!")
+        log.info(f"📊 {successful_rows} satırda veri bulundu")
         
         return df
         
     except Exception as e:
-        print(f"❌ SatisaGirmeTarihi çekme hatası: {str(e)}")
+        log.error(f"❌ SatisaGirmeTarihi çekme hatası: {str(e)}")
         return df
 
-def filter_recent_dates(df: pd.DataFrame) -> pd.DataFrame:
+def load_launch_dates() -> Dict[str, Any]:
+    """Önceki Supabase sorgularının {StokKodu: SatisaGirmeTarihi} önbelleğini döner."""
+    try:
+        with open(LAUNCH_DATES_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_launch_dates(launch_dates: Dict[str, Any]):
+    try:
+        with open(LAUNCH_DATES_FILE, "w", encoding="utf-8") as f:
+            json.dump(launch_dates, f, ensure_ascii=False)
+    except OSError as e:
+        log.warning(f"SatisaGirmeTarihi önbelleği kaydedilemedi: {e}")
+
+@measured("filter_recent_dates", rows_in=True, rows_out=True)
+def filter_recent_dates(df: pd.DataFrame, rules: RuleSet = None) -> pd.DataFrame:
     """
-    SatisaGirmeTarihi kolonunda son 5 gün içindeki tarihleri olan satırları siler.
+    SatisaGirmeTarihi kolonunda son 5 gün (launch_window_days) içindeki tarihleri olan satırları siler.
+    Tarihi olmayan veya okunamayan satırlar korunur.
     """
     try:
         from datetime import datetime, timedelta
         
+        rules = rules or RULES
         initial_rows = len(df)
         
-        # Bugünün tarihini al
-        today = datetime.now().date()
-        
-        # Son 5 günü hesapla
-        five_days_ago = today - timedelta(days=5)
+        # Son N günün başlangıcı
+        window_start = datetime.now().date() - timedelta(days=rules.launch_window_days)
         
-        # SatisaGirmeTarihi kolonundaki tarihleri kontrol et
-        rows_to_remove = []
+        def parse_launch_date(value):
+            """ISO ("2024-05-01T10:00:00Z") veya YYYY-MM-DD tarihi; okunamazsa None (satır korunur)."""
+            try:
+                if 'T' in value:
+                    return datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+                return datetime.strptime(value, '%Y-%m-%d').date()
+            except (ValueError, TypeError):
+                return None
         
-        for index, row in df.iterrows():
-            satisa_girme_tarihi = row['SatisaGirmeTarihi']
-            
-            if pd.notna(satisa_girme_tarihi) and isinstance(satisa_girme_tarihi, str):
-                try:
-                    # String tarihi datetime objesine çevir
-                    if 'T' in satisa_girme_tarihi:  # ISO format
-                        tarih = datetime.fromisoformat(satisa_girme_tarihi.replace('Z', '+00:00')).date()
-                    else:  # Diğer formatlar
-                        tarih = datetime.strptime(satisa_girme_tarihi, '%Y-%m-%d').date()
-                    
-                    # Son 5 gün içindeyse silinecek satırlara ekle
-                    if tarih >= five_days_ago:
-                        rows_to_remove.append(index)
-                        
-                except (ValueError, TypeError):
-                    # Tarih parse edilemiyorsa satırı koru
-                    continue
+        # Her farklı tarih metni bir kez çözülür (aynı gün satışa giren ürünler tek değer paylaşır)
+        dates = df['SatisaGirmeTarihi']
+        texts = dates[dates.map(lambda value: isinstance(value, str))]
+        parsed = {text: parse_launch_date(text) for text in texts.unique()}
+        recent_texts = {text for text, date in parsed.items() if date is not None and date >= window_start}
         
-        # Son 5 gün içindeki satırları sil
-        if rows_to_remove:
-            df = df.drop(rows_to_remove)
-            df = df.reset_index(drop=True)
+        # Son N gün içindeki satırları sil
+        recent = dates.isin(recent_texts)
+        if recent.any():
+            df = df[~recent].reset_index(drop=True)
         
         final_rows = len(df)
         removed_rows = initial_rows - final_rows
         
-        print(f"✅ Son 5 gün içindeki tarihler filtrelendi!")
-        print(f"📊 {removed_rows} satır silindi (son 5 gün içindeki tarihler)")
-        print(f"📊 Kalan satır: {final_rows}")
+        log.info(f"✅ Son {rules.launch_window_days} gün içindeki tarihler filtrelendi!")
+        log.info(f"📊 {removed_rows} satır silindi (son {rules.launch_window_days} gün içindeki tarihler)")
+        log.info(f"📊 Kalan satır: {final_rows}")
         
         return df
         
     except Exception as e:
-        print(f"❌ Tarih filtreleme hatası: {str(e)}")
+        log.error(f"❌ Tarih filtreleme hatası: {str(e)}")
         return df
 
-def clean_beden_names(df: pd.DataFrame) -> pd.DataFrame:
+@measured("clean_beden_names", rows_in=True, rows_out=True)
+def clean_beden_names(df: pd.DataFrame, rules: RuleSet = None) -> pd.DataFrame:
     """
-    SatistaOlduguGunlerVeBedenlerinSatistakiStokAdetleri kolonunda S ve 36 bedenlerini temizler.
-    Sadece beden adını bırakır.
+    SatistaOlduguGunlerVeBedenlerinSatistakiStokAdetleri kolonunda S ve 36 bedenlerini
+    (referans bedenler) temizler. Sadece beden adını bırakır.
     """
     try:
+        reference_sizes = set((rules or RULES).reference_sizes)
+
         def clean_beden_stok_str(beden_stok_str):
             if pd.isna(beden_stok_str) or not isinstance(beden_stok_str, str):
                 return beden_stok_str
@@ -516,7 +1505,7 @@ def clean_beden_names(df: pd.DataFrame) -> pd.DataFrame:
                     stok = stok.strip()
                     
                     # S veya 36 bedenlerini sadece beden adı olarak bırak
-                    if beden == 'S' or beden == '36':
+                    if beden in reference_sizes:
                         updated_part = beden
                     else:
                         # Diğer bedenler için orijinal formatı koru
@@ -531,21 +1520,25 @@ def clean_beden_names(df: pd.DataFrame) -> pd.DataFrame:
         # Beden stok kolonunu güncelle
         df['SatistaOlduguGunlerVeBedenlerinSatistakiStokAdetleri'] = df['SatistaOlduguGunlerVeBedenlerinSatistakiStokAdetleri'].apply(clean_beden_stok_str)
         
-        print("✅ S ve 36 bedenleri temizlendi!")
+        log.info("✅ S ve 36 bedenleri temizlendi!")
         return df
         
     except Exception as e:
-        print(f"❌ Beden temizleme hatası: {str(e)}")
+        log.error(f"❌ Beden temizleme hatası: {str(e)}")
         return df
 
-def calculate_varyant_fiyati(df: pd.DataFrame) -> pd.DataFrame:
+@measured("calculate_varyant_fiyati", rows_in=True, rows_out=True)
+def calculate_varyant_fiyati(df: pd.DataFrame, rules: RuleSet = None) -> pd.DataFrame:
     """
     VaryantFiyati kolonunu ekler ve SismeOrani'na göre fiyat hesaplaması yapar.
-    SismeOrani 40-70 arası: %15 indirim
-    SismeOrani 70+ : %20 indirim
+    Varsayılan kademeler (discount_tiers):
+    SismeOrani 40-70 arası: ×0.75
+    SismeOrani 70+ : ×0.70
     Sonuç yuvarlama kodu ile yuvarlanır.
     """
     try:
+        rules = rules or RULES
+        
         def round_price(price):
             """
             Fiyat yuvarlama kodu - JavaScript'ten Python'a çevrildi
@@ -592,101 +1585,104 @@ def calculate_varyant_fiyati(df: pd.DataFrame) -> pd.DataFrame:
             
             return closest_target
         
-        def calculate_discounted_price(row):
-            sisme_orani = row['SismeOrani']
-            guncel_fiyat = row['GuncelSatisFiyati']
-            
-            if pd.isna(sisme_orani) or pd.isna(guncel_fiyat):
-                return None
-            
+        def parse_price(value):
+            """Fiyatı float() ile sayıya çevirir (virgül ondalık ayracı olabilir); olmazsa NaN."""
+            if isinstance(value, str):
+                value = value.replace(',', '.')
             try:
-                # Fiyatı sayıya çevir
-                if isinstance(guncel_fiyat, str):
-                    # Virgülü nokta ile değiştir
-                    guncel_fiyat = guncel_fiyat.replace(',', '.')
-                
-                fiyat = float(guncel_fiyat)
-                
-                # SismeOrani'na göre indirim uygula
-                if 40 <= sisme_orani <= 70:
-                    # %15 indirim
-                    indirimli_fiyat = fiyat * 0.75
-                elif sisme_orani > 70:
-                    # %20 indirim
-                    indirimli_fiyat = fiyat * 0.70
-                else:
-                    # İndirim yok
-                    indirimli_fiyat = fiyat
-                
-                # Yuvarlama kodu ile yuvarla
-                final_price = round_price(indirimli_fiyat)
-                return final_price
-                
+                return float(value)
             except (ValueError, TypeError):
-                return None
+                return float('nan')
         
-        # Yeni kolonu ekle
-        df['VaryantFiyati'] = df.apply(calculate_discounted_price, axis=1)
+        fiyat = df['GuncelSatisFiyati'].map(parse_price).astype(float)
+        
+        # SismeOrani'na göre kademe çarpanını uygula (kademe yoksa indirim yok)
+        indirimli_fiyat = fiyat * rules.multipliers(df['SismeOrani'])
+        hesaplanabilir = fiyat.notna() & df['SismeOrani'].notna()
+        
+        # Yeni kolonu ekle, yuvarlama kodu ile yuvarla
+        df['VaryantFiyati'] = [
+            round_price(price) if ok else None
+            for price, ok in zip(indirimli_fiyat, hesaplanabilir)
+        ]
         
         # İstatistikleri göster
         total_rows = len(df)
         calculated_rows = df['VaryantFiyati'].notna().sum()
         
-        print("✅ VaryantFiyati kolonu başarıyla eklendi!")
-        print(f"�� Toplam {total_rows} satırdan {calculated_rows} satırda fiyat hesaplandı")
+        log.info("✅ VaryantFiyati kolonu başarıyla eklendi!")
+        log.info(f"�� Toplam {total_rows} satırdan {calculated_rows} satırda fiyat hesaplandı")
         
         return df
         
     except Exception as e:
-        print(f"❌ VaryantFiyati hesaplama hatası: {str(e)}")
+        log.error(f"❌ VaryantFiyati hesaplama hatası: {str(e)}")
         return df
 
 
+# ─────────── MAĞAZA ───────────
+# Mağazaya özgü feed anahtarları ve admin ID'leri. Varsayılanlar Haydigiy mağazasıdır;
+# çoklu mağaza çalıştırıcısı (stores komutu) her profil için bunları ortamdan verir.
+STORE_BASE_URL       = os.environ.get("ADMIN_BASE_URL", "https://www.siparis.haydigiy.com").rstrip("/")
+PRODUCT_FEED_TOKEN   = os.environ.get("PRODUCT_FEED_TOKEN", "2XO5DS")   # Ürün/stok feed'i
+PRODUCT_FEED_PAGES   = int(os.environ.get("PRODUCT_FEED_PAGES", "3"))
+ORDER_FEED_TOKEN     = os.environ.get("ORDER_FEED_TOKEN", "T6PPZN")     # Sipariş Excel'i
+DISCOUNT_FEED_TOKEN  = os.environ.get("DISCOUNT_FEED_TOKEN", "NE6ZAB")  # Şu an indirimde olan ürünler
+DISCOUNT_TAG_ID      = os.environ.get("DISCOUNT_TAG_ID", "241")         # S Bedeni İndirimli Ürünler
+DISCOUNT_CATEGORY_ID = os.environ.get("DISCOUNT_CATEGORY_ID", "632")
+STORE_NAME           = os.environ.get("STORE_NAME", "")                # stores komutunun verdiği profil adı
+# ──────────────────────────────
+
+# İşlenecek linkler
+XML_FEED_URLS = [
+    f"{STORE_BASE_URL}/FaprikaXml/{PRODUCT_FEED_TOKEN}/{page}/"
+    for page in range(1, PRODUCT_FEED_PAGES + 1)
+]
+
 def process_xml_data():
     """XML verilerini işler ve Excel dosyasına kaydeder."""
-    # İşlenecek linkler
-    urls = [
-        "https://www.siparis.haydigiy.com/FaprikaXml/2XO5DS/1/",
-        "https://www.siparis.haydigiy.com/FaprikaXml/2XO5DS/2/",
-        "https://www.siparis.haydigiy.com/FaprikaXml/2XO5DS/3/"
-    ]
+    urls = XML_FEED_URLS
     
-    all_products = []
+    pages = []
     
-    print("XML verileri indiriliyor...")
-    print("=" * 50)
+    log.info("XML verileri indiriliyor...")
+    log.info("=" * 50)
     
-    # Her linki sırayla işle
+    # Her linki sırayla indir
     for i, url in enumerate(urls, 1):
-        print(f"\n{i}. Link işleniyor...")
+        log.info(f"{i}. Link indiriliyor...")
         try:
-            xml_content = get_xml_data(url)
-            products = parse_xml_products(xml_content)
-            all_products.extend(products)
-            print(f"{len(products)} ürün bulundu")
+            pages.append(fetch_source(url, get_xml_data))
         except Exception as e:
-            print(f"Link işlenemedi: {url} - Hata: {str(e)}")
+            log.error(f"Link işlenemedi: {url} - Hata: {str(e)}")
             continue
     
-    print("\n" + "=" * 50)
-    print(f"Toplam {len(all_products)} ürün verisi toplandı")
+    # Sayfaları süreç havuzunda ayrıştır
+    products_df = parse_feed_pages(pages)
+    
+    log.info("=" * 50)
+    log.info(f"Toplam {len(products_df)} ürün verisi toplandı")
+    
+    if not len(products_df):
+        log.error("Hiç ürün verisi bulunamadı!")
+        return False
+    
+    # Süzülmemiş veriyi simülasyon için sakla (kurallar değişince feed tekrar indirilmez)
+    products_df.to_pickle(RAW_PRODUCTS_FILE)
     
     # Filtreleme işlemi
-    print("\nÜrünler filtreleniyor...")
-    filtered_products = filter_products(all_products)
-    print(f"Filtreleme sonrası {len(filtered_products)} ürün kaldı")
+    log.info("Ürünler filtreleniyor...")
+    df = filter_products(products_df)
+    log.info(f"Filtreleme sonrası {len(df)} ürün kaldı")
     
-    if filtered_products:
-        # DataFrame oluştur
-        df = pd.DataFrame(filtered_products)
-        
+    if len(df):
         # Excel dosyasına kaydet
         excel_filename = "urun_verileri.xlsx"
         df.to_excel(excel_filename, index=False, engine='openpyxl')
-        print(f"\nVeriler başarıyla '{excel_filename}' dosyasına kaydedildi!")
+        log.info(f"Veriler başarıyla '{excel_filename}' dosyasına kaydedildi!")
         return True
     else:
-        print("Hiç ürün verisi bulunamadı!")
+        log.error("Hiç ürün verisi bulunamadı!")
         return False
 
 
@@ -713,6 +1709,7 @@ def process_xml_data():
 
 # Excel işleme fonksiyonları
 
+@measured("download_excel_file")
 def download_excel_file(url: str, max_retries: int = 10) -> bytes:
     """
     Belirtilen URL'den Excel dosyasını indirir.
@@ -720,36 +1717,38 @@ def download_excel_file(url: str, max_retries: int = 10) -> bytes:
     """
     for attempt in range(max_retries):
         try:
-            print(f"Excel dosyası indiriliyor: {url} (Deneme {attempt + 1})")
+            log.info(f"Excel dosyası indiriliyor: {url} (Deneme {attempt + 1})")
             response = requests.get(url, timeout=9999)
+            METRICS.add_http(len(response.content))
             response.raise_for_status()
             
             # İndirilen içeriği kontrol et
             content = response.content
-            print(f"İndirilen dosya boyutu: {len(content)} bytes")
+            log.info(f"İndirilen dosya boyutu: {len(content)} bytes")
             
             # Excel dosyası olup olmadığını kontrol et (ZIP dosyası başlangıcı)
             if content.startswith(b'PK'):
-                print(f"Excel dosyası başarıyla indirildi! (ZIP formatı doğrulandı)")
+                log.info("Excel dosyası başarıyla indirildi! (ZIP formatı doğrulandı)")
                 return content
             else:
-                print(f"İndirilen dosya Excel formatında değil. İçerik başlangıcı: {content[:50]}")
+                log.warning(f"İndirilen dosya Excel formatında değil. İçerik başlangıcı: {content[:50]}")
                 if attempt < max_retries - 1:
-                    print("5 saniye bekleniyor...")
+                    log.info("5 saniye bekleniyor...")
                     time.sleep(5)
                     continue
                 else:
                     raise Exception("İndirilen dosya geçerli bir Excel dosyası değil")
                     
         except Exception as e:
-            print(f"Hata (Deneme {attempt + 1}): {url} - {str(e)}")
+            log.warning(f"Hata (Deneme {attempt + 1}): {url} - {str(e)}")
             if attempt < max_retries - 1:
-                print("5 saniye bekleniyor...")
+                log.info("5 saniye bekleniyor...")
                 time.sleep(5)
             else:
-                print(f"Maksimum deneme sayısına ulaşıldı: {url}")
+                log.info(f"Maksimum deneme sayısına ulaşıldı: {url}")
                 raise e
 
+@measured("process_excel_data", rows_out=True)
 def process_excel_data(excel_content: bytes) -> pd.DataFrame:
     """
     Excel içeriğini işler ve gerekli kolonları filtreler.
@@ -757,10 +1756,10 @@ def process_excel_data(excel_content: bytes) -> pd.DataFrame:
     try:
         # BytesIO ile Excel dosyasını oku
         df = pd.read_excel(BytesIO(excel_content), engine='openpyxl')
-        print(f"Excel dosyası okundu. Toplam {len(df)} satır ve {len(df.columns)} kolon bulundu.")
+        log.info(f"Excel dosyası okundu. Toplam {len(df)} satır ve {len(df.columns)} kolon bulundu.")
         
         # Mevcut kolonları göster
-        print(f"Mevcut kolonlar: {list(df.columns)}")
+        log.info(f"Mevcut kolonlar: {list(df.columns)}")
         
         # Sadece gerekli kolonları tut
         required_columns = ['StokKodu', 'Adet', 'Varyant']
@@ -768,26 +1767,26 @@ def process_excel_data(excel_content: bytes) -> pd.DataFrame:
         # Eksik kolonları kontrol et
         missing_columns = [col for col in required_columns if col not in df.columns]
         if missing_columns:
-            print(f"Uyarı: Eksik kolonlar: {missing_columns}")
-            print("Mevcut kolonlardan benzer olanları arayalım...")
+            log.warning(f"Uyarı: Eksik kolonlar: {missing_columns}")
+            log.info("Mevcut kolonlardan benzer olanları arayalım...")
             
             # Benzer kolon isimlerini ara
             for missing_col in missing_columns:
                 similar_cols = [col for col in df.columns if missing_col.lower() in col.lower() or col.lower() in missing_col.lower()]
                 if similar_cols:
-                    print(f"'{missing_col}' için benzer kolonlar: {similar_cols}")
+                    log.info(f"'{missing_col}' için benzer kolonlar: {similar_cols}")
             
             return pd.DataFrame()
         
         # Sadece gerekli kolonları seç
         df_filtered = df[required_columns].copy()
-        print(f"Filtreleme sonrası {len(df_filtered)} satır kaldı.")
+        log.info(f"Filtreleme sonrası {len(df_filtered)} satır kaldı.")
         
         return df_filtered
         
     except Exception as e:
-        print(f"Excel işleme hatası: {str(e)}")
-        print(f"Hata detayı: {type(e).__name__}")
+        log.error(f"Excel işleme hatası: {str(e)}")
+        log.error(f"Hata detayı: {type(e).__name__}")
         return pd.DataFrame()
 
 def add_etopla_adet_column(df: pd.DataFrame) -> pd.DataFrame:
@@ -822,11 +1821,11 @@ def add_etopla_adet_column(df: pd.DataFrame) -> pd.DataFrame:
         # Geçici kolonu sil
         df = df.drop('Adet_Numeric', axis=1)
         
-        print("EtoplaAdet kolonu başarıyla eklendi.")
+        log.info("EtoplaAdet kolonu başarıyla eklendi.")
         return df
         
     except Exception as e:
-        print(f"EtoplaAdet kolonu ekleme hatası: {str(e)}")
+        log.error(f"EtoplaAdet kolonu ekleme hatası: {str(e)}")
         return df
 
 def add_stok_kodu_duzenlenmis_column(df: pd.DataFrame) -> pd.DataFrame:
@@ -853,11 +1852,11 @@ def add_stok_kodu_duzenlenmis_column(df: pd.DataFrame) -> pd.DataFrame:
         # Yeni kolonu ekle
         df['StokKoduDuzenlenmis'] = df['StokKodu'].apply(clean_stok_kodu)
         
-        print("StokKoduDuzenlenmis kolonu başarıyla eklendi.")
+        log.info("StokKoduDuzenlenmis kolonu başarıyla eklendi.")
         return df
         
     except Exception as e:
-        print(f"StokKoduDuzenlenmis kolonu ekleme hatası: {str(e)}")
+        log.error(f"StokKoduDuzenlenmis kolonu ekleme hatası: {str(e)}")
         return df
 
 def clean_varyant_column(df: pd.DataFrame) -> pd.DataFrame:
@@ -878,11 +1877,11 @@ def clean_varyant_column(df: pd.DataFrame) -> pd.DataFrame:
         # Varyant kolonunu temizle
         df['Varyant'] = df['Varyant'].apply(clean_varyant)
         
-        print("Varyant kolonu temizlendi.")
+        log.info("Varyant kolonu temizlendi.")
         return df
         
     except Exception as e:
-        print(f"Varyant kolonu temizleme hatası: {str(e)}")
+        log.error(f"Varyant kolonu temizleme hatası: {str(e)}")
         return df
 
 def remove_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -897,14 +1896,14 @@ def remove_columns(df: pd.DataFrame) -> pd.DataFrame:
         existing_columns = [col for col in columns_to_remove if col in df.columns]
         if existing_columns:
             df = df.drop(columns=existing_columns, axis=1)
-            print(f"Kolonlar silindi: {existing_columns}")
+            log.info(f"Kolonlar silindi: {existing_columns}")
         else:
-            print("Silinecek kolon bulunamadı.")
+            log.info("Silinecek kolon bulunamadı.")
         
         return df
         
     except Exception as e:
-        print(f"Kolon silme hatası: {str(e)}")
+        log.error(f"Kolon silme hatası: {str(e)}")
         return df
 
 def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
@@ -919,67 +1918,69 @@ def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
         removed_rows = initial_rows - final_rows
         
         if removed_rows > 0:
-            print(f"Tekrarlanan {removed_rows} satır kaldırıldı.")
+            log.info(f"Tekrarlanan {removed_rows} satır kaldırıldı.")
         else:
-            print("Tekrarlanan satır bulunamadı.")
+            log.info("Tekrarlanan satır bulunamadı.")
         
         return df
         
     except Exception as e:
-        print(f"Tekrarlanan satır kaldırma hatası: {str(e)}")
+        log.error(f"Tekrarlanan satır kaldırma hatası: {str(e)}")
         return df
 
+# İndirilecek Excel dosyası URL'i
+ORDER_XLS_URL = f"{STORE_BASE_URL}/FaprikaOrderXls/{ORDER_FEED_TOKEN}/1/"
+
 def process_excel_data_from_url():
     """Excel dosyasını indirir ve işler."""
-    # İndirilecek Excel dosyası URL'i
-    url = "https://www.siparis.haydigiy.com/FaprikaOrderXls/T6PPZN/1/"
+    url = ORDER_XLS_URL
     
-    print("Excel işleme programı başlatılıyor...")
-    print("=" * 60)
+    log.info("Excel işleme programı başlatılıyor...")
+    log.info("=" * 60)
     
     try:
         # 1. Excel dosyasını indir
-        print("\n1. Excel dosyası indiriliyor...")
-        excel_content = download_excel_file(url)
+        log.info("1. Excel dosyası indiriliyor...")
+        excel_content = fetch_source(url, download_excel_file)
         
         # 2. Excel verilerini işle ve filtrele
-        print("\n2. Excel verileri işleniyor...")
+        log.info("2. Excel verileri işleniyor...")
         df = process_excel_data(excel_content)
         
         if df.empty:
-            print("Excel verisi işlenemedi!")
+            log.error("Excel verisi işlenemedi!")
             return False
         
         # 3. EtoplaAdet kolonunu ekle
-        print("\n3. EtoplaAdet kolonu ekleniyor...")
+        log.info("3. EtoplaAdet kolonu ekleniyor...")
         df = add_etopla_adet_column(df)
         
         # 4. StokKoduDuzenlenmis kolonunu ekle
-        print("\n4. StokKoduDuzenlenmis kolonu ekleniyor...")
+        log.info("4. StokKoduDuzenlenmis kolonu ekleniyor...")
         df = add_stok_kodu_duzenlenmis_column(df)
         
         # 5. Varyant kolonunu temizle
-        print("\n5. Varyant kolonu temizleniyor...")
+        log.info("5. Varyant kolonu temizleniyor...")
         df = clean_varyant_column(df)
         
         # 6. Gereksiz kolonları sil
-        print("\n6. Gereksiz kolonlar siliniyor...")
+        log.info("6. Gereksiz kolonlar siliniyor...")
         df = remove_columns(df)
         
         # 7. Tekrarlanan satırları kaldır
-        print("\n7. Tekrarlanan satırlar kaldırılıyor...")
+        log.info("7. Tekrarlanan satırlar kaldırılıyor...")
         df = remove_duplicates(df)
         
         # 8. Sonucu Excel olarak kaydet
-        print("\n8. Sonucu Excel olarak kaydediliyor...")
+        log.info("8. Sonucu Excel olarak kaydediliyor...")
         output_filename = "islenmis_veriler.xlsx"
         df.to_excel(output_filename, index=False, engine='openpyxl')
         
-        print(f"Excel verileri başarıyla '{output_filename}' dosyasına kaydedildi!")
+        log.info(f"Excel verileri başarıyla '{output_filename}' dosyasına kaydedildi!")
         return True
         
     except Exception as e:
-        print(f"\n❌ Excel işleme hatası: {str(e)}")
+        log.error(f"❌ Excel işleme hatası: {str(e)}")
         return False
 
 
@@ -1006,13 +2007,85 @@ USER   = os.environ.get("HAYDIGIY_USER")
 PASSWD = os.environ.get("HAYDIGIY_PASS")
 # ────────────────────────────────────────
 
+# ─────────── OTURUM DEPOSU ───────────
+# Oturum yalnızca SESSION_STORE_KEY verilmişse saklanır (admin şifresi anahtar olarak kullanılmaz).
+SESSION_FILE           = os.environ.get("SESSION_FILE", "admin_session.bin")
+SESSION_STORE_KEY      = os.environ.get("SESSION_STORE_KEY", "")
+SESSION_MAX_AGE        = 12 * 60 * 60  # Çerezde süre yoksa 12 saat geçerli say
+SESSION_SALT_BYTES     = 16            # Dosyanın başında saklanan rastgele tuz
+SESSION_KDF_ITERATIONS = 480_000       # PBKDF2-HMAC-SHA256 tur sayısı
+# ─────────────────────────────────────
+
 # ─────────── URL'LER ───────────
-BASE_URL     = "https://www.siparis.haydigiy.com"
+# ADMIN_BASE_URL ile yerel sahte panele (benchmarks/mock_admin.py) yönlendirilebilir
+BASE_URL     = STORE_BASE_URL
 LOGIN_URL    = f"{BASE_URL}/kullanici-giris/?ReturnUrl=%2Fadmin"
 BULKEDIT_URL = f"{BASE_URL}/admin/product/bulkedit/"
-XML_URL = "https://www.siparis.haydigiy.com/FaprikaXml/NE6ZAB/1/"
+XML_URL = f"{BASE_URL}/FaprikaXml/{DISCOUNT_FEED_TOKEN}/1/"
 # ───────────────────────────────
 
+# İndirim fiyatı yazılan kombinasyonlar
+TARGET_COMBINATION_TEXTS = ["Beden: S", "Beden: 36"]
+PLAN_FILE = "degisiklik_plani.json"
+RESET_PLAN_FILE = "sifirlama_plani.json"  # reset komutunun planı (degisiklik_plani.json'u ezmez)
+CURRENT_STATE_FILE = "mevcut_durum.json"  # Son canlı okumadaki kombinasyonlar (plan modu için)
+BULK_UPDATE_TIMEOUT = 300  # Toplu güncelleme isteği için en fazla bekleme (saniye)
+
+# ─────────── TEKRAR DENEME ───────────
+# REPLAY_DEAD_LETTER=1 ile sadece dead-letter görevleri tekrar oynatılır
+RETRY_MAX_ATTEMPTS = int(os.environ.get("RETRY_MAX_ATTEMPTS", "3"))
+RETRY_BASE_DELAY   = float(os.environ.get("RETRY_BASE_DELAY", "5"))
+DEAD_LETTER_FILE   = os.environ.get("DEAD_LETTER_FILE", "basarisiz_islemler.jsonl")
+REPLAY_DEAD_LETTER = os.environ.get("REPLAY_DEAD_LETTER", "0") == "1"
+# ─────────────────────────────────────
+
+# ─────────── TARAYICI YAŞAM DÖNGÜSÜ ───────────
+DRIVER_MAX_PAGES          = int(os.environ.get("DRIVER_MAX_PAGES", "400"))
+DRIVER_MAX_MEMORY_MB      = int(os.environ.get("DRIVER_MAX_MEMORY_MB", "1500"))
+DRIVER_MEMORY_CHECK_EVERY = 25  # Bellek kaç sayfada bir ölçülür
+# ──────────────────────────────────────────────
+
+# ─────────── İŞLEM GÜNLÜĞÜ ───────────
+# RESUME=1 ile yarım kalan son çalışmaya devam edilir
+JOURNAL_FILE = os.environ.get("JOURNAL_FILE", "islem_gunlugu.jsonl")
+RESUME       = os.environ.get("RESUME", "0") == "1"
+# ─────────────────────────────────────
+
+# ─────────── ÖNCEKİ ÇALIŞMA ───────────
+# Her uygulamadan sonra ürün bazında sonuç (seçildi mi, SismeOrani, VaryantFiyati,
+# kombinasyon ID) SNAPSHOT_FILE'a yazılır. Sonraki çalışmada bu ürünler canlı okunmaz;
+# sadece yeni, fiyatı değişen ve indirimden çıkan ürünlere dokunulur.
+# SNAPSHOT=0 ile kapatılır. Her ürün kaydı son canlı okuma veya başarılı yazma zamanını
+# (verified_ts) taşır; SNAPSHOT_MAX_AGE_HOURS'tan eski ürün kaydı kullanılmaz, canlı okunur.
+SNAPSHOT_ENABLED       = os.environ.get("SNAPSHOT", "1") != "0"
+SNAPSHOT_FILE          = os.environ.get("SNAPSHOT_FILE", "onceki_calisma.json")
+SNAPSHOT_MAX_AGE_HOURS = float(os.environ.get("SNAPSHOT_MAX_AGE_HOURS", "72"))
+# ──────────────────────────────────────
+
+# ─────────── KOMBİNASYON İNDEKSİ ───────────
+# Ürünlerin kombinasyon ID'leri çalışmalar arasında saklanır (bkz. CombinationIndex)
+COMBINATION_INDEX_FILE = os.environ.get("COMBINATION_INDEX_FILE", "kombinasyon_indeksi.json")
+# ───────────────────────────────────────────
+
+# ─────────── TARAYICI PERFORMANS PROFİLİ ───────────
+# DRIVER_PERFORMANCE_PROFILE=0 ile kapatılabilir
+DRIVER_PERFORMANCE_PROFILE = os.environ.get("DRIVER_PERFORMANCE_PROFILE", "1") != "0"
+BLOCKED_URL_PATTERNS = [
+    # Görseller
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    # Fontlar
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    # Medya
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav",
+    # Üçüncü parti (analitik, reklam, sohbet)
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*facebook.com/tr*", "*hotjar.com*", "*yandex.ru*",
+    "*clarity.ms*", "*tiktok.com*", "*criteo.com*", "*fonts.googleapis.com*",
+    "*fonts.gstatic.com*",
+]
+# ───────────────────────────────────────────────────
+
+@measured("get_xml_product_ids", rows_out=True)
 def get_xml_product_ids():
     """XML verisini alır ve ürün ID'lerini döndürür."""
     max_retries = 10
@@ -1020,67 +2093,261 @@ def get_xml_product_ids():
     
     while retry_count < max_retries:
         try:
-            print(f"XML verisi alınıyor... (Deneme {retry_count + 1})")
+            log.debug(f"XML verisi alınıyor... (Deneme {retry_count + 1})")
             response = requests.get(XML_URL, timeout=9999)
+            METRICS.add_http(len(response.content))
             
             if response.status_code == 200:
-                print("XML verisi başarıyla alındı!")
+                log.debug("XML verisi başarıyla alındı!")
                 xml_content = response.text
                 
-                # XML'i parse et
-                root = ET.fromstring(xml_content)
-                
-                # Tüm ürün ID'lerini bul
-                product_ids = []
-                
-                # Namespace ile birlikte arama yap
-                for item in root.findall('.//item'):
-                    # Önce namespace ile dene
-                    product_id = item.find('{http://base.google.com/ns/1.0}id')
-                    if product_id is not None and product_id.text:
-                        product_ids.append(product_id.text)
-                        continue
-                    
-                    # Namespace olmadan da dene
-                    product_id = item.find('g:id')
-                    if product_id is not None and product_id.text:
-                        product_ids.append(product_id.text)
-                        continue
-                    
-                    # Direkt id olarak da dene
-                    product_id = item.find('id')
-                    if product_id is not None and product_id.text:
-                        product_ids.append(product_id.text)
-                        continue
+                # Tüm ürün ID'lerini bul (g:id, yoksa id)
+                product_ids = parse_item_ids(xml_content)
                 
-                # Debug için XML içeriğini yazdır
-                print("XML içeriği:")
-                print(xml_content[:500] + "..." if len(xml_content) > 500 else xml_content)
-                
-                print(f"Bulunan item sayısı: {len(root.findall('.//item'))}")
-                for item in root.findall('.//item'):
-                    print(f"Item içeriği: {ET.tostring(item, encoding='unicode')[:200]}...")
+                # Debug için XML içeriğini yazdır (DEBUG kapalıyken item'lar serileştirilmez)
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("XML içeriği:")
+                    log.debug(xml_content[:500] + "..." if len(xml_content) > 500 else xml_content)
+
+                    items = ET.fromstring(xml_content).findall('.//item')
+                    log.debug(f"Bulunan item sayısı: {len(items)}")
+                    for item in items:
+                        log.debug(f"Item içeriği: {ET.tostring(item, encoding='unicode')[:200]}...")
                 
-                print(f"Toplam {len(product_ids)} ürün ID'si bulundu.")
+                log.info(f"Toplam {len(product_ids)} ürün ID'si bulundu.")
                 return product_ids
                 
             else:
-                print(f"HTTP Hatası: {response.status_code}")
+                log.warning(f"HTTP Hatası: {response.status_code}")
                 retry_count += 1
                 
         except Exception as e:
-            print(f"XML alma hatası: {e}")
+            log.warning(f"XML alma hatası: {e}")
             retry_count += 1
             
         if retry_count < max_retries:
-            print("5 saniye bekleniyor...")
+            log.debug("5 saniye bekleniyor...")
             time.sleep(5)
     
-    print("Maksimum deneme sayısına ulaşıldı. XML verisi alınamadı.")
+    log.error("Maksimum deneme sayısına ulaşıldı. XML verisi alınamadı.")
     return []
 
+class AdaptiveRateController:
+    """
+    Admin paneline giden tüm istekler (Selenium ve HTTP) için ortak hız kontrolü.
+    İstekler tek tarayıcı ve tek HTTP oturumundan sırayla gider; kontrolcü yalnızca
+    istekler arasındaki aralığı ayarlar. Gecikme ve hata oranını izler; panel sağlıklıyken
+    hızı yavaşça artırır (toplamsal), 429/5xx, hata veya yavaşlamada hızla düşürür
+    (çarpımsal). HTTP isteklerinde durum kodu yanıttan, tarayıcıda Navigation Timing
+    API'sinden (responseStatus) gelir; tarayıcı bunu vermiyorsa sadece gecikme ve
+    istisnalar dikkate alınır.
+    """
+
+    def __init__(self, initial_rate=2.0, min_rate=0.2, max_rate=10.0, slow_factor=2.5, increase_every=20):
+        self.rate = min(max_rate, max(min_rate, initial_rate))
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.slow_factor = slow_factor
+        self.increase_every = increase_every
+
+        self.latency_ewma = None
+        self.baseline_latency = None
+        self.requests = 0
+        self.errors = 0
+        self._healthy_streak = 0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Sıradaki hız dilimine kadar bekler."""
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._next_slot - now)
+            self._next_slot = max(now, self._next_slot) + 1.0 / self.rate
+
+        if delay > 0:
+            time.sleep(delay)
+
+    def record(self, latency, ok=True, status=None):
+        """Bir isteğin sonucunu kaydeder ve hızı buna göre ayarlar."""
+        with self._lock:
+            self.requests += 1
+            self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+            if self.baseline_latency is None or self.latency_ewma < self.baseline_latency:
+                self.baseline_latency = self.latency_ewma
+
+            throttled = status is not None and (status == 429 or status >= 500)
+            if not ok or throttled:
+                self.errors += 1
+                self._back_off(0.5)
+            elif latency > max(self.slow_factor * self.baseline_latency, self.baseline_latency + 0.2):
+                # Belirgin yavaşlama (çok kısa isteklerdeki gürültü sayılmaz)
+                self._back_off(0.8)
+            else:
+                self._healthy_streak += 1
+                if self._healthy_streak >= self.increase_every:
+                    self._healthy_streak = 0
+                    self.rate = min(self.max_rate, self.rate + 0.5)
+
+    def _back_off(self, factor):
+        self._healthy_streak = 0
+        self.rate = max(self.min_rate, self.rate * factor)
+        if factor <= 0.5:
+            # Yeni hız hemen geçerli olsun
+            self._next_slot = time.monotonic() + 1.0 / self.rate
+
+    @contextmanager
+    def request(self):
+        """Tek bir admin isteğini hız kontrolü altında çalıştırır ve sonucunu kaydeder."""
+        self.acquire()
+        start = time.monotonic()
+        outcome = {'ok': True, 'status': None}
+        try:
+            yield outcome
+        except Exception:
+            outcome['ok'] = False
+            raise
+        finally:
+            self.record(time.monotonic() - start, ok=outcome['ok'], status=outcome['status'])
+
+    def snapshot(self):
+        """Anlık hız, gecikme ve hata oranını döner."""
+        with self._lock:
+            return {
+                'rate_per_sec': round(self.rate, 2),
+                'latency_ms': round((self.latency_ewma or 0) * 1000, 1),
+                'requests': self.requests,
+                'error_rate': round(self.errors / self.requests, 4) if self.requests else 0.0,
+            }
+
+ADMIN_RATE = AdaptiveRateController(
+    initial_rate=float(os.environ.get("ADMIN_RATE_INITIAL", "2")),
+    max_rate=float(os.environ.get("ADMIN_RATE_MAX", "10")),
+)
+
+def navigation_status(drv):
+    """Son yüklenen sayfanın HTTP durum kodu (Navigation Timing responseStatus); yoksa None."""
+    try:
+        status = drv.execute_script("""
+            var entry = performance.getEntriesByType('navigation')[0];
+            return entry && entry.responseStatus ? entry.responseStatus : null;
+        """)
+    except Exception:
+        return None
+    return status if isinstance(status, int) else None
+
+def admin_get(drv, url):
+    """Tarayıcıyı admin paneli sayfasına hız kontrolü altında yönlendirir."""
+    with ADMIN_RATE.request() as outcome:
+        drv.get(url)
+        outcome['status'] = navigation_status(drv)
+    # DriverManager yeniden başlatma kararı için sayfa sayısı
+    drv.page_loads = getattr(drv, "page_loads", 0) + 1
+
+def admin_http_get(http_session, url, **kwargs):
+    """Admin paneline hız kontrolü altında HTTP GET isteği gönderir."""
+    with ADMIN_RATE.request() as outcome:
+        response = http_session.get(url, **kwargs)
+        METRICS.add_http(len(response.content))
+        outcome['status'] = response.status_code
+        return response
+
+class DriverManager:
+    """
+    Tarayıcının yaşam döngüsünü yönetir. Belirli sayıda sayfa yüklemesinden sonra veya
+    Chrome belleği sınırı aşınca tarayıcıyı yeniden başlatır, çökmüş tarayıcıyı
+    yeniler ve kayıtlı oturumla tekrar giriş yapar. Görevler arasında çağrılır;
+    kuyruk pozisyonu çağıranda kaldığı için iş kaybı olmaz.
+    """
+
+    def __init__(self, max_pages=DRIVER_MAX_PAGES, max_memory_mb=DRIVER_MAX_MEMORY_MB,
+                 memory_check_every=DRIVER_MEMORY_CHECK_EVERY):
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.memory_check_every = memory_check_every
+        self.driver = None
+        self.restarts = 0
+        self._last_memory_check = 0
+
+    def start(self):
+        """Tarayıcıyı başlatır ve giriş yapar."""
+        self.driver = init_driver()
+        if not self.driver:
+            log.error("WebDriver başlatılamadı.")
+            return False
+        self._last_memory_check = 0
+        if not ensure_login(self.driver):
+            log.error("Giriş yapılamadı.")
+            return False
+        return True
+
+    def quit(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                log.error(f"Tarayıcı kapatılırken hata: {e}")
+            self.driver = None
+
+    def restart(self, reason):
+        """Tarayıcıyı kapatıp yeniden başlatır; oturum kayıtlı çerezlerden geri yüklenir."""
+        log.info(f"♻️ Tarayıcı yeniden başlatılıyor: {reason}")
+        self.quit()
+        self.restarts += 1
+        if not self.start():
+            raise RuntimeError("Tarayıcı yeniden başlatılamadı")
+
+    @property
+    def page_loads(self):
+        return getattr(self.driver, "page_loads", 0)
+
+    def is_alive(self):
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def memory_mb(self):
+        """Chrome süreçlerinin toplam bellek kullanımı (psutil), yoksa JS heap boyutu (CDP)."""
+        try:
+            import psutil
+            root = psutil.Process(self.driver.service.process.pid)
+            processes = [root] + root.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes if p.is_running()) / (1024 * 1024)
+        except ImportError:
+            pass
+        except Exception as e:
+            log.warning(f"psutil ile bellek ölçülemedi: {e}")
+
+        try:
+            self.driver.execute_cdp_cmd("Performance.enable", {})
+            metrics = self.driver.execute_cdp_cmd("Performance.getMetrics", {})['metrics']
+            values = {metric['name']: metric['value'] for metric in metrics}
+            return values.get('JSHeapTotalSize', 0) / (1024 * 1024)
+        except Exception as e:
+            log.warning(f"CDP ile bellek ölçülemedi: {e}")
+            return None
+
+    def maybe_recycle(self):
+        """Görevler arasında çağrılır: gerekirse tarayıcıyı yeniden başlatır."""
+        if not self.is_alive():
+            self.restart("tarayıcı yanıt vermiyor")
+            return
+
+        if self.page_loads >= self.max_pages:
+            self.restart(f"{self.page_loads} sayfa yüklendi")
+            return
+
+        if self.page_loads - self._last_memory_check >= self.memory_check_every:
+            self._last_memory_check = self.page_loads
+            memory = self.memory_mb()
+            if memory is not None and memory >= self.max_memory_mb:
+                self.restart(f"bellek {memory:.0f} MB")
+
 def init_driver():
     """Tarayıcıyı (WebDriver) başlatır ve ayarlarını yapar."""
+    load_selenium()
     opts = Options()
     opts.add_argument("--headless=new")  # Headless mod aktif
     opts.add_argument("--disable-gpu")
@@ -1089,821 +2356,2513 @@ def init_driver():
     opts.add_argument("--no-sandbox")  # Headless için ek güvenlik
     opts.add_argument("--disable-dev-shm-usage")  # Headless için ek güvenlik
     opts.add_experimental_option("excludeSwitches", ["enable-logging"])
+
+    if DRIVER_PERFORMANCE_PROFILE:
+        # DOM hazır olunca dön, görsel/font yüklenmesini bekleme
+        opts.page_load_strategy = "eager"
+        opts.add_argument("--disable-extensions")
+        opts.add_argument("--disable-background-networking")
+        opts.add_argument("--disable-background-timer-throttling")
+        opts.add_argument("--disable-renderer-backgrounding")
+        opts.add_argument("--disable-component-update")
+        opts.add_argument("--disable-default-apps")
+        opts.add_argument("--disable-sync")
+        opts.add_argument("--metrics-recording-only")
+        opts.add_argument("--no-first-run")
+        opts.add_argument("--mute-audio")
+        opts.add_argument("--blink-settings=imagesEnabled=false")
+        opts.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.media_stream": 2,
+        })
     
     # Windows için Chrome yolu
     try:
         driver = webdriver.Chrome(options=opts)
-        print("Chrome WebDriver başlatıldı.")
+        log.info("Chrome WebDriver başlatıldı.")
+
+        if DRIVER_PERFORMANCE_PROFILE:
+            try:
+                # Görsel, font, medya ve üçüncü parti isteklerini ağ seviyesinde engelle
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+                log.info(f"Performans profili aktif: {len(BLOCKED_URL_PATTERNS)} URL kalıbı engelleniyor.")
+            except Exception as e:
+                log.warning(f"URL engelleme ayarlanamadı (devam ediliyor): {e}")
+
         return driver
     except Exception as e:
-        print(f"Chrome WebDriver başlatılamadı: {e}")
+        log.error(f"Chrome WebDriver başlatılamadı: {e}")
         return None
 
 def login(drv):
     """Admin paneline giriş yapar."""
     try:
-        print("Giriş sayfasına gidiliyor...")
-        drv.get(LOGIN_URL)
+        log.info("Giriş sayfasına gidiliyor...")
+        admin_get(drv, LOGIN_URL)
         
-        print("E-posta/telefon alanı dolduruluyor...")
+        log.info("E-posta/telefon alanı dolduruluyor...")
         email_field = WebDriverWait(drv, 15).until(
             EC.visibility_of_element_located((By.NAME, "EmailOrPhone"))
         )
         email_field.clear()
         email_field.send_keys(USER)
         
-        print("Şifre alanı dolduruluyor...")
+        log.info("Şifre alanı dolduruluyor...")
         password_field = drv.find_element(By.NAME, "Password")
         password_field.clear()
         password_field.send_keys(PASSWD)
         
-        print("Giriş butonuna tıklanıyor...")
+        log.info("Giriş butonuna tıklanıyor...")
         login_button = drv.find_element(By.CSS_SELECTOR, "button[type='submit']")
         login_button.click()
         
         # Admin sayfasına yönlendirildiğini kontrol et
         WebDriverWait(drv, 15).until(EC.url_contains("/admin"))
-        print("Giriş başarıyla yapıldı!")
+        log.info("Giriş başarıyla yapıldı!")
         return True
         
     except Exception as e:
-        print(f"Giriş hatası: {e}")
+        log.error(f"Giriş hatası: {e}")
+        return False
+
+def _session_cipher(salt: bytes):
+    """
+    Oturum dosyası için Fernet şifreleyici döner. Anahtar SESSION_STORE_KEY ve dosyayla
+    birlikte saklanan tuzdan PBKDF2 ile türetilir. Anahtar verilmemişse ya da
+    cryptography kurulu değilse None döner (oturum saklanmaz).
+    """
+    if not SESSION_STORE_KEY:
+        log.info("SESSION_STORE_KEY tanımlı değil, oturum saklanmayacak.")
+        return None
+
+    try:
+        from cryptography.fernet import Fernet
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+    except ImportError:
+        log.warning("⚠️ cryptography kütüphanesi bulunamadı, oturum saklanmayacak.")
+        return None
+
+    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=SESSION_KDF_ITERATIONS)
+    return Fernet(base64.urlsafe_b64encode(kdf.derive(SESSION_STORE_KEY.encode("utf-8"))))
+
+def save_admin_session(drv):
+    """Tarayıcıdaki admin çerezlerini son kullanma zamanıyla birlikte şifreli olarak kaydeder."""
+    try:
+        salt = os.urandom(SESSION_SALT_BYTES)
+        cipher = _session_cipher(salt)
+        if cipher is None:
+            return False
+
+        cookies = drv.get_cookies()
+        if not cookies:
+            return False
+
+        # En erken dolan çerez oturumun ömrünü belirler
+        now = time.time()
+        expiries = [cookie['expiry'] for cookie in cookies if cookie.get('expiry')]
+        expires_at = min(expiries + [now + SESSION_MAX_AGE])
+
+        payload = json.dumps({
+            'saved_at': now,
+            'expires_at': expires_at,
+            'cookies': cookies,
+        }).encode("utf-8")
+
+        # Yarım yazılmış dosya bırakmamak için önce geçici dosyaya yaz
+        tmp_filename = SESSION_FILE + ".tmp"
+        with open(tmp_filename, "wb") as f:
+            f.write(salt + cipher.encrypt(payload))
+        os.replace(tmp_filename, SESSION_FILE)
+
+        log.info(f"Oturum kaydedildi ({len(cookies)} çerez, {int((expires_at - now) / 60)} dk geçerli).")
+        return True
+
+    except Exception as e:
+        log.warning(f"Oturum kaydedilemedi: {e}")
+        return False
+
+def load_admin_session():
+    """Kayıtlı ve süresi dolmamış oturum çerezlerini döner, yoksa None."""
+    try:
+        if not SESSION_STORE_KEY or not os.path.exists(SESSION_FILE):
+            return None
+
+        with open(SESSION_FILE, "rb") as f:
+            data = f.read()
+        cipher = _session_cipher(data[:SESSION_SALT_BYTES])
+        if cipher is None:
+            return None
+        session = json.loads(cipher.decrypt(data[SESSION_SALT_BYTES:]).decode("utf-8"))
+
+        if session['expires_at'] <= time.time():
+            log.info("Kayıtlı oturumun süresi dolmuş.")
+            return None
+
+        return session['cookies']
+
+    except Exception as e:
+        # Anahtar değiştiyse InvalidToken mesajsız gelir
+        log.warning(f"Kayıtlı oturum okunamadı: {e or type(e).__name__}")
+        return None
+
+def apply_session_to_http(http_session, cookies):
+    """Oturum çerezlerini bir requests.Session'a ekler."""
+    for cookie in cookies:
+        http_session.cookies.set(
+            cookie['name'], cookie['value'],
+            domain=cookie.get('domain'), path=cookie.get('path', '/')
+        )
+    return http_session
+
+def validate_admin_session(cookies):
+    """Çerezlerin hâlâ geçerli olduğunu hafif bir GET isteğiyle kontrol eder."""
+    try:
+        http_session = apply_session_to_http(requests.Session(), cookies)
+        response = admin_http_get(http_session, f"{BASE_URL}/admin", allow_redirects=False, timeout=15)
+
+        # Geçersiz oturum giriş sayfasına yönlendirilir
+        return response.status_code == 200
+
+    except Exception as e:
+        log.warning(f"Oturum doğrulanamadı: {e}")
+        return False
+
+def apply_session_to_driver(drv, cookies):
+    """Oturum çerezlerini tarayıcıya ekler ve admin paneline erişimi doğrular."""
+    # Çerez eklemek için önce aynı alan adında olmak gerekir
+    admin_get(drv, f"{BASE_URL}/robots.txt")
+    for cookie in cookies:
+        cookie = {k: v for k, v in cookie.items() if k in ('name', 'value', 'path', 'domain', 'secure', 'httpOnly', 'expiry')}
+        try:
+            drv.add_cookie(cookie)
+        except Exception as e:
+            log.warning(f"Çerez eklenemedi ({cookie.get('name')}): {e}")
+
+    admin_get(drv, f"{BASE_URL}/admin")
+    WebDriverWait(drv, 15).until(
+        EC.presence_of_element_located((By.TAG_NAME, "body"))
+    )
+    return "/admin" in drv.current_url and "kullanici-giris" not in drv.current_url
+
+def ensure_login(drv):
+    """
+    Kayıtlı oturum geçerliyse onu kullanır, değilse form ile giriş yapıp oturumu kaydeder.
+    """
+    cookies = load_admin_session()
+    if cookies and validate_admin_session(cookies):
+        try:
+            if apply_session_to_driver(drv, cookies):
+                log.info("Kayıtlı oturum ile giriş yapıldı!")
+                return True
+        except Exception as e:
+            log.warning(f"Kayıtlı oturum tarayıcıya uygulanamadı: {e}")
+
+    if not login(drv):
         return False
 
+    save_admin_session(drv)
+    return True
+
+def wait_for_js(drv, script, timeout=15):
+    """Verilen JavaScript ifadesi true dönene kadar bekler."""
+    return WebDriverWait(drv, timeout).until(lambda d: d.execute_script(script))
+
+def wait_for_ajax(drv, timeout=15):
+    """Sayfa yüklenip bekleyen jQuery AJAX isteği kalmayana kadar bekler."""
+    return wait_for_js(drv, """
+        return document.readyState === 'complete'
+            && (typeof window.jQuery === 'undefined' || window.jQuery.active === 0);
+    """, timeout)
+
+def fill_bulk_remove_changes(drv):
+    """
+    Bulk edit sayfasında arama sonucundan indirim etiketinin ve kategorisinin
+    (DISCOUNT_TAG_ID / DISCOUNT_CATEGORY_ID) çıkarılması için alanları doldurur.
+    """
+    transaction_value = "1"  # "Etiketi Çıkar" / "Kategoriden Çıkar"
+    # 1. ÜRÜN ETİKETİ İŞLEMLERİ
+    log.debug("Ürün etiketi işlemleri yapılıyor...")
+
+    # ProductTag_Update checkbox'ını direkt click ile işaretle
+    log.debug("ProductTag_Update checkbox işaretleniyor...")
+    chk = WebDriverWait(drv, 10).until(
+        EC.presence_of_element_located((By.ID, "ProductTag_Update")))
+    drv.execute_script("arguments[0].click();", chk)
+    WebDriverWait(drv, 10).until(EC.element_located_to_be_selected((By.ID, "ProductTag_Update")))
+    log.debug("ProductTag_Update checkbox işaretlendi")
+
+    # ProductTagId select2'den indirim etiketini seç
+    log.debug(f"Etiket ID {DISCOUNT_TAG_ID} seçiliyor...")
+    drv.execute_script("""
+        var $select = $("#ProductTagId");
+        $select.val(arguments[0]).trigger('change');
+        $select.trigger('select2:select');
+    """, DISCOUNT_TAG_ID)
+    wait_for_js(drv, f"""return [].concat($("#ProductTagId").val() || []).indexOf('{DISCOUNT_TAG_ID}') !== -1;""")
+    log.debug(f"Etiket ID {DISCOUNT_TAG_ID} seçildi")
+
+    # ProductTagTransactionId select2'den işlemi seç (Ekle / Çıkar)
+    log.debug(f"Etiket işlemi seçiliyor ({transaction_value})...")
+    product_transaction_select = drv.find_element(By.ID, "ProductTagTransactionId")
+    product_transaction_select = Select(product_transaction_select)
+    product_transaction_select.select_by_value(transaction_value)
+    wait_for_js(drv, f"""return $("#ProductTagTransactionId").val() === '{transaction_value}';""")
+    log.debug("Etiket işlemi seçildi")
+
+    # 2. KATEGORİ İŞLEMLERİ
+    log.debug("Kategori işlemleri yapılıyor...")
+
+    # Category_Update checkbox'ını direkt click ile işaretle
+    log.debug("Category_Update checkbox işaretleniyor...")
+    chk = WebDriverWait(drv, 10).until(
+        EC.presence_of_element_located((By.ID, "Category_Update")))
+    drv.execute_script("arguments[0].click();", chk)
+    WebDriverWait(drv, 10).until(EC.element_located_to_be_selected((By.ID, "Category_Update")))
+    log.debug("Category_Update checkbox işaretlendi")
+
+    # CategoryId select2'den indirim kategorisini seç
+    log.debug(f"Kategori ID {DISCOUNT_CATEGORY_ID} seçiliyor...")
+    drv.execute_script("""
+        var $select = $("#CategoryId");
+        $select.val(arguments[0]).trigger('change');
+        $select.trigger('select2:select');
+    """, DISCOUNT_CATEGORY_ID)
+    wait_for_js(drv, f"""return [].concat($("#CategoryId").val() || []).indexOf('{DISCOUNT_CATEGORY_ID}') !== -1;""")
+    log.debug(f"Kategori ID {DISCOUNT_CATEGORY_ID} seçildi")
+
+    # CategoryTransactionId select2'den işlemi seç (Ekle / Çıkar)
+    log.debug(f"Kategori işlemi seçiliyor ({transaction_value})...")
+    category_transaction_select = drv.find_element(By.ID, "CategoryTransactionId")
+    category_transaction_select = Select(category_transaction_select)
+    category_transaction_select.select_by_value(transaction_value)
+    wait_for_js(drv, f"""return $("#CategoryTransactionId").val() === '{transaction_value}';""")
+    log.debug("Kategori işlemi seçildi")
+
+    # Seçimlerin tetiklediği istekler bitsin
+    wait_for_ajax(drv)
+
 def bulk_edit_final_operations(drv):
     """Bulk edit sayfasında son işlemleri yapar."""
     try:
-        print("\n=== BULK EDIT SON İŞLEMLERİ BAŞLIYOR ===")
-        
+        log.info("=== BULK EDIT SON İŞLEMLERİ BAŞLIYOR ===")
+
         # Bulk edit sayfasına git
-        print("Bulk edit sayfasına gidiliyor...")
-        drv.get(BULKEDIT_URL)
-        
+        log.info("Bulk edit sayfasına gidiliyor...")
+        admin_get(drv, BULKEDIT_URL)
+
         # Sayfa yüklenmesini bekle
         WebDriverWait(drv, 15).until(
             EC.presence_of_element_located((By.ID, "SearchInCategoryIds"))
         )
-        
+        wait_for_ajax(drv)
+
         # Kategori seçimi
-        print("Kategori seçiliyor...")
+        log.info("Kategori seçiliyor...")
         sel = Select(drv.find_element(By.ID, "SearchInCategoryIds"))
-        sel.select_by_value("632")
-        time.sleep(2)
-        print("4 saniye beklendi - Kategori seçimi tamamlandı")
-        
+        sel.select_by_value(DISCOUNT_CATEGORY_ID)
+        wait_for_js(drv, f"""
+            var val = $("#SearchInCategoryIds").val() || [];
+            return [].concat(val).indexOf('{DISCOUNT_CATEGORY_ID}') !== -1;
+        """)
+        log.info("Kategori seçimi tamamlandı")
+
         # Fazla kategori seçimlerini temizle
         buttons = drv.find_elements(By.XPATH, "//span[@class='select2-selection__choice__remove']")
         if len(buttons) > 1:
             buttons[1].click()
-        time.sleep(2)
-        print("4 saniye beklendi - Fazla kategoriler temizlendi")
-        
+            WebDriverWait(drv, 10).until(
+                lambda d: len(d.find_elements(By.XPATH, "//span[@class='select2-selection__choice__remove']")) < len(buttons)
+            )
+            log.info("Fazla kategoriler temizlendi")
+
         # Arama butonuna tıkla
-        print("Ürün arama yapılıyor...")
+        log.info("Ürün arama yapılıyor...")
         drv.find_element(By.ID, "search-products").click()
-        time.sleep(2)
-        print("4 saniye beklendi - Arama butonu tıklandı")
-        
-        # Ürün listesi yüklenmesini bekle
+
+        # Ürün listesi ve arama isteğinin tamamlanmasını bekle
         WebDriverWait(drv, 15).until(
             EC.presence_of_element_located((By.ID, "ProductTag_Update"))
         )
-        time.sleep(2)
-        print("4 saniye beklendi - Ürün listesi yüklendi")
-        
-        # 1. ÜRÜN ETİKETİ İŞLEMLERİ
-        print("Ürün etiketi işlemleri yapılıyor...")
-        
-        # ProductTag_Update checkbox'ını direkt click ile işaretle
-        print("ProductTag_Update checkbox işaretleniyor...")
-        chk = WebDriverWait(drv, 10).until(
-            EC.presence_of_element_located((By.ID, "ProductTag_Update")))
-        drv.execute_script("arguments[0].click();", chk)
-        time.sleep(2)
-        print("4 saniye beklendi - ProductTag_Update checkbox işaretlendi")
-        
-        # ProductTagId select2'den 241 ID'li değeri seç
-        print("Etiket ID 241 seçiliyor...")
-        drv.execute_script("""
-            var $select = $("#ProductTagId");
-            $select.val('241').trigger('change');
-            $select.trigger('select2:select');
-        """)
-        time.sleep(2)
-        print("4 saniye beklendi - Etiket ID 241 seçildi")
-        
-        # ProductTagTransactionId select2'den "Etiketi Çıkar" seç
-        print("'Etiketi Çıkar' seçiliyor...")
-        product_transaction_select = drv.find_element(By.ID, "ProductTagTransactionId")
-        product_transaction_select = Select(product_transaction_select)
-        product_transaction_select.select_by_value("1")
-        time.sleep(2)
-        print("4 saniye beklendi - 'Etiketi Çıkar' seçildi")
-        
-        # 2. KATEGORİ İŞLEMLERİ
-        print("Kategori işlemleri yapılıyor...")
-        
-        # Category_Update checkbox'ını direkt click ile işaretle
-        print("Category_Update checkbox işaretleniyor...")
-        chk = WebDriverWait(drv, 10).until(
-            EC.presence_of_element_located((By.ID, "Category_Update")))
-        drv.execute_script("arguments[0].click();", chk)
-        time.sleep(2)
-        print("4 saniye beklendi - Category_Update checkbox işaretlendi")
-        
-        # CategoryId select2'den 632 ID'li değeri seç
-        print("Kategori ID 632 seçiliyor...")
-        drv.execute_script("""
-            var $select = $("#CategoryId");
-            $select.val('632').trigger('change');
-            $select.trigger('select2:select');
-        """)
-        time.sleep(2)
-        print("4 saniye beklendi - Kategori ID 632 seçildi")
-        
-        # CategoryTransactionId select2'den "Kategoriden Çıkar" seç
-        print("'Kategoriden Çıkar' seçiliyor...")
-        category_transaction_select = drv.find_element(By.ID, "CategoryTransactionId")
-        category_transaction_select = Select(category_transaction_select)
-        category_transaction_select.select_by_value("1")
-        time.sleep(2)
-        print("4 saniye beklendi - 'Kategoriden Çıkar' seçildi")
-        
-        # 30 saniye bekle
-        print("4saniye bekleniyor...")
-        time.sleep(2)
-        
+        wait_for_ajax(drv, timeout=60)
+        log.info("Ürün listesi yüklendi")
+
+        # İndirim etiketini ve kategorisini çıkar
+        fill_bulk_remove_changes(drv)
+
         # Sayfanın en üstüne çık
-        print("Sayfanın en üstüne çıkılıyor...")
+        log.info("Sayfanın en üstüne çıkılıyor...")
         drv.execute_script("window.scrollTo(0, 0);")
-        time.sleep(1)
-        
+
         # Kaydet butonuna tıkla
-        print("Kaydet butonuna tıklanıyor...")
+        log.info("Kaydet butonuna tıklanıyor...")
         save_button = WebDriverWait(drv, 15).until(
             EC.element_to_be_clickable((By.ID, "bulk-update-submit"))
         )
-        save_button.click()
-        
-        print("Bulk edit işlemleri başarıyla tamamlandı!")
+        submit_bulk_update(drv, save_button)
+
+        log.info("Bulk edit işlemleri başarıyla tamamlandı!")
         return True
-        
+
     except Exception as e:
-        print(f"Bulk edit işlemlerinde hata: {e}")
+        log.error(f"Bulk edit işlemlerinde hata: {e}")
         return False
 
-def update_combination_prices_from_excel(drv):
-    """Excel'den veri okuyup kombinasyon fiyatlarını günceller."""
-    try:
-        print("\n=== EXCEL'DEN KOMBİNASYON FİYATI GÜNCELLEME BAŞLIYOR ===")
-        
-        # Excel dosyasını oku
-        print("Excel dosyası okunuyor...")
-        df = pd.read_excel("guncellenmis_urun_verileri.xlsx")
-        print(f"Excel'den {len(df)} satır okundu.")
-        
-        # Gerekli kolonları kontrol et
-        required_columns = ['IdUrun', 'VaryantFiyati']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
-        if missing_columns:
-            print(f"Eksik kolonlar: {missing_columns}")
-            return False
-        
-        successful_count = 0
-        total_count = len(df)
-        
-        # Her satırı işle
-        for index, row in df.iterrows():
-            try:
-                product_id = str(row['IdUrun'])
-                variant_price = str(row['VaryantFiyati']).strip()
-                
-                print(f"\n--- Satır {index + 1}/{total_count} ---")
-                print(f"Ürün ID: {product_id}")
-                print(f"Varyant Fiyatı: {variant_price}")
-                
-                # Ürün düzenleme sayfasına git
-                edit_url = f"{BASE_URL}/admin/product/edit/{product_id}"
-                print(f"Ürün sayfasına gidiliyor: {edit_url}")
-                drv.get(edit_url)
-                
-                # Sayfa yüklenmesini bekle
-                WebDriverWait(drv, 15).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
-                
-                # Önce ürün etiketi ekle (241 - S Bedeni İndirimli Ürünler)
-                print("Ürün etiketi ekleniyor...")
-                try:
-                    # Select2 dropdown'ı bul ve 241 değerini seç
-                    drv.execute_script("""
-                        var $select = $("#SelectedProductTagIds");
-                        if ($select.length > 0) {
-                            $select.val('241').trigger('change');
-                            $select.trigger('select2:select');
-                        }
-                    """)
-                    print("Etiket 241 (S Bedeni İndirimli Ürünler) seçildi.")
-                    
-                    # Sayfanın en üstüne çık
-                    drv.execute_script("window.scrollTo(0, 0);")
+def submit_bulk_update(drv, save_button, timeout=BULK_UPDATE_TIMEOUT):
+    """
+    Toplu güncelleme butonuna tıklar ve isteğin sunucudan dönmesini bekler.
+    Form normal post ile gönderilirse yeni sayfanın yüklenmesi, AJAX ile
+    gönderilirse isteğin tamamlanması beklenir.
+    """
+    # Tıklamadan önce işaretçi koy: sayfa değişirse işaretçi kaybolur
+    drv.execute_script("""
+        window.__bulkUpdateState = 'pending';
+        if (window.jQuery) {
+            jQuery(document).one('ajaxComplete', function () {
+                window.__bulkUpdateState = 'done';
+            });
+        }
+    """)
+    save_button.click()
 
-                    
-                    # "Kaydet ve Devam Et" butonuna tıkla
-                    save_continue_button = WebDriverWait(drv, 10).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, "button[name='save-continue']"))
-                    )
-                    save_continue_button.click()
-                    print("Kaydet ve Devam Et butonuna tıklandı.")
-                    
-                    # Sayfa yeniden yüklenmesini bekle
+    wait_for_js(drv, """
+        if (document.readyState !== 'complete') return false;
+        if (typeof window.__bulkUpdateState === 'undefined') return true;
+        return window.__bulkUpdateState === 'done'
+            && (typeof window.jQuery === 'undefined' || window.jQuery.active === 0);
+    """, timeout)
+    log.info("Toplu güncelleme isteği tamamlandı.")
 
-                    print("5 saniye beklendi - Sayfa yeniden yüklendi.")
-                    
-                except Exception as e:
-                    print(f"Ürün etiketi ekleme hatası: {e}")
-                    continue
-                
-                # "Kategori / Marka" sekmesine tıkla
-                print("Kategori / Marka sekmesi aranıyor...")
-                try:
-                    category_tab = WebDriverWait(drv, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//li[@data-tab-name='tab-mappings']"))
-                    )
-                    category_tab.click()
-                    print("Kategori / Marka sekmesi tıklandı.")
-                    
-                    # "Yeni Kayıt Ekle" butonuna tıkla
-                    print("Yeni Kayıt Ekle butonu aranıyor...")
-                    add_button = WebDriverWait(drv, 10).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, "a.k-button.k-button-icontext.k-grid-add"))
-                    )
-                    add_button.click()
-                    print("Yeni Kayıt Ekle butonuna tıklandı.")
-                    
-                    # Kategori dropdown'ından 632 değerini seç
-                    print("Kategori dropdown'ından 632 değeri seçiliyor...")
-                    drv.execute_script("""
-                        var $dropdown = $("input[data-role='dropdownlist']");
-                        if ($dropdown.length > 0) {
-                            var dropdownlist = $dropdown.data("kendoDropDownList");
-                            if (dropdownlist) {
-                                dropdownlist.value(632);
-                                dropdownlist.trigger('change');
-                            }
-                        }
-                    """)
-                    print("Kategori 632 seçildi.")
-                    
-                    # "Güncelle" butonuna tıkla
-                    print("Güncelle butonu aranıyor...")
-                    update_button = WebDriverWait(drv, 10).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, "a.k-button.k-button-icontext.k-grid-update"))
-                    )
-                    update_button.click()
-                    print("Güncelle butonuna tıklandı.")
-                    
-                    # Kısa bekleme
+class RunJournal:
+    """
+    Selenium işlemlerini (okuma, fiyat silme, toplu çıkarma, güncelleme) append-only
+    JSONL dosyasına run_id ile kaydeder. Devam modunda aynı run_id'nin başarılı
+    işlemleri tekrar yapılmaz.
+    """
 
-                    
-                except Exception as e:
-                    print(f"Kategori / Marka işlemlerinde hata: {e}")
-                    # Hata olsa bile devam et
-                
-                # "Ürün Varyasyonları" sekmesine tıkla
-                print("Ürün Varyasyonları sekmesi aranıyor...")
-                try:
-                    variations_tab = WebDriverWait(drv, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//li[@data-tab-name='tab-product-attributes']"))
-                    )
-                    variations_tab.click()
-                    print("Ürün Varyasyonları sekmesi tıklandı.")
-                except Exception as e:
-                    print(f"Sekme tıklama hatası: {e}")
-                    continue
-                
-                                                 # Kombinasyon tablosunu bekle - daha uzun süre bekle
-                print("Kombinasyon tablosu yüklenmesi bekleniyor...")
-                WebDriverWait(drv, 20).until(
-                    EC.presence_of_element_located((By.XPATH, "//tbody[@role='rowgroup']//tr"))
-                )
-                
+    def __init__(self, filename: str = JOURNAL_FILE, run_id: str = None):
+        self.filename = filename
+        self.run_id = run_id or time.strftime("%Y%m%d-%H%M%S")
+        self._results = {}
 
-                
-                # Tüm satırları bul
-                rows = drv.find_elements(By.XPATH, "//tbody[@role='rowgroup']//tr")
-                print(f"Toplam {len(rows)} satır bulundu.")
-                
-                # "Beden: S" veya "Beden: 36" olan satırı bul - maksimum 4 deneme ile sayfa yenileme
-                target_row = None
-                max_retries = 4
-                
-                for retry_attempt in range(max_retries):
-                    print(f"Beden arama denemesi {retry_attempt + 1}/{max_retries}")
-                    
-                    # Mevcut satırları tekrar al
-                    rows = drv.find_elements(By.XPATH, "//tbody[@role='rowgroup']//tr")
-                    print(f"Toplam {len(rows)} satır bulundu.")
-                    
-                    # Hedef bedeni ara
-                    for row in rows:
-                        try:
-                            # Kombinasyon hücresini bul (2. sütun - Kombinasyon)
-                            combination_cell = row.find_elements(By.TAG_NAME, "td")[1]  # 0-based index
-                            combination_text = combination_cell.text.strip()
-                            
-                            print(f"Kombinasyon kontrol ediliyor: '{combination_text}'")
-                            
-                            if combination_text in ["Beden: S", "Beden: 36"]:
-                                target_row = row
-                                print(f"Hedef kombinasyon bulundu: {combination_text}")
-                                break
-                        except Exception as e:
-                            print(f"Satır kontrol edilirken hata: {e}")
-                            continue
-                    
-                    # Hedef beden bulunduysa döngüden çık
-                    if target_row:
-                        break
-                    
-                    # Hedef beden bulunamadıysa ve son deneme değilse sayfayı yenile
-                    if retry_attempt < max_retries - 1:
-                        print(f"'Beden: S' veya 'Beden: 36' bulunamadı. Sayfa yenileniyor... (Deneme {retry_attempt + 1})")
-                        
-                        # Sayfayı yenile
-                        drv.refresh()
-                        
-                        # Sayfa yüklenmesini bekle
-                        WebDriverWait(drv, 15).until(
-                            EC.presence_of_element_located((By.TAG_NAME, "body"))
-                        )
-                        
-                        # Ürün Varyasyonları sekmesine tekrar tıkla
-                        try:
-                            variations_tab = WebDriverWait(drv, 10).until(
-                                EC.element_to_be_clickable((By.XPATH, "//li[@data-tab-name='tab-product-attributes']"))
-                            )
-                            variations_tab.click()
-                            print("Ürün Varyasyonları sekmesi tekrar tıklandı.")
-                            
-                            # Kombinasyon tablosunu bekle
-                            WebDriverWait(drv, 20).until(
-                                EC.presence_of_element_located((By.XPATH, "//tbody[@role='rowgroup']//tr"))
-                            )
-                            print("Kombinasyon tablosu yeniden yüklendi.")
-                            
-                        except Exception as e:
-                            print(f"Sekme tıklama hatası: {e}")
-                            continue
-                    else:
-                        print("'Beden: S' veya 'Beden: 36' olan kombinasyon bulunamadı.")
-                        # Debug için tüm satırları yazdır
-                        print("Mevcut kombinasyonlar:")
-                        for i, row in enumerate(rows):
-                            try:
-                                combination_cell = row.find_elements(By.TAG_NAME, "td")[1]
-                                print(f"Satır {i+1}: {combination_cell.text.strip()}")
-                            except:
-                                pass
-                        break
-                
-                if not target_row:
-                    print("Maksimum deneme sayısına ulaşıldı. Bu ürün atlanıyor.")
-                    continue
-                
-                # Düzenle butonunu bul ve tıkla
-                print("Düzenle butonu aranıyor...")
+        # Devam edilen çalışmanın başarılı işlemlerini yükle
+        if run_id:
+            for entry in self._read_entries(filename):
+                if entry['run_id'] == run_id and entry['outcome'] == 'ok':
+                    self._results[(entry['operation'], entry['key'])] = entry.get('detail', {})
+
+    @staticmethod
+    def _read_entries(filename):
+        if not os.path.exists(filename):
+            return []
+        entries = []
+        with open(filename, "r", encoding="utf-8") as f:
+            for line in f:
                 try:
-                    # Önce direkt button olarak dene
-                    edit_button = target_row.find_element(By.XPATH, ".//button[contains(@onclick, 'EditAttributeCombinationPopup')]")
-                    print("Düzenle butonu bulundu (onclick ile)")
-                except:
-                    try:
-                        # Alternatif olarak sadece button olarak dene
-                        edit_button = target_row.find_element(By.XPATH, ".//button")
-                        print("Düzenle butonu bulundu (genel button olarak)")
-                    except:
-                        try:
-                            # Son olarak onclick içeren herhangi bir element olarak dene
-                            edit_button = target_row.find_element(By.XPATH, ".//*[contains(@onclick, 'EditAttributeCombinationPopup')]")
-                            print("Düzenle butonu bulundu (onclick içeren element olarak)")
-                        except Exception as e:
-                            print(f"Düzenle butonu bulunamadı: {e}")
-                            # Debug için satır içeriğini yazdır
-                            print("Hedef satır içeriği:")
-                            print(target_row.get_attribute('outerHTML'))
-                            continue
-                
-                # Butona tıkla
-                edit_button.click()
-                print("Düzenle butonuna tıklandı.")
-                
-                # Düzenle butonunun onclick'inden kombinasyon ID'sini al
-                onclick_value = edit_button.get_attribute("onclick")
-                match = re.search(r'/EditAttributeCombinationPopup/(\d+)', onclick_value)
-                
-                if match:
-                    combination_id = match.group(1)
-                    print(f"Kombinasyon ID bulundu: {combination_id}")
-                    
-                    # Direkt popup URL'sine git
-                    popup_url = f"{BASE_URL}/admin/product/editattributecombinationpopup/{combination_id}/?btnId=btnRefresh&formId=product-form"
-                    print(f"Popup URL'sine gidiliyor: {popup_url}")
-                    drv.get(popup_url)
-                    
-                    # Fiyat alanını bul (Kendo UI numeric textbox için)
-                    print("Fiyat alanı aranıyor...")
-                    price_input = WebDriverWait(drv, 10).until(
-                        EC.presence_of_element_located((By.ID, "OverriddenPrice"))
-                    )
-                    print("Fiyat alanı bulundu!")
-                    
-                    # Yeni fiyatı ayarla
-                    print(f"Yeni fiyat ayarlanıyor: {variant_price}")
-                    try:
-                        # Kendo UI numeric textbox için JavaScript ile değeri ayarla
-                        drv.execute_script(f"""
-                            var numericTextBox = $("#OverriddenPrice").data("kendoNumericTextBox");
-                            if (numericTextBox) {{
-                                numericTextBox.value({variant_price});
-                                // Görünür input'u da güncelle
-                                $("#OverriddenPrice + span input.k-formatted-value").val("{variant_price}");
-                            }}
-                        """)
-                        print("JavaScript ile fiyat ayarlandı.")
-                    except Exception as js_error:
-                        print(f"JavaScript hatası: {js_error}")
-                        # Alternatif: Görünür input alanını bul ve güncelle
-                        try:
-                            visible_input = drv.find_element(By.CSS_SELECTOR, "#OverriddenPrice + span input.k-formatted-value")
-                            visible_input.clear()
-                            visible_input.send_keys(variant_price)
-                            # Hidden input'u da güncelle
-                            price_input.clear()
-                            price_input.send_keys(variant_price)
-                            print("Görünür ve hidden input ile fiyat güncellendi.")
-                        except Exception as alt_error:
-                            print(f"Alternatif yöntem de başarısız: {alt_error}")
-                            # Son çare: Sadece hidden input'u güncelle
-                            price_input.clear()
-                            price_input.send_keys(variant_price)
-                            print("Hidden input ile fiyat güncellendi.")
-                    
-                    print("Fiyat alanı güncellendi.")
-                    
-                    # Kaydet butonuna tıkla
-                    try:
-                        save_button = WebDriverWait(drv, 10).until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, "button[name='save']"))
-                        )
-                        save_button.click()
-                        print("Kaydet butonuna tıklandı!")
-                        print(f"Fiyat başarıyla güncellendi: {variant_price}")
-                        successful_count += 1
-                    except Exception as e:
-                        print(f"Kaydet butonu bulunamadı: {e}")
-                        continue
-                    
-                else:
-                    print("Kombinasyon ID bulunamadı!")
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # Çökme anında yarım yazılmış satır
                     continue
-                    
+        return entries
+
+    @classmethod
+    def open(cls, resume: bool = False, filename: str = JOURNAL_FILE):
+        """Devam modunda tamamlanmamış son çalışmayı açar, aksi halde yeni çalışma başlatır."""
+        if resume:
+            last_run_id = None
+            finished = set()
+            for entry in cls._read_entries(filename):
+                if entry['operation'] == 'run' and entry['outcome'] == 'finished':
+                    finished.add(entry['run_id'])
+                last_run_id = entry['run_id']
+
+            if last_run_id and last_run_id not in finished:
+                journal = cls(filename, run_id=last_run_id)
+                log.info(f"Çalışma {last_run_id} kaldığı yerden devam ediyor ({len(journal._results)} başarılı işlem atlanacak).")
+                return journal
+            log.info("Devam edilecek yarım çalışma bulunamadı, yeni çalışma başlatılıyor.")
+
+        journal = cls(filename)
+        journal.record('run', journal.run_id, 'started')
+        return journal
+
+    @property
+    def resumed(self):
+        return bool(self._results)
+
+    def record(self, operation: str, key: str, outcome: str, **detail):
+        """İşlem sonucunu günlüğe ekler (ok, error, skipped, started, finished)."""
+        entry = {
+            'run_id': self.run_id,
+            'ts': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'operation': operation,
+            'key': str(key),
+            'outcome': outcome,
+            'detail': detail,
+        }
+        with open(self.filename, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+
+        if outcome == 'ok':
+            self._results[(operation, str(key))] = detail
+
+    def succeeded(self, operation: str, key: str) -> bool:
+        return (operation, str(key)) in self._results
+
+    def result(self, operation: str, key: str):
+        return self._results.get((operation, str(key)))
+
+    def finish(self):
+        self.record('run', self.run_id, 'finished')
+
+def parse_price_text(price_text):
+    """
+    Grid veya popup'tan okunan fiyat metnini sayıya çevirir.
+    Örn: "149,9900" → 149.99, "1.249,99" → 1249.99
+    Boş, "null" veya 0 değerler için None döner (fiyat tanımlı değil).
+    """
+    if price_text is None:
+        return None
+
+    text = str(price_text).strip().replace("₺", "").replace("TL", "").replace(" ", "")
+    if text in ("", "null", "None", "nan"):
+        return None
+
+    # Hem nokta hem virgül varsa nokta binlik ayırıcıdır
+    if ',' in text and '.' in text:
+        text = text.replace('.', '').replace(',', '.')
+    else:
+        text = text.replace(',', '.')
+
+    try:
+        value = round(float(text), 2)
+    except ValueError:
+        return None
+
+    return value if value != 0 else None
+
+def select_target_combination(combinations):
+    """Kombinasyon listesinden ilk "Beden: S" veya "Beden: 36" kombinasyonunu döner."""
+    for combination in combinations:
+        if combination['text'] in TARGET_COMBINATION_TEXTS:
+            return combination
+    return None
+
+def open_variations_tab(drv):
+    """Ürün düzenleme sayfasında "Ürün Varyasyonları" sekmesini açar."""
+    log.debug("Ürün Varyasyonları sekmesi aranıyor...")
+
+    # Önce li elementi olarak dene
+    try:
+        variations_tab = WebDriverWait(drv, 10).until(
+            EC.element_to_be_clickable((By.XPATH, "//li[@data-tab-name='tab-product-attributes']//span[contains(text(), 'Ürün Varyasyonları')]"))
+        )
+        log.debug("Ürün Varyasyonları sekmesi bulundu (li elementi)")
+    except:
+        # Alternatif olarak direkt span olarak dene
+        try:
+            variations_tab = WebDriverWait(drv, 10).until(
+                EC.element_to_be_clickable((By.XPATH, "//span[contains(text(), 'Ürün Varyasyonları')]"))
+            )
+            log.debug("Ürün Varyasyonları sekmesi bulundu (span elementi)")
+        except:
+            # Son olarak data-tab-name ile dene
+            variations_tab = WebDriverWait(drv, 10).until(
+                EC.element_to_be_clickable((By.XPATH, "//li[@data-tab-name='tab-product-attributes']"))
+            )
+            log.debug("Ürün Varyasyonları sekmesi bulundu (data-tab-name ile)")
+
+    variations_tab.click()
+
+def read_product_combinations(drv, product_id, navigate=True):
+    """
+    Ürünün varyasyon tablosunu okur, hiçbir şeyi değiştirmez.
+    Her kombinasyon için {'text', 'combination_id', 'price'} döner; fiyat tanımlı değilse None.
+    """
+    if navigate:
+        edit_url = f"{BASE_URL}/admin/product/edit/{product_id}"
+        admin_get(drv, edit_url)
+
+        # Sayfa yüklenmesini bekle
+        WebDriverWait(drv, 15).until(
+            EC.presence_of_element_located((By.TAG_NAME, "body"))
+        )
+
+    open_variations_tab(drv)
+
+    # Kombinasyon tablosunu bekle
+    try:
+        WebDriverWait(drv, 20).until(
+            EC.presence_of_element_located((By.XPATH, "//tbody[@role='rowgroup']//tr"))
+        )
+    except Exception:
+        log.warning("Kombinasyon tablosu boş veya yüklenemedi.")
+        return []
+
+    rows = drv.find_elements(By.XPATH, "//tbody[@role='rowgroup']//tr")
+    log.debug(f"Toplam {len(rows)} satır bulundu.")
+
+    combinations = []
+    for i, row in enumerate(rows):
+        try:
+            cells = row.find_elements(By.TAG_NAME, "td")
+            # 2. sütun - Kombinasyon, 6. sütun - Kombinasyon Fiyatı
+            combination_text = cells[1].text.strip()
+            price_text = cells[5].text.strip()
+
+            edit_button = row.find_element(By.XPATH, ".//*[contains(@onclick, 'EditAttributeCombinationPopup')]")
+            match = re.search(r'/EditAttributeCombinationPopup/(\d+)', edit_button.get_attribute("onclick") or "")
+            if not match:
+                log.warning(f"Satır {i+1}: Kombinasyon ID bulunamadı!")
+                continue
+
+            combinations.append({
+                'text': combination_text,
+                'combination_id': match.group(1),
+                'price': parse_price_text(price_text),
+            })
+            log.debug(f"Satır {i+1}: '{combination_text}' (ID: {match.group(1)}, Fiyat: {price_text or 'boş'})")
+
+        except Exception as e:
+            log.warning(f"Satır {i+1} kontrol edilirken hata: {e}")
+            continue
+
+    COMBINATION_INDEX.learn(product_id, combinations)
+    return combinations
+
+def find_target_combination(drv, product_id, navigate=True, max_retries=4):
+    """
+    "Beden: S" veya "Beden: 36" kombinasyonunu arar.
+    Bulunamazsa sayfayı yeniden yükleyerek en fazla max_retries kez dener.
+    """
+    combinations = []
+    for retry_attempt in range(max_retries):
+        log.debug(f"Beden arama denemesi {retry_attempt + 1}/{max_retries}")
+        combinations = read_product_combinations(drv, product_id, navigate=navigate or retry_attempt > 0)
+
+        target = select_target_combination(combinations)
+        if target:
+            log.debug(f"Hedef kombinasyon bulundu: {target['text']}")
+            return target
+
+        log.debug(f"'Beden: S' veya 'Beden: 36' bulunamadı. (Deneme {retry_attempt + 1})")
+
+    # Debug için tüm kombinasyonları yazdır
+    log.debug("Mevcut kombinasyonlar:")
+    for i, combination in enumerate(combinations):
+        log.debug(f"Satır {i+1}: {combination['text']}")
+    return None
+
+class CombinationIndex:
+    """
+    IdUrun → {kombinasyon metni: kombinasyon ID} kalıcı indeksi. Ürün ilk görüldüğünde
+    (varyasyon tablosu okunduğunda) doldurulur; sonraki fiyat yazımları doğrudan popup
+    adresine gider. Popup'ı bulunamayan ürünün kaydı silinir ve tablo tekrar okunur.
+    """
+
+    def __init__(self, filename: str = COMBINATION_INDEX_FILE):
+        self.filename = filename
+        self.products = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        try:
+            with open(filename, "r", encoding="utf-8") as f:
+                self.products = json.load(f).get('products', {})
+        except (OSError, ValueError):
+            pass
+
+    def learn(self, product_id, combinations):
+        """Okunan varyasyon tablosunu indekse yazar (tablo sırası korunur)."""
+        entry = {combination['text']: combination['combination_id'] for combination in combinations}
+        if entry and self.products.get(str(product_id)) != entry:
+            self.products[str(product_id)] = entry
+            self.dirty = True
+
+    def target(self, product_id):
+        """Ürünün indeksteki ilk "Beden: S"/"Beden: 36" kombinasyonu: (metin, ID) ya da None."""
+        for text, combination_id in self.products.get(str(product_id), {}).items():
+            if text in TARGET_COMBINATION_TEXTS:
+                self.hits += 1
+                return text, combination_id
+        self.misses += 1
+        return None
+
+    def invalidate(self, product_id):
+        if self.products.pop(str(product_id), None) is not None:
+            self.invalidations += 1
+            self.dirty = True
+
+    def save(self):
+        """Değişiklik varsa indeksi atomik olarak yazar."""
+        if not self.dirty:
+            return
+        tmp_filename = self.filename + ".tmp"
+        with open(tmp_filename, "w", encoding="utf-8") as f:
+            json.dump({'saved_at': time.strftime("%Y-%m-%dT%H:%M:%S"), 'products': self.products}, f, ensure_ascii=False)
+        os.replace(tmp_filename, self.filename)
+        self.dirty = False
+
+    def snapshot(self):
+        return (f"{len(self.products)} ürün, {self.hits} isabet, {self.misses} ıska, "
+                f"{self.invalidations} geçersiz kılma")
+
+COMBINATION_INDEX = CombinationIndex()
+
+class CombinationNotFound(Exception):
+    """Kombinasyon popup'ı açılmadı (kombinasyon silinmiş ya da ID değişmiş)."""
+
+def combination_popup_url(combination_id):
+    return f"{BASE_URL}/admin/product/editattributecombinationpopup/{combination_id}/?btnId=btnRefresh&formId=product-form"
+
+def edit_combination_price(drv, combination_id, price=None):
+    """
+    Kombinasyon popup'ını açar ve OverriddenPrice alanını günceller.
+    price None ise fiyat tamamen temizlenir (0 yapılmaz).
+    Alan zaten hedef değerdeyse kaydetmeden döner. Popup'ta fiyat alanı yoksa
+    CombinationNotFound fırlatır.
+    """
+    popup_url = combination_popup_url(combination_id)
+    log.debug(f"Popup URL'sine gidiliyor: {popup_url}")
+    admin_get(drv, popup_url)
+
+    # Fiyat alanını bul (Kendo UI numeric textbox için)
+    try:
+        price_input = WebDriverWait(drv, 10).until(
+            EC.presence_of_element_located((By.ID, "OverriddenPrice"))
+        )
+    except Exception:
+        if not drv.find_elements(By.ID, "OverriddenPrice"):
+            raise CombinationNotFound(f"Kombinasyon {combination_id} bulunamadı")
+        raise
+
+    current_value = parse_price_text(price_input.get_attribute("value"))
+    target_value = None if price is None else round(float(price), 2)
+    log.debug(f"Mevcut fiyat: {current_value} → Hedef fiyat: {target_value}")
+
+    if current_value == target_value:
+        log.debug("Fiyat zaten hedef değerde, değişiklik yapılmadı.")
+        return True
+
+    display_value = "" if target_value is None else str(target_value)
+    try:
+        # Kendo UI numeric textbox için JavaScript ile değeri ayarla
+        drv.execute_script("""
+            var numericTextBox = $("#OverriddenPrice").data("kendoNumericTextBox");
+            if (numericTextBox) {
+                numericTextBox.value(arguments[0]);
+                // Görünür input'u da güncelle
+                $("#OverriddenPrice + span input.k-formatted-value").val(arguments[1]);
+            }
+        """, target_value, display_value)
+        log.debug("JavaScript ile fiyat ayarlandı.")
+    except Exception as js_error:
+        log.warning(f"JavaScript hatası: {js_error}")
+        # Alternatif: Görünür input alanını bul ve güncelle
+        try:
+            visible_input = drv.find_element(By.CSS_SELECTOR, "#OverriddenPrice + span input.k-formatted-value")
+            visible_input.clear()
+            if display_value:
+                visible_input.send_keys(display_value)
+            # Hidden input'u da güncelle
+            price_input.clear()
+            if display_value:
+                price_input.send_keys(display_value)
+            log.debug("Görünür ve hidden input ile fiyat güncellendi.")
+        except Exception as alt_error:
+            log.warning(f"Alternatif yöntem de başarısız: {alt_error}")
+            # Son çare: Sadece hidden input'u güncelle
+            price_input.clear()
+            if display_value:
+                price_input.send_keys(display_value)
+            log.debug("Hidden input ile fiyat güncellendi.")
+
+    # Kaydet butonuna tıkla
+    save_button = WebDriverWait(drv, 10).until(
+        EC.element_to_be_clickable((By.CSS_SELECTOR, "button[name='save']"))
+    )
+    save_button.click()
+    log.debug("Kaydet butonuna tıklandı!")
+    return True
+
+def load_target_prices(filename: str = "guncellenmis_urun_verileri.xlsx") -> Dict[str, float]:
+    """
+    Güncellenmiş Excel'den hedef fiyatları okur.
+    {IdUrun: VaryantFiyati} döner; fiyatı hesaplanamamış satırlar atlanır.
+    """
+    log.info("Excel dosyası okunuyor...")
+    df = pd.read_excel(filename)
+    log.info(f"Excel'den {len(df)} satır okundu.")
+
+    # Gerekli kolonları kontrol et
+    required_columns = ['IdUrun', 'VaryantFiyati']
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Eksik kolonlar: {missing_columns}")
+
+    target_prices = {}
+    for _, row in df.iterrows():
+        product_id = row['IdUrun']
+        price = row['VaryantFiyati']
+        if pd.isna(product_id) or pd.isna(price):
+            continue
+        if isinstance(product_id, float) and product_id.is_integer():
+            product_id = int(product_id)
+        target_prices[str(product_id).strip()] = round(float(price), 2)
+
+    log.info(f"{len(target_prices)} ürün için hedef fiyat bulundu.")
+    return target_prices
+
+@measured("read_current_state", rows_out=True)
+def read_current_state(manager, product_ids, journal, stop_event=None):
+    """
+    NE6ZAB feed'indeki (şu an indirimde olan) ürünlerin kombinasyon fiyatlarını okur.
+    Okunamayan ürünler None olarak işaretlenir; plan bunlar için eski davranışa döner.
+    Günlükte okunmuş görünen ürünler tekrar okunmaz. stop_event set edilirse okuma durur.
+    """
+    current_state = {}
+    total_count = len(product_ids)
+    progress = ProgressLog("Mevcut durum okuma", total_count)
+
+    for i, product_id in enumerate(product_ids, 1):
+        if stop_event is not None and stop_event.is_set():
+            log.info("Mevcut durum okuması durduruldu.")
+            break
+
+        previous = journal.result('read', product_id)
+        if previous is not None:
+            current_state[product_id] = previous['combinations']
+            progress.step()
+            continue
+
+        log.debug(f"--- Mevcut durum okunuyor: Ürün {i}/{total_count} ({product_id}) ---")
+        try:
+            manager.maybe_recycle()
+            current_state[product_id] = read_product_combinations(manager.driver, product_id)
+            journal.record('read', product_id, 'ok', combinations=current_state[product_id])
+        except Exception as e:
+            log.error(f"Ürün {product_id} okunurken hata: {e}")
+            journal.record('read', product_id, 'error', error=str(e))
+            current_state[product_id] = None
+        progress.step(ok=current_state[product_id] is not None)
+
+    return current_state
+
+def load_current_state_cache(filename: str = CURRENT_STATE_FILE):
+    """Son canlı okumadaki kombinasyon listelerini döner ({IdUrun: [kombinasyon, ...]})."""
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            return json.load(f)['products']
+    except (OSError, ValueError, KeyError):
+        return {}
+
+def save_current_state_cache(current_state, filename: str = CURRENT_STATE_FILE):
+    """Okunabilen ürünlerin kombinasyonlarını önbelleğe yazar (plan modu için)."""
+    products = load_current_state_cache(filename)
+    products.update({pid: combinations for pid, combinations in current_state.items() if combinations is not None})
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump({'saved_at': time.strftime("%Y-%m-%dT%H:%M:%S"), 'products': products}, f, ensure_ascii=False)
+
+def load_snapshot(filename: str = SNAPSHOT_FILE, max_age_hours: float = SNAPSHOT_MAX_AGE_HOURS):
+    """
+    Önceki başarılı çalışmanın ürün bazında sonucunu döner ({IdUrun: kayıt}).
+    Kapalıysa, dosya yoksa veya max_age_hours'tan eskiyse boş sözlük döner.
+    """
+    if not SNAPSHOT_ENABLED:
+        return {}
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    age_hours = (time.time() - snapshot.get('saved_ts', 0)) / 3600
+    if max_age_hours is not None and age_hours > max_age_hours:
+        log.info(f"Önceki çalışma kaydı {age_hours:.0f} saatlik, kullanılmayacak (sınır {SNAPSHOT_MAX_AGE_HOURS:.0f} saat).")
+        return {}
+    return snapshot.get('products', {})
+
+def current_state_from_snapshot(product_ids, snapshot, max_age_hours: float = SNAPSHOT_MAX_AGE_HOURS):
+    """
+    NE6ZAB'daki ürünlerden önceki çalışmada seçilmiş ve kombinasyonu bilinenlerin mevcut
+    durumunu canlı okumadan kurar. (durum, canlı okunması gereken ürün ID'leri) döner.
+    Son doğrulaması max_age_hours'tan eski ürünler panelde elle değiştirilmiş olabileceği
+    için canlı okunur.
+    """
+    oldest = time.time() - max_age_hours * 3600
+    current_state = {}
+    missing = []
+    for product_id in product_ids:
+        entry = snapshot.get(product_id)
+        if (entry and entry.get('selected') and entry.get('combination_id') and entry.get('combination_text')
+                and entry.get('verified_ts', 0) >= oldest):
+            current_state[product_id] = [{
+                'text': entry['combination_text'],
+                'combination_id': entry['combination_id'],
+                'price': entry['varyant_fiyati'],
+            }]
+        else:
+            missing.append(product_id)
+    return current_state, missing
+
+def snapshot_delta(snapshot, target_prices):
+    """
+    Önceki çalışmaya göre üç yönlü fark: yeni indirime girenler, fiyatı değişenler ve
+    artık indirimde olmaması gerekenler (ayrıca değişmeyenler).
+    """
+    previous = {pid: entry for pid, entry in snapshot.items() if entry.get('selected')}
+    delta = {'new': [], 'changed': [], 'dropped': [], 'same': []}
+    for product_id, price in target_prices.items():
+        entry = previous.get(product_id)
+        if entry is None:
+            delta['new'].append(product_id)
+        elif entry.get('varyant_fiyati') != price:
+            delta['changed'].append(product_id)
+        else:
+            delta['same'].append(product_id)
+    delta['dropped'] = [pid for pid in previous if pid not in target_prices]
+    return delta
+
+def invalidate_snapshot(product_ids, filename: str = SNAPSHOT_FILE):
+    """
+    Yazma başlamadan önce dokunulacak ürünleri kayıttan çıkarır; çalışma yarıda
+    kalırsa bu ürünler sonraki çalışmada eski kayda güvenilmeden canlı okunur.
+    """
+    if not SNAPSHOT_ENABLED or not os.path.exists(filename):
+        return
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return
+    touched = set(product_ids)
+    snapshot['products'] = {pid: entry for pid, entry in snapshot.get('products', {}).items() if pid not in touched}
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    os.replace(tmp_filename, filename)
+
+def load_sisme_orani(filename: str = "guncellenmis_urun_verileri.xlsx") -> Dict[str, float]:
+    """Güncellenmiş Excel'den {IdUrun: SismeOrani} döner; dosya yoksa boş sözlük."""
+    try:
+        df = pd.read_excel(filename, usecols=['IdUrun', 'SismeOrani'])
+    except Exception:
+        return {}
+    values = {}
+    for product_id, sisme_orani in zip(df['IdUrun'], df['SismeOrani']):
+        if pd.isna(product_id) or pd.isna(sisme_orani):
+            continue
+        if isinstance(product_id, float) and product_id.is_integer():
+            product_id = int(product_id)
+        values[str(product_id).strip()] = float(sisme_orani)
+    return values
+
+def save_snapshot(plan, journal, current_state=None, filename: str = SNAPSHOT_FILE):
+    """
+    Uygulanan planın sonucunu ürün bazında kaydeder. Sadece sonucu kesin olan ürünler
+    yazılır; başarısız olanlar kayıttan çıkar ve sonraki çalışmada canlı okunur.
+    verified_ts yazılan veya bu çalışmada canlı okunan üründe şimdiki zamandır; önceki
+    kayıttan taşınan üründe değişmez.
+    """
+    if not SNAPSHOT_ENABLED:
+        return
+    now = time.time()
+    previous = load_snapshot(filename, max_age_hours=None)
+    current_state = current_state or {}
+    # Sıfırlama gibi hedef fiyatsız planlarda Excel (dolayısıyla pandas) okunmaz
+    sisme_orani = load_sisme_orani() if plan['updates'] or plan['unchanged'] else {}
+
+    def known_combination(product_id):
+        """Ürünün hedef kombinasyonu: bu çalışmada bulunan, canlı okunan ya da önceki kayıttaki."""
+        found = journal.result('combination', product_id)
+        if found:
+            return found['combination_id'], found['text']
+        target = select_target_combination(current_state.get(product_id) or [])
+        if target:
+            return target['combination_id'], target['text']
+        entry = previous.get(product_id, {})
+        return entry.get('combination_id'), entry.get('combination_text')
+
+    products = {}
+    for update in plan['updates']:
+        product_id = update['product_id']
+        if not journal.succeeded('update', product_id):
+            continue
+        combination_id, combination_text = known_combination(product_id)
+        products[product_id] = {
+            'selected': True,
+            'sisme_orani': sisme_orani.get(product_id),
+            'varyant_fiyati': update['after'],
+            'combination_id': combination_id or update['combination_id'],
+            'combination_text': combination_text,
+            'verified_ts': now,
+        }
+
+    for product_id in plan['unchanged']:
+        target = select_target_combination(current_state.get(product_id) or [])
+        entry = previous.get(product_id)
+        # Durumu önceki kayıttan geldiyse son doğrulama zamanı korunur
+        verified_ts = now if journal.succeeded('read', product_id) else (entry or {}).get('verified_ts', 0)
+        if target:
+            price, combination_id, combination_text = target['price'], target['combination_id'], target['text']
+        elif entry and entry.get('selected'):
+            price, combination_id, combination_text = entry['varyant_fiyati'], entry['combination_id'], entry['combination_text']
+        else:
+            continue
+        products[product_id] = {
+            'selected': True,
+            'sisme_orani': sisme_orani.get(product_id),
+            'varyant_fiyati': price,
+            'combination_id': combination_id,
+            'combination_text': combination_text,
+            'verified_ts': verified_ts,
+        }
+
+    cleared = {clear['product_id'] for clear in plan['clears']}
+    bulk_done = plan['bulk_remove'] and journal.succeeded('bulk_remove', 'bulk')
+    for product_id in plan['removals']:
+        if not (bulk_done or journal.succeeded('untag', product_id)):
+            continue
+        if product_id in cleared and not journal.succeeded('clear_product', product_id):
+            continue
+        combination_id, combination_text = known_combination(product_id)
+        products[product_id] = {
+            'selected': False,
+            'sisme_orani': sisme_orani.get(product_id),
+            'varyant_fiyati': None,
+            'combination_id': combination_id,
+            'combination_text': combination_text,
+            'verified_ts': now,
+        }
+
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, "w", encoding="utf-8") as f:
+        json.dump({
+            'saved_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'saved_ts': now,
+            'run_id': plan.get('run_id'),
+            'products': products,
+        }, f, ensure_ascii=False)
+    os.replace(tmp_filename, filename)
+    log.info(f"Önceki çalışma kaydı güncellendi: {len(products)} ürün ({filename})")
+
+def parse_overridden_price(html: str):
+    """
+    Kombinasyon popup HTML'inden OverriddenPrice değerini okur.
+    (fiyat, alan_bulundu) döner.
+    """
+    match = re.search(r'<input[^>]*\bid="OverriddenPrice"[^>]*>', html)
+    if not match:
+        return None, False
+    value = re.search(r'\bvalue="([^"]*)"', match.group(0))
+    return parse_price_text(value.group(1) if value else None), True
+
+@measured("read_current_state_http", rows_in=True, rows_out=True)
+def read_current_state_http(product_ids):
+    """
+    Mevcut kombinasyon fiyatlarını tarayıcı açmadan okur. Kombinasyon listesi son canlı
+    okumadan (CURRENT_STATE_FILE) gelir, fiyatlar popup formundan HTTP ile tazelenir.
+    Geçerli oturum yoksa son okunan fiyatlar kullanılır. Bilinmeyen ürünler None döner.
+    """
+    cached = load_current_state_cache()
+    http_session = None
+    cookies = load_admin_session()
+    if cookies and validate_admin_session(cookies):
+        http_session = apply_session_to_http(requests.Session(), cookies)
+    else:
+        log.warning("⚠️ Geçerli oturum yok, fiyatlar son canlı okumadan alınacak.")
+
+    current_state = {}
+    progress = ProgressLog("HTTP durum okuma", len(product_ids))
+    for product_id in product_ids:
+        combinations = cached.get(product_id)
+        if combinations is None:
+            current_state[product_id] = None
+            progress.step(ok=False)
+            continue
+
+        combinations = [dict(combination) for combination in combinations]
+        if http_session is not None:
+            try:
+                for combination in combinations:
+                    response = admin_http_get(http_session, combination_popup_url(combination['combination_id']), timeout=15)
+                    price, found = parse_overridden_price(response.text)
+                    if response.status_code != 200 or not found:
+                        # Kombinasyon artık yok, liste eskimiş
+                        COMBINATION_INDEX.invalidate(product_id)
+                        raise ValueError(f"Kombinasyon {combination['combination_id']} okunamadı")
+                    combination['price'] = price
             except Exception as e:
-                print(f"Düzenle butonu işlenirken hata: {e}")
+                log.error(f"Ürün {product_id} HTTP ile okunamadı: {e}")
+                combinations = None
+
+        current_state[product_id] = combinations
+        progress.step(ok=combinations is not None)
+
+    known = sum(1 for combinations in current_state.values() if combinations is not None)
+    log.info(f"{len(product_ids)} ürünün {known} tanesinin mevcut durumu biliniyor.")
+    return current_state
+
+def build_reconciliation_plan(current_state, target_prices):
+    """
+    Mevcut kombinasyon fiyatlarını yeni hedeflerle karşılaştırıp değişiklik planı çıkarır.
+    - clears:      silinmesi gereken fiyatlar (hedefte olmayan veya yanlış kombinasyondaki)
+    - removals:    artık indirimde olmaması gereken ürünler (etiket/kategorisi tek tek çıkarılır)
+    - bulk_remove: indirim kategorisindeki tüm ürünlerden toplu çıkarma (yalnızca reset planında)
+    - updates:     etiket/kategori eklenecek veya fiyatı yazılacak ürünler
+    - unchanged:   hiçbir işlem gerekmeyen ürünler
+    İndirim feed'inin (NE6ZAB) indirim etiketi/kategorisindeki ürünleri listelediği varsayılır.
+    """
+    plan = {
+        'clears': [],
+        'removals': [],
+        'bulk_remove': False,
+        'updates': [],
+        'unchanged': [],
+    }
+
+    # 1. Mevcut indirimli ürünler: gereksiz fiyatları sil
+    for product_id, combinations in current_state.items():
+        target_price = target_prices.get(product_id)
+        if target_price is None:
+            plan['removals'].append(product_id)
+
+        if combinations is None:
+            # Okunamadı - uygulama sırasında tüm fiyatlar canlı okunup silinir
+            plan['clears'].append({'product_id': product_id, 'combination_id': None, 'before': None})
+            continue
+
+        keep = select_target_combination(combinations) if target_price is not None else None
+        for combination in combinations:
+            if combination['price'] is None:
                 continue
-                
+            if keep is combination:
+                # Hedef kombinasyon silinmez; fiyatı farklıysa güncellemede üzerine yazılır
+                continue
+            plan['clears'].append({
+                'product_id': product_id,
+                'combination_id': combination['combination_id'],
+                'before': combination['price'],
+            })
 
-                
+    # 2. Hedef ürünler: yalnızca eksik etiketleri ve farklı fiyatları yaz.
+    # İndirimden çıkanların etiketi tek tek alındığı için diğer ürünlerin etiketine dokunulmaz.
+    for product_id, target_price in target_prices.items():
+        combinations = current_state.get(product_id)
+        add_tags = combinations is None
+
+        target = select_target_combination(combinations) if combinations else None
+        set_price = target is None or target['price'] != target_price
+
+        if not add_tags and not set_price:
+            plan['unchanged'].append(product_id)
+            continue
+
+        plan['updates'].append({
+            'product_id': product_id,
+            'add_tags': add_tags,
+            'set_price': set_price,
+            'combination_id': target['combination_id'] if target else None,
+            'before': target['price'] if target else None,
+            'after': target_price,
+        })
+
+    return plan
+
+def load_plan(run_id, filename: str = PLAN_FILE):
+    """Aynı çalışmaya ait kayıtlı planı döner, yoksa None."""
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            plan = json.load(f)
+        return plan if plan.get('run_id') == run_id else None
+    except (OSError, ValueError):
+        return None
+
+def save_plan(plan, filename: str = PLAN_FILE):
+    """Değişiklik planını JSON olarak kaydeder ve özetini yazdırır."""
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(plan, f, ensure_ascii=False, indent=2)
+
+    price_sets = sum(1 for update in plan['updates'] if update['set_price'])
+    tag_adds = sum(1 for update in plan['updates'] if update['add_tags'])
+
+    log.info("=== DEĞİŞİKLİK PLANI ===")
+    log.info(f"Silinecek fiyat: {len(plan['clears'])}")
+    log.info(f"İndirimden çıkacak ürün (etiket/kategori çıkarılacak): {len(plan['removals'])}")
+    log.info(f"Kategorinin tamamından toplu çıkarma: {'Evet' if plan['bulk_remove'] else 'Hayır'}")
+    log.info(f"Etiket/kategori eklenecek ürün: {tag_adds}")
+    log.info(f"Fiyatı yazılacak ürün: {price_sets}")
+    log.info(f"Değişmeyen ürün: {len(plan['unchanged'])}")
+    log.info(f"📁 Plan dosyası: {filename}")
+
+def add_discount_tags(drv, product_id):
+    """Ürüne indirim etiketini ve kategorisini ekler. Sayfa ürün düzenleme ekranında kalır."""
+    edit_url = f"{BASE_URL}/admin/product/edit/{product_id}"
+    log.debug(f"Ürün sayfasına gidiliyor: {edit_url}")
+    admin_get(drv, edit_url)
+
+    # Sayfa yüklenmesini bekle
+    WebDriverWait(drv, 15).until(
+        EC.presence_of_element_located((By.TAG_NAME, "body"))
+    )
+
+    # Önce ürün etiketi ekle (varsayılan 241 - S Bedeni İndirimli Ürünler)
+    log.debug("Ürün etiketi ekleniyor...")
+    # Select2 dropdown'ı bul ve indirim etiketini seç
+    drv.execute_script("""
+        var $select = $("#SelectedProductTagIds");
+        if ($select.length > 0) {
+            $select.val(arguments[0]).trigger('change');
+            $select.trigger('select2:select');
+        }
+    """, DISCOUNT_TAG_ID)
+    log.debug(f"Etiket {DISCOUNT_TAG_ID} seçildi.")
+
+    # Sayfanın en üstüne çık
+    drv.execute_script("window.scrollTo(0, 0);")
+
+    # "Kaydet ve Devam Et" butonuna tıkla
+    save_continue_button = WebDriverWait(drv, 10).until(
+        EC.element_to_be_clickable((By.CSS_SELECTOR, "button[name='save-continue']"))
+    )
+    save_continue_button.click()
+    log.debug("Kaydet ve Devam Et butonuna tıklandı.")
+
+    # "Kategori / Marka" sekmesine tıkla
+    log.debug("Kategori / Marka sekmesi aranıyor...")
+    try:
+        category_tab = WebDriverWait(drv, 10).until(
+            EC.element_to_be_clickable((By.XPATH, "//li[@data-tab-name='tab-mappings']"))
+        )
+        category_tab.click()
+        log.debug("Kategori / Marka sekmesi tıklandı.")
+
+        # "Yeni Kayıt Ekle" butonuna tıkla
+        add_button = WebDriverWait(drv, 10).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, "a.k-button.k-button-icontext.k-grid-add"))
+        )
+        add_button.click()
+        log.debug("Yeni Kayıt Ekle butonuna tıklandı.")
+
+        # Kategori dropdown'ından indirim kategorisini seç
+        drv.execute_script("""
+            var $dropdown = $("input[data-role='dropdownlist']");
+            if ($dropdown.length > 0) {
+                var dropdownlist = $dropdown.data("kendoDropDownList");
+                if (dropdownlist) {
+                    dropdownlist.value(arguments[0]);
+                    dropdownlist.trigger('change');
+                }
+            }
+        """, DISCOUNT_CATEGORY_ID)
+        log.debug(f"Kategori {DISCOUNT_CATEGORY_ID} seçildi.")
+
+        # "Güncelle" butonuna tıkla
+        update_button = WebDriverWait(drv, 10).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, "a.k-button.k-button-icontext.k-grid-update"))
+        )
+        update_button.click()
+        log.debug("Güncelle butonuna tıklandı.")
+
+    except Exception as e:
+        log.error(f"Kategori / Marka işlemlerinde hata: {e}")
+        # Hata olsa bile devam et
+
+def remove_discount_tags(drv, product_id):
+    """
+    İndirimden çıkan ürünün indirim etiketini ve kategorisini kaldırır. Etiket ürün
+    formundan çıkarılıp kaydedilir; kategori eşlemesi Kategori / Marka sekmesindeki
+    Kendo grid'inin veri kaynağından silinir.
+    """
+    edit_url = f"{BASE_URL}/admin/product/edit/{product_id}"
+    log.debug(f"Ürün sayfasına gidiliyor: {edit_url}")
+    admin_get(drv, edit_url)
+    WebDriverWait(drv, 15).until(
+        EC.presence_of_element_located((By.ID, "SelectedProductTagIds"))
+    )
+
+    # Etiket: mevcut etiketlerden yalnızca indirim etiketi çıkarılır
+    had_tag = drv.execute_script("""
+        var discountTag = arguments[0];
+        var $select = $("#SelectedProductTagIds");
+        var tags = [].concat($select.val() || []);
+        var remaining = tags.filter(function (tag) { return String(tag) !== discountTag; });
+        if (remaining.length === tags.length) return false;
+        $select.val(remaining).trigger('change');
+        return true;
+    """, DISCOUNT_TAG_ID)
+    if had_tag:
+        drv.execute_script("window.scrollTo(0, 0);")
+        save_continue_button = WebDriverWait(drv, 10).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, "button[name='save-continue']"))
+        )
+        save_continue_button.click()
+        WebDriverWait(drv, 15).until(
+            EC.presence_of_element_located((By.ID, "SelectedProductTagIds"))
+        )
+        log.debug(f"Etiket {DISCOUNT_TAG_ID} çıkarıldı.")
+
+    # Kategori: eşleme grid'in veri kaynağından silinip sunucuya gönderilir
+    category_tab = WebDriverWait(drv, 10).until(
+        EC.element_to_be_clickable((By.XPATH, "//li[@data-tab-name='tab-mappings']"))
+    )
+    category_tab.click()
+    WebDriverWait(drv, 10).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "a.k-button.k-button-icontext.k-grid-add"))
+    )
+    removed = drv.execute_script("""
+        var categoryId = arguments[0];
+        var gridElement = document.querySelector("a.k-grid-add").closest(".k-grid");
+        var grid = gridElement ? $(gridElement).data("kendoGrid") : null;
+        if (!grid) throw new Error("Kategori grid'i bulunamadı");
+        var items = Array.prototype.filter.call(grid.dataSource.data(), function (item) {
+            return String(item.CategoryId) === categoryId;
+        });
+        items.forEach(function (item) { grid.dataSource.remove(item); });
+        if (items.length) grid.dataSource.sync();
+        return items.length;
+    """, DISCOUNT_CATEGORY_ID)
+    if removed:
+        wait_for_ajax(drv)
+        log.debug(f"Kategori {DISCOUNT_CATEGORY_ID} eşlemesi silindi.")
+    return True
+
+@measured("price_write")
+def apply_product_update(drv, update, journal=None):
+    """
+    Plandaki tek bir ürün güncellemesini uygular (etiket/kategori ve/veya fiyat).
+    Canlı bulunan hedef kombinasyon günlüğe yazılır (önceki çalışma kaydı için).
+    """
+    product_id = update['product_id']
+    variant_price = update['after']
+    log.debug(f"Ürün ID: {product_id}")
+    log.debug(f"Varyant Fiyatı: {variant_price} (Mevcut: {update['before']})")
+
+    on_edit_page = False
+    if update['add_tags']:
+        add_discount_tags(drv, product_id)
+        on_edit_page = True
+
+    if not update['set_price']:
+        log.debug("Fiyat zaten hedef değerde, sadece etiket/kategori eklendi.")
+        return True
+
+    # Plandaki ya da indeksteki kombinasyona varyasyon tablosu açılmadan doğrudan yazılır
+    combination_id = update['combination_id']
+    cached = COMBINATION_INDEX.target(product_id) if combination_id is None else None
+    if cached is not None:
+        combination_text, combination_id = cached
+    if combination_id is not None:
+        try:
+            log.debug(f"Kombinasyon ID: {combination_id}")
+            edit_combination_price(drv, combination_id, variant_price)
+            if cached is not None and journal is not None:
+                journal.record('combination', product_id, 'ok', combination_id=combination_id, text=combination_text)
+            log.debug(f"Fiyat başarıyla güncellendi: {variant_price}")
+            return True
+        except CombinationNotFound as e:
+            # Kayıt eskimiş: indeksten sil, tablodan yeniden bul
+            log.info(f"{e}, ürün {product_id} kombinasyonları yeniden okunacak.")
+            COMBINATION_INDEX.invalidate(product_id)
+            on_edit_page = False
+
+    target = find_target_combination(drv, product_id, navigate=not on_edit_page)
+    if not target:
+        raise PermanentError("'Beden: S' veya 'Beden: 36' kombinasyonu bulunamadı")
+    if journal is not None:
+        journal.record('combination', product_id, 'ok',
+                       combination_id=target['combination_id'], text=target['text'])
+    if target['price'] == variant_price:
+        log.debug("Fiyat zaten hedef değerde, değişiklik yapılmadı.")
+        return True
+
+    log.debug(f"Kombinasyon ID: {target['combination_id']}")
+    edit_combination_price(drv, target['combination_id'], variant_price)
+    log.debug(f"Fiyat başarıyla güncellendi: {variant_price}")
+    return True
+
+def update_combination_prices_from_excel(manager, plan, journal, scheduler):
+    """
+    Plandaki hedef ürünlere etiket/kategori ekler ve kombinasyon fiyatlarını yazar.
+    Etiketi duran ve fiyatı zaten hedef değerde olan ürünlere dokunulmaz.
+    """
+    try:
+        log.info("=== EXCEL'DEN KOMBİNASYON FİYATI GÜNCELLEME BAŞLIYOR ===")
+
+        updates = plan['updates']
+        successful_count = 0
+        total_count = len(updates)
+        log.info(f"{total_count} ürün güncellenecek, {len(plan['unchanged'])} ürün zaten güncel.")
+
+        tasks = []
+        for update in updates:
+            product_id = update['product_id']
+            if journal.succeeded('update', product_id):
+                successful_count += 1
+                continue
+
+            if not update['add_tags'] and not update['set_price']:
+                # Etiketi toplu eklendi, fiyatı zaten doğru
+                successful_count += 1
+                journal.record('update', product_id, 'ok')
+                continue
+
+            tasks.append({'operation': 'update', 'product_id': product_id, 'payload': update})
+
+        successful_count += scheduler.run(tasks, lambda task: run_selenium_task(manager, journal, task), "Satır")
+
+        log.info("=== EXCEL GÜNCELLEME TAMAMLANDI ===")
+        log.info(f"Toplam satır: {total_count}")
+        log.info(f"Başarılı: {successful_count}")
+        log.info(f"Başarısız: {total_count - successful_count}")
+
+        return True
+
+    except Exception as e:
+        log.error(f"Excel güncelleme işlemlerinde hata: {e}")
+        return False
+
+class PermanentError(Exception):
+    """Tekrar denemekle düzelmeyecek hata (örn: üründe hedef kombinasyon yok)."""
+
+class RetryScheduler:
+    """
+    (ürün, işlem) görevlerini çalıştırır. Geçici hatada görev üstel geri çekilmeyle
+    kuyruğa geri konur; kalıcı hatalar ve deneme hakkı biten görevler dead-letter
+    dosyasına yazılır ve sonraki bir çalışmada REPLAY_DEAD_LETTER=1 ile tekrar oynatılabilir.
+    """
+
+    def __init__(self, journal, max_attempts=RETRY_MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY):
+        self.journal = journal
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.dead_letters = []
+
+    def run(self, tasks, handler, label="Görev"):
+        """
+        Görevleri handler(task) ile çalıştırır. handler True dönerse görev başarılıdır;
+        False dönmesi veya hata fırlatması geçici hata, PermanentError kalıcı hata sayılır.
+        Başarılı görev sayısını döner.
+        """
+        pending = []
+        for seq, task in enumerate(tasks):
+            task.setdefault('attempt', 0)
+            heapq.heappush(pending, (0.0, seq, task))
+        seq = len(tasks)
+
+        total_count = len(tasks)
+        successful_count = 0
+        done_count = 0
+        progress = ProgressLog(label, total_count)
+
+        while pending:
+            not_before, _, task = heapq.heappop(pending)
+            delay = not_before - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            task['attempt'] += 1
+            log.debug(f"--- {label} {done_count + 1}/{total_count}: Ürün {task['product_id']} (Deneme {task['attempt']}) ---")
+
+            permanent = False
+            try:
+                ok = handler(task)
+                error = None if ok else "İşlem başarısız"
+            except PermanentError as e:
+                ok, error, permanent = False, str(e), True
             except Exception as e:
-                print(f"Satır {index + 1} işlenirken hata: {e}")
+                ok, error = False, str(e)
+
+            if ok:
+                successful_count += 1
+                done_count += 1
+                self.journal.record(task['operation'], task['product_id'], 'ok')
+                progress.step()
                 continue
-        
-        print(f"\n=== EXCEL GÜNCELLEME TAMAMLANDI ===")
-        print(f"Toplam satır: {total_count}")
-        print(f"Başarılı: {successful_count}")
-        print(f"Başarısız: {total_count - successful_count}")
-        
+
+            self.journal.record(task['operation'], task['product_id'], 'error', error=error, attempt=task['attempt'])
+            if permanent or task['attempt'] >= self.max_attempts:
+                log.warning(f"{'Kalıcı hata' if permanent else 'Deneme hakkı bitti'}, dead-letter'a yazılıyor: {error}")
+                self._dead_letter(task, error, permanent)
+                done_count += 1
+                progress.step(ok=False)
+                continue
+
+            # Geçici hata: üstel geri çekilme + rastgele sapma ile kuyruğa geri koy
+            backoff = self.base_delay * (2 ** (task['attempt'] - 1)) * random.uniform(0.8, 1.2)
+            log.warning(f"Geçici hata, {backoff:.1f} saniye sonra tekrar denenecek: {error}")
+            heapq.heappush(pending, (time.monotonic() + backoff, seq, task))
+            seq += 1
+
+        return successful_count
+
+    def _dead_letter(self, task, error, permanent):
+        entry = {
+            'run_id': self.journal.run_id,
+            'ts': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'operation': task['operation'],
+            'product_id': task['product_id'],
+            'payload': task['payload'],
+            'attempts': task['attempt'],
+            'permanent': permanent,
+            'error': error,
+        }
+        self.dead_letters.append(entry)
+        with open(DEAD_LETTER_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+def load_dead_letters(filename: str = DEAD_LETTER_FILE):
+    """Dead-letter dosyasındaki kayıtları okur (bozuk satırlar atlanır)."""
+    if not os.path.exists(filename):
+        return []
+    entries = []
+    with open(filename, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+    return entries
+
+def prune_dead_letters(filename: str = DEAD_LETTER_FILE, journal_file: str = JOURNAL_FILE) -> int:
+    """
+    Sonraki bir çalışmada aynı işlemi başarıyla yapılmış ürünlerin dead-letter kayıtlarını
+    siler. Silinen kayıt sayısını döner.
+    """
+    entries = load_dead_letters(filename)
+    if not entries:
+        return 0
+
+    # (işlem, ürün) → başarılı olduğu son zaman ve çalışma
+    succeeded = {}
+    for entry in RunJournal._read_entries(journal_file):
+        if entry.get('outcome') == 'ok':
+            succeeded[(entry['operation'], entry['key'])] = (entry['ts'], entry['run_id'])
+
+    def handled_later(entry):
+        done = succeeded.get((entry['operation'], str(entry['product_id'])))
+        return done is not None and done[1] != entry['run_id'] and done[0] >= entry['ts']
+
+    remaining = [entry for entry in entries if not handled_later(entry)]
+    pruned = len(entries) - len(remaining)
+    if pruned:
+        tmp_filename = filename + ".tmp"
+        with open(tmp_filename, "w", encoding="utf-8") as f:
+            for entry in remaining:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_filename, filename)
+        log.info(f"Sonraki çalışmalarda tamamlanmış {pruned} dead-letter kaydı silindi.")
+    return pruned
+
+def rebuild_dead_letter_tasks(manager, journal, entries):
+    """
+    Dead-letter kayıtlarını güncel hedef fiyatlara (load_target_prices), NE6ZAB feed'ine ve
+    ürünlerin canlı kombinasyonlarına göre yeniden kurar. Kayıttaki eski payload
+    kullanılmaz; artık gerekmeyen görevler (ör. indirimden çıkmış ürüne fiyat yazmak) atılır.
+    """
+    target_prices = load_target_prices()
+    discounted = set(get_xml_product_ids())
+    product_ids = list(dict.fromkeys(str(entry['product_id']) for entry in entries))
+
+    live_state = read_current_state(manager, product_ids, journal)
+    current_state = {
+        product_id: live_state.get(product_id) for product_id in product_ids
+        if product_id in discounted or product_id in target_prices
+    }
+    plan = build_reconciliation_plan(
+        current_state,
+        {product_id: target_prices[product_id] for product_id in product_ids if product_id in target_prices},
+    )
+
+    clears_by_product = {}
+    for clear in plan['clears']:
+        clears_by_product.setdefault(clear['product_id'], []).append(clear)
+    # Etiket yalnızca indirim feed'inde olmayan ürünlere eklenir
+    updates_by_product = {
+        update['product_id']: dict(update, add_tags=update['product_id'] not in discounted)
+        for update in plan['updates']
+    }
+
+    tasks = {}
+    for entry in entries:
+        product_id = str(entry['product_id'])
+        operation = entry['operation']
+        if operation == 'clear_product' and product_id in clears_by_product:
+            payload = clears_by_product[product_id]
+        elif operation == 'update' and product_id in updates_by_product and (
+                updates_by_product[product_id]['add_tags'] or updates_by_product[product_id]['set_price']):
+            payload = updates_by_product[product_id]
+        elif operation == 'untag' and product_id in plan['removals']:
+            payload = None
+        else:
+            log.info(f"Dead-letter görevi artık gerekli değil, atlanıyor: {operation} {product_id}")
+            continue
+        # Aynı görev birden çok kez dead-letter'a düşmüş olabilir
+        tasks[(operation, product_id)] = {'operation': operation, 'product_id': product_id, 'payload': payload}
+    return list(tasks.values())
+
+def run_selenium_task(manager, journal, task):
+    """
+    Zamanlayıcıdan gelen tek bir görevi çalıştırır.
+    Görevden önce tarayıcı gerekiyorsa yenilenir; çöken tarayıcıda görev geçici hata sayılır.
+    """
+    manager.maybe_recycle()
+    drv = manager.driver
+    if task['operation'] == 'clear_product':
+        return process_product(drv, task['product_id'], task['payload'], journal)
+    if task['operation'] == 'update':
+        return apply_product_update(drv, task['payload'], journal)
+    if task['operation'] == 'untag':
+        return remove_discount_tags(drv, task['product_id'])
+    raise PermanentError(f"Bilinmeyen işlem: {task['operation']}")
+
+def replay_dead_letters(manager, journal):
+    """
+    Dead-letter dosyasındaki görevleri tek başına tekrar oynatır. Görevler önce güncel
+    hedeflere ve canlı duruma göre yeniden kurulur. Yine başarısız olanlar yeni
+    dead-letter dosyasında kalır.
+    """
+    prune_dead_letters()
+    entries = load_dead_letters()
+    log.info(f"=== DEAD-LETTER TEKRAR OYNATMA: {len(entries)} kayıt ===")
+    if not entries:
         return True
-        
+
+    try:
+        tasks = rebuild_dead_letter_tasks(manager, journal, entries)
     except Exception as e:
-        print(f"Excel güncelleme işlemlerinde hata: {e}")
+        log.error(f"Dead-letter görevleri güncel duruma göre kurulamadı: {e}")
         return False
+    log.info(f"{len(tasks)} görev hâlâ gerekli, {len(entries) - len(tasks)} kayıt atlandı.")
+
+    # Dosya yeniden yazılacak; sadece hâlâ başarısız olanlar kalır
+    os.replace(DEAD_LETTER_FILE, DEAD_LETTER_FILE + ".replayed")
+
+    scheduler = RetryScheduler(journal)
+    successful_count = scheduler.run(tasks, lambda task: run_selenium_task(manager, journal, task), "Tekrar")
+
+    log.info(f"Tekrar oynatılan: {len(tasks)}, Başarılı: {successful_count}, Dead-letter'da kalan: {len(scheduler.dead_letters)}")
+    return not scheduler.dead_letters
 
-def process_product(drv, product_id):
-    """Tek bir ürünü işler."""
+@measured("process_product")
+def process_product(drv, product_id, clears, journal):
+    """
+    Tek bir ürünün plandaki kombinasyon fiyatlarını siler.
+    combination_id None olan kayıt, ürünün tüm dolu fiyatlarının canlı okunup silinmesi demektir.
+    """
     try:
-        print(f"Ürün {product_id} işleniyor...")
-        
-        # Ürün düzenleme sayfasına git
-        edit_url = f"{BASE_URL}/admin/product/edit/{product_id}"
-        drv.get(edit_url)
-        
-        # Sayfa yüklenmesini bekle
-        WebDriverWait(drv, 15).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
-        )
-        
-        # "Ürün Varyasyonları" sekmesine tıkla
-        print("Ürün Varyasyonları sekmesi aranıyor...")
-        
-        # Önce li elementi olarak dene
-        try:
-            variations_tab = WebDriverWait(drv, 10).until(
-                EC.element_to_be_clickable((By.XPATH, "//li[@data-tab-name='tab-product-attributes']//span[contains(text(), 'Ürün Varyasyonları')]"))
-            )
-            print("Ürün Varyasyonları sekmesi bulundu (li elementi)")
-        except:
-            # Alternatif olarak direkt span olarak dene
-            try:
-                variations_tab = WebDriverWait(drv, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, "//span[contains(text(), 'Ürün Varyasyonları')]"))
-                )
-                print("Ürün Varyasyonları sekmesi bulundu (span elementi)")
-            except:
-                # Son olarak data-tab-name ile dene
-                variations_tab = WebDriverWait(drv, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, "//li[@data-tab-name='tab-product-attributes']"))
-                )
-                print("Ürün Varyasyonları sekmesi bulundu (data-tab-name ile)")
-        
-        # Sekmeye tıkla
-        variations_tab.click()
-        
-        # Kombinasyon fiyatı olan satırları bul
-        print("Kombinasyon fiyatları kontrol ediliyor...")
-        
-        # Önce tüm satırları bul
-        rows = drv.find_elements(By.XPATH, "//tbody[@role='rowgroup']//tr")
-        print(f"Toplam {len(rows)} satır bulundu.")
-        
-        # Fiyatı dolu olan satırları filtrele
-        price_rows = []
-        for i, row in enumerate(rows):
-            try:
-                # Fiyat hücresini bul (6. sütun - Kombinasyon Fiyatı)
-                price_cell = row.find_elements(By.TAG_NAME, "td")[5]  # 0-based index
-                price_text = price_cell.text.strip()
-                
-                # Fiyat dolu mu kontrol et
-                if price_text and price_text != "" and price_text != "0" and price_text != "0,0000":
-                    print(f"Satır {i+1}: Fiyat bulundu: {price_text}")
-                    
-                    # Bu satırdaki düzenle butonunu bul
-                    edit_button = row.find_element(By.XPATH, ".//button[contains(@onclick, 'EditAttributeCombinationPopup')]")
-                    price_rows.append((edit_button, price_text))
-                else:
-                    print(f"Satır {i+1}: Fiyat boş veya 0")
-                    
-            except Exception as e:
-                print(f"Satır {i+1} kontrol edilirken hata: {e}")
+        log.debug(f"Ürün {product_id} işleniyor...")
+
+        combination_ids = [clear['combination_id'] for clear in clears if clear['combination_id'] is not None]
+        if any(clear['combination_id'] is None for clear in clears):
+            combinations = read_product_combinations(drv, product_id)
+            combination_ids.extend(c['combination_id'] for c in combinations if c['price'] is not None)
+
+        if not combination_ids:
+            log.debug("Fiyatı dolu olan kombinasyon bulunamadı.")
+            return True
+
+        success = True
+        for i, combination_id in enumerate(combination_ids, 1):
+            key = f"{product_id}:{combination_id}"
+            if journal.succeeded('clear', key):
                 continue
-        
-        if not price_rows:
-            print("Fiyatı dolu olan kombinasyon bulunamadı.")
-            return False
-        
-        print(f"Fiyatı dolu olan {len(price_rows)} kombinasyon bulundu.")
-        
-        # Her düzenleme butonuna tıkla ve fiyatı sıfırla
-        for i, (edit_button, original_price) in enumerate(price_rows):
             try:
-                print(f"Kombinasyon {i+1} düzenleniyor... (Mevcut fiyat: {original_price})")
-                
-                # Düzenle butonuna tıkla
-                edit_button.click()
-                
-                # Düzenle butonunun onclick'inden kombinasyon ID'sini al
-                onclick_value = edit_button.get_attribute("onclick")
-                print(f"Düzenle butonu onclick: {onclick_value}")
-                
-                # Kombinasyon ID'sini çıkar
-                import re
-                match = re.search(r'/EditAttributeCombinationPopup/(\d+)', onclick_value)
-                if match:
-                    combination_id = match.group(1)
-                    print(f"Kombinasyon ID bulundu: {combination_id}")
-                    
-                    # Direkt popup URL'sine git
-                    popup_url = f"{BASE_URL}/admin/product/editattributecombinationpopup/{combination_id}/?btnId=btnRefresh&formId=product-form"
-                    print(f"Popup URL'sine gidiliyor: {popup_url}")
-                    
-                    drv.get(popup_url)
-                    
-                    # Fiyat alanını bul (Kendo UI numeric textbox için)
-                    print("Fiyat alanı aranıyor...")
-                    try:
-                        # Önce gizli input alanını bul
-                        price_input = WebDriverWait(drv, 10).until(
-                            EC.presence_of_element_located((By.ID, "OverriddenPrice"))
-                        )
-                        print("Fiyat alanı bulundu!")
-                        
-                        # Mevcut değeri kontrol et
-                        current_value = price_input.get_attribute("value")
-                        print(f"Mevcut fiyat değeri: '{current_value}'")
-                        
-                        if current_value and current_value != "" and current_value != "0" and current_value != "0,0000" and current_value != "null":
-                            print(f"Fiyat siliniyor: {current_value}")
-                            
-                            # Kendo UI numeric textbox için JavaScript ile değeri tamamen temizle
-                            try:
-                                drv.execute_script("""
-                                    var numericTextBox = $("#OverriddenPrice").data("kendoNumericTextBox");
-                                    if (numericTextBox) {
-                                        // Değeri tamamen temizle (0 yapma)
-                                        numericTextBox.value(null);
-                                        // Görünür input'u da temizle
-                                        $("#OverriddenPrice + span input.k-formatted-value").val("");
-                                    }
-                                """)
-                                print("JavaScript ile fiyat tamamen temizlendi.")
-                            except Exception as js_error:
-                                print(f"JavaScript hatası: {js_error}")
-                                # Alternatif: Görünür input alanını bul ve tamamen temizle
-                                try:
-                                    visible_input = drv.find_element(By.CSS_SELECTOR, "#OverriddenPrice + span input.k-formatted-value")
-                                    visible_input.clear()
-                                    # Hidden input'u da temizle
-                                    price_input.clear()
-                                    print("Görünür ve hidden input ile fiyat temizlendi.")
-                                except Exception as alt_error:
-                                    print(f"Alternatif yöntem de başarısız: {alt_error}")
-                                    # Son çare: Sadece hidden input'u temizle
-                                    price_input.clear()
-                                    print("Hidden input ile fiyat temizlendi.")
-                            
-                            print("Fiyat alanı işlendi.")
-                            
-                            # Kaydet butonuna tıkla
-                            try:
-                                save_button = WebDriverWait(drv, 10).until(
-                                    EC.element_to_be_clickable((By.CSS_SELECTOR, "button[name='save']"))
-                                )
-                                save_button.click()
-                                print("Kaydet butonuna tıklandı!")
-                                print("Fiyat başarıyla silindi!")
-                            except Exception as e:
-                                print(f"Kaydet butonu bulunamadı: {e}")
-                                continue
-                        else:
-                            print("Fiyat zaten boş veya 0, değişiklik yapılmadı.")
-                        
-                        # Ürün sayfasına geri dön
-                        drv.get(edit_url)
-                        
-                        # Ürün Varyasyonları sekmesine tekrar tıkla
-                        try:
-                            variations_tab = WebDriverWait(drv, 10).until(
-                                EC.element_to_be_clickable((By.XPATH, "//li[@data-tab-name='tab-product-attributes']"))
-                            )
-                            variations_tab.click()
-                        except:
-                            pass
-                        
-                    except Exception as e:
-                        print(f"Fiyat alanı bulunamadı: {e}")
-                        # Ürün sayfasına geri dön
-                        drv.get(edit_url)
-                        continue
-                        
-                else:
-                    print("Kombinasyon ID bulunamadı!")
-                    continue
-                    
+                log.debug(f"Kombinasyon {i} düzenleniyor... (ID: {combination_id})")
+                edit_combination_price(drv, combination_id, None)
+                log.debug("Fiyat başarıyla silindi!")
+                journal.record('clear', key, 'ok')
+            except CombinationNotFound as e:
+                # Kombinasyon artık yok, silinecek fiyat da yok
+                log.info(f"{e}, silme atlandı.")
+                COMBINATION_INDEX.invalidate(product_id)
+                journal.record('clear', key, 'ok', missing=True)
             except Exception as e:
-                print(f"Kombinasyon {i+1} işlenirken hata: {e}")
-                # Ana pencereye geri dön
-                if len(drv.window_handles) > 1:
-                    drv.switch_to.window(drv.window_handles[0])
-        
-        print(f"Ürün {product_id} başarıyla işlendi!")
-        return True
-        
+                log.error(f"Kombinasyon {i} işlenirken hata: {e}")
+                journal.record('clear', key, 'error', error=str(e))
+                success = False
+
+        log.debug(f"Ürün {product_id} işlendi!")
+        return success
+
     except Exception as e:
-        print(f"Ürün {product_id} işlenirken hata: {e}")
+        log.error(f"Ürün {product_id} işlenirken hata: {e}")
         return False
 
-def process_selenium_automation():
-    """Selenium otomasyon işlemlerini gerçekleştirir."""
-    print("Selenium Otomasyon Programı Başlatılıyor...")
-    
+@measured("selenium_prepare")
+def prepare_selenium_session(stop_event=None, plan=None):
+    """
+    Hedef fiyatlardan bağımsız Selenium hazırlığı: NE6ZAB ürün ID'leri, tarayıcı, giriş,
+    işlem günlüğü ve mevcut kombinasyon fiyatlarının okunması.
+    Hazır bir plan verilirse (apply modu) ID'ler ve mevcut durum okunmaz.
+    Veri adımlarıyla paralel çalışabilir. Başarısız olursa None döner.
+    """
     # XML'den ürün ID'lerini al
-    product_ids = get_xml_product_ids()
-    if not product_ids:
-        print("Ürün ID'leri alınamadı. Program sonlandırılıyor.")
-        return False
-    
-    # WebDriver'ı başlat
-    driver = init_driver()
-    if not driver:
-        print("WebDriver başlatılamadı. Program sonlandırılıyor.")
-        return False
-    
+    product_ids = get_xml_product_ids() if plan is None else []
+    if plan is None and not product_ids:
+        log.error("Ürün ID'leri alınamadı.")
+        return None
+
+    # WebDriver'ı başlat ve sisteme giriş yap
+    manager = DriverManager()
     try:
-        # Sisteme giriş yap
-        if not login(driver):
-            print("Giriş yapılamadı. Program sonlandırılıyor.")
-            return False
-        
-        # Her ürünü işle
-        successful_count = 0
-        total_count = len(product_ids)
-        
-        for i, product_id in enumerate(product_ids, 1):
-            print(f"\n--- Ürün {i}/{total_count} ---")
-            
-            if process_product(driver, product_id):
-                successful_count += 1
-            
-            # Ürünler arası çok kısa bekleme (sadece sistem yükünü azaltmak için)
-            time.sleep(0.5)
-        
-        print(f"\n=== İŞLEM TAMAMLANDI ===")
-        print(f"Toplam ürün: {total_count}")
-        print(f"Başarılı: {successful_count}")
-        print(f"Başarısız: {total_count - successful_count}")
-        
-        # Bulk edit son işlemleri
-        print("\nBulk edit son işlemleri başlatılıyor...")
-        if bulk_edit_final_operations(driver):
-            print("Bulk edit işlemleri başarıyla tamamlandı!")
-            
-            # Excel'den kombinasyon fiyatlarını güncelle
-            print("\nExcel'den kombinasyon fiyatları güncelleniyor...")
-            if update_combination_prices_from_excel(driver):
-                print("Tüm işlemler başarıyla tamamlandı!")
-                return True
-            else:
-                print("Excel güncelleme işlemlerinde hata oluştu!")
+        if not manager.start():
+            manager.quit()
+            return None
+
+        if plan is not None:
+            # Planın run_id'si ile açılır; yarım kalan uygulama kaldığı yerden sürer
+            journal = RunJournal(run_id=plan['run_id'])
+            if not journal.resumed:
+                journal.record('run', journal.run_id, 'started')
+        else:
+            journal = RunJournal.open(resume=RESUME)
+
+        session = {
+            'manager': manager,
+            'journal': journal,
+            'scheduler': RetryScheduler(journal),
+            'product_ids': product_ids,
+            'plan': plan,
+            'current_state': None,
+            'plan_file': PLAN_FILE,
+        }
+
+        if plan is not None:
+            return session
+
+        # Sadece dead-letter görevleri tekrar oynatılacaksa mevcut durum gerekmez
+        if REPLAY_DEAD_LETTER:
+            return session
+
+        # Devam modunda kayıtlı plan kullanılır, aksi halde mevcut durum okunur
+        session['plan'] = load_plan(journal.run_id) if journal.resumed else None
+        if session['plan'] is None:
+            snapshot = load_snapshot()
+            current_state, missing = current_state_from_snapshot(product_ids, snapshot)
+            if current_state:
+                log.info(f"{len(current_state)} ürünün durumu önceki çalışmadan alındı, {len(missing)} ürün canlı okunacak.")
+            live_state = read_current_state(manager, missing, journal, stop_event)
+            save_current_state_cache(live_state)
+            COMBINATION_INDEX.save()
+            current_state.update(live_state)
+            session['current_state'] = current_state
+            session['snapshot'] = snapshot
+        return session
+
+    except BaseException as e:
+        manager.quit()
+        if not isinstance(e, Exception):
+            raise
+        log.error(f"Selenium hazırlığında hata: {e}")
+        return None
+
+@measured("selenium_apply")
+def apply_selenium_changes(session):
+    """
+    Hedef fiyatlar hazır olduktan sonra planı çıkarır ve uygular:
+    fiyat silme, gerekirse toplu çıkarma, etiket/kategori ve fiyat yazma.
+    Tarayıcı her durumda kapatılır.
+    """
+    manager = session['manager']
+    journal = session['journal']
+    scheduler = session['scheduler']
+
+    try:
+        # Sadece dead-letter görevlerini tekrar oynat
+        if REPLAY_DEAD_LETTER:
+            return replay_dead_letters(manager, journal)
+
+        plan = session['plan']
+        if plan is None:
+            # Hedef fiyatları oku
+            try:
+                target_prices = load_target_prices()
+            except Exception as e:
+                log.error(f"Hedef fiyatlar okunamadı: {e}")
+                return False
+
+            plan = build_reconciliation_plan(session['current_state'], target_prices)
+            plan['run_id'] = journal.run_id
+            if session.get('snapshot'):
+                delta = snapshot_delta(session['snapshot'], target_prices)
+                plan['delta'] = {name: len(ids) for name, ids in delta.items()}
+                log.info(f"Önceki çalışmaya göre: {len(delta['new'])} yeni, {len(delta['changed'])} fiyatı değişen, "
+                         f"{len(delta['dropped'])} indirimden çıkan, {len(delta['same'])} aynı ürün")
+        save_plan(plan, session.get('plan_file', PLAN_FILE))
+        invalidate_snapshot(
+            [clear['product_id'] for clear in plan['clears']] + plan['removals']
+            + [update['product_id'] for update in plan['updates']]
+        )
+
+        # Gereksiz fiyatları sil
+        clears_by_product = {}
+        for clear in plan['clears']:
+            clears_by_product.setdefault(clear['product_id'], []).append(clear)
+
+        tasks = [
+            {'operation': 'clear_product', 'product_id': product_id, 'payload': clears}
+            for product_id, clears in clears_by_product.items()
+            if not journal.succeeded('clear_product', product_id)
+        ]
+        total_count = len(clears_by_product)
+        successful_count = total_count - len(tasks)
+        successful_count += scheduler.run(tasks, lambda task: run_selenium_task(manager, journal, task), "Ürün")
+
+        log.info("=== İŞLEM TAMAMLANDI ===")
+        log.info(f"Toplam ürün: {total_count}")
+        log.info(f"Başarılı: {successful_count}")
+        log.info(f"Başarısız: {total_count - successful_count}")
+
+        # İndirimden çıkan ürünlerin etiketi/kategorisi tek tek çıkarılır; reset planında
+        # kategorinin tamamı toplu düzenlemeyle boşaltılır
+        if not plan['bulk_remove'] and plan['removals']:
+            tasks = [
+                {'operation': 'untag', 'product_id': product_id, 'payload': None}
+                for product_id in plan['removals']
+                if not journal.succeeded('untag', product_id)
+            ]
+            untagged = len(plan['removals']) - len(tasks)
+            untagged += scheduler.run(tasks, lambda task: run_selenium_task(manager, journal, task), "Etiket çıkarma")
+            log.info(f"İndirimden çıkan {len(plan['removals'])} üründen {untagged} tanesinin etiketi/kategorisi çıkarıldı.")
+        elif plan['bulk_remove'] and not journal.succeeded('bulk_remove', 'bulk'):
+            log.info("Bulk edit son işlemleri başlatılıyor...")
+            manager.maybe_recycle()
+            if not bulk_edit_final_operations(manager.driver):
+                log.error("Bulk edit işlemlerinde hata oluştu!")
+                journal.record('bulk_remove', 'bulk', 'error')
                 return False
+            journal.record('bulk_remove', 'bulk', 'ok')
+            log.info("Bulk edit işlemleri başarıyla tamamlandı!")
+        elif plan['bulk_remove']:
+            log.info("Bulk edit bu çalışmada zaten yapılmış, atlanıyor.")
+        else:
+            log.info("İndirimden çıkan ürün yok, etiket/kategori çıkarma atlanıyor.")
+
+        log.info(f"Admin paneli hız durumu: {ADMIN_RATE.snapshot()}")
+
+        # Excel'den kombinasyon fiyatlarını güncelle
+        log.info("Excel'den kombinasyon fiyatları güncelleniyor...")
+        if update_combination_prices_from_excel(manager, plan, journal, scheduler):
+            try:
+                save_snapshot(plan, journal, session['current_state'])
+            except OSError as e:
+                log.warning(f"Önceki çalışma kaydı yazılamadı: {e}")
+            journal.finish()
+            prune_dead_letters()
+            log.info(f"Admin paneli hız durumu: {ADMIN_RATE.snapshot()}")
+            log.info(f"Tarayıcı yeniden başlatma sayısı: {manager.restarts}")
+            if scheduler.dead_letters:
+                log.warning(f"⚠️ {len(scheduler.dead_letters)} görev dead-letter dosyasına yazıldı: {DEAD_LETTER_FILE}")
+            log.info("Tüm işlemler başarıyla tamamlandı!")
+            return True
         else:
-            print("Bulk edit işlemlerinde hata oluştu!")
+            log.error("Excel güncelleme işlemlerinde hata oluştu!")
             return False
-        
+
     except KeyboardInterrupt:
-        print("\nProgram kullanıcı tarafından durduruldu.")
+        log.warning("Program kullanıcı tarafından durduruldu.")
         return False
     except Exception as e:
-        print(f"Beklenmeyen hata: {e}")
+        log.error(f"Beklenmeyen hata: {e}")
         return False
     finally:
+        try:
+            COMBINATION_INDEX.save()
+            log.info(f"Kombinasyon indeksi: {COMBINATION_INDEX.snapshot()}")
+        except OSError as e:
+            log.warning(f"Kombinasyon indeksi kaydedilemedi: {e}")
+
         # Tarayıcıyı kapat
-        print("Tarayıcı kapatılıyor...")
-        driver.quit()
-        print("Program sonlandırıldı.")
+        log.info("Tarayıcı kapatılıyor...")
+        manager.quit()
+        log.info("Program sonlandırıldı.")
+
+def process_selenium_automation():
+    """Selenium otomasyon işlemlerini gerçekleştirir."""
+    log.info("Selenium Otomasyon Programı Başlatılıyor...")
+
+    session = prepare_selenium_session()
+    if session is None:
+        log.error("Selenium hazırlığı başarısız. Program sonlandırılıyor.")
+        return False
 
+    return apply_selenium_changes(session)
+
+def run_pipeline_concurrently(stages) -> bool:
+    """
+    Veri adımlarını (1-3) ve hedef fiyatlara ihtiyaç duymayan Selenium hazırlığını
+    (NE6ZAB ID'leri, tarayıcı, giriş, mevcut fiyatların okunması) paralel çalıştırır.
+    Sadece planın uygulanması iki kolun da bitmesini bekler.
+    """
+    data_stages = [stage for stage in stages if stage['name'] != 'selenium']
+    stop_event = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="pipeline") as executor:
+        session_future = executor.submit(prepare_selenium_session, stop_event)
+        data_future = executor.submit(run_stages, data_stages)
+
+        data_ok = data_future.result()
+        if not data_ok:
+            # Veri adımları başarısızsa tarayıcı kolunu erken durdur
+            stop_event.set()
+        session = session_future.result()
+
+    if not data_ok:
+        if session is not None:
+            session['manager'].quit()
+        return False
+
+    log.info("🔸 ADIM 4: SELENİUM DEĞİŞİKLİKLERİ UYGULANIYOR")
+    log.info("-" * 50)
+    if session is None:
+        log.error("❌ Selenium hazırlığı başarısız!")
+        return False
+
+    if not apply_selenium_changes(session):
+        log.error("❌ Selenium otomasyonu başarısız!")
+        return False
+    return True
+
+
+# ─────────── AŞAMA ÖNBELLEĞİ ───────────
+# STAGE_CACHE=0 ile kapatılır. İndirme aşamalarının anahtarı indirilen içeriğin özetidir; kaynak
+# değişmediyse ayrıştırma/filtreleme tekrar yapılmaz. Kayıtlar en fazla STAGE_CACHE_TTL_HOURS geçerlidir.
+STAGE_CACHE           = os.environ.get("STAGE_CACHE", "1") != "0"
+STAGE_CACHE_DIR       = os.environ.get("STAGE_CACHE_DIR", ".stage_cache")
+STAGE_CACHE_TTL_HOURS = float(os.environ.get("STAGE_CACHE_TTL_HOURS", "6"))
+# PIPELINE_CONCURRENT=0 ile adımlar sırayla çalışır
+PIPELINE_CONCURRENT   = os.environ.get("PIPELINE_CONCURRENT", "1") != "0"
+# Komut satırında komut verilmezse kullanılır: full (varsayılan) | plan | apply | ...
+RUN_MODE              = os.environ.get("RUN_MODE", "full")
+# ───────────────────────────────────────
+
+def file_digest(path: str) -> str:
+    """Dosya içeriğinin SHA-256 özetini döner, dosya yoksa boş string."""
+    if not os.path.exists(path):
+        return ""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def code_version() -> str:
+    """Betiğin kendi içeriğinin özeti; kod değişince tüm önbellek geçersiz olur."""
+    return file_digest(os.path.abspath(__file__))[:16]
+
+# Bu çalışmada indirilen kaynaklar {url: içerik veya hata}; anahtar hesabı ile aşama aynı içeriği kullanır
+SOURCE_PAYLOADS = {}
+
+def fetch_source(url: str, fetcher):
+    """
+    Kaynağı bu çalışmada bir kez indirir; aşama anahtarı ve aşamanın kendisi aynı içeriği
+    kullanır. İndirme hatası da saklanır ve tekrar fırlatılır (yeniden denemeler tekrarlanmaz).
+    """
+    if url not in SOURCE_PAYLOADS:
+        try:
+            SOURCE_PAYLOADS[url] = fetcher(url)
+        except Exception as e:
+            SOURCE_PAYLOADS[url] = e
+    payload = SOURCE_PAYLOADS[url]
+    if isinstance(payload, Exception):
+        raise payload
+    return payload
+
+def sources_digest(urls, fetcher) -> str:
+    """İndirilen kaynakların içerik özeti; indirilemeyen kaynak boş içerik sayılır."""
+    digest = hashlib.sha256()
+    for url in urls:
+        try:
+            payload = fetch_source(url, fetcher)
+        except Exception:
+            payload = b""
+        digest.update(url.encode("utf-8"))
+        digest.update(hashlib.sha256(payload.encode("utf-8") if isinstance(payload, str) else payload).digest())
+    return digest.hexdigest()
+
+def stage_cache_key(stage) -> str:
+    """Aşama girdileri ve kod sürümünden içerik adresli anahtar üretir."""
+    inputs = stage['inputs']()
+    payload = json.dumps({'stage': stage['name'], 'code': code_version(), 'inputs': inputs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+def restore_stage_outputs(stage, key) -> bool:
+    """Önbellekte aynı anahtarlı çıktı varsa çalışma dizinine kopyalar."""
+    cache_dir = os.path.join(STAGE_CACHE_DIR, stage['name'], key)
+    if not all(os.path.exists(os.path.join(cache_dir, output)) for output in stage['outputs']):
+        return False
+    # İçerik aynı olsa da eski kayıt kullanılmaz (üst sınır)
+    if time.time() - os.path.getmtime(cache_dir) > STAGE_CACHE_TTL_HOURS * 3600:
+        return False
+    for output in stage['outputs']:
+        shutil.copyfile(os.path.join(cache_dir, output), output)
+    return True
+
+def store_stage_outputs(stage, key):
+    """Aşama çıktılarını anahtarına göre önbelleğe kaydeder, eski anahtarları siler."""
+    stage_dir = os.path.join(STAGE_CACHE_DIR, stage['name'])
+    if os.path.isdir(stage_dir):
+        shutil.rmtree(stage_dir)
+    cache_dir = os.path.join(stage_dir, key)
+    os.makedirs(cache_dir, exist_ok=True)
+    for output in stage['outputs']:
+        shutil.copyfile(output, os.path.join(cache_dir, output))
+
+def build_stages():
+    """
+    Aşamaları girdileri ve çıktılarıyla tanımlar.
+    inputs: aşama çalışmadan hemen önce değerlendirilir (üst aşama çıktılarının özeti dahil).
+    cacheable False olan aşama (yan etkili Selenium) her zaman çalışır. Birleştirme adımı
+    Supabase tanımlıyken önbelleğe alınmaz: satışa giriş tarihleri adımın içinde canlı
+    sorgulanır ve anahtar hesabında bilinemez.
+    """
+    return [
+        {
+            'name': 'xml',
+            'title': "ADIM 1: XML VERİLERİ İŞLENİYOR",
+            'func': process_xml_data,
+            'inputs': lambda: {'feed': sources_digest(XML_FEED_URLS, get_xml_data), 'rules': RULES.digest},
+            'outputs': ["urun_verileri.xlsx", RAW_PRODUCTS_FILE],
+            'cacheable': True,
+            'error': "❌ XML işleme başarısız! Program sonlandırılıyor.",
+        },
+        {
+            'name': 'orders',
+            'title': "ADIM 2: EXCEL VERİLERİ İŞLENİYOR",
+            'func': process_excel_data_from_url,
+            'inputs': lambda: {'orders': sources_digest([ORDER_XLS_URL], download_excel_file)},
+            'outputs': ["islenmis_veriler.xlsx"],
+            'cacheable': True,
+            'error': "❌ Excel işleme başarısız! Program sonlandırılıyor.",
+        },
+        {
+            'name': 'merge',
+            'title': "ADIM 3: EXCEL DOSYALARI BİRLEŞTİRİLİYOR",
+            'func': merge_excel_data,
+            'inputs': lambda: {
+                'urun_verileri': file_digest("urun_verileri.xlsx"),
+                'islenmis_veriler': file_digest("islenmis_veriler.xlsx"),
+                # "Son 5 gün" filtresi güne bağlı
+                'date': time.strftime("%Y-%m-%d"),
+                'rules': RULES.digest,
+            },
+            'outputs': ["guncellenmis_urun_verileri.xlsx"],
+            'cacheable': not supabase_configured(),
+            'error': "❌ Excel birleştirme başarısız! Program sonlandırılıyor.",
+        },
+        {
+            'name': 'selenium',
+            'title': "ADIM 4: SELENİUM OTOMASYONU BAŞLATILIYOR",
+            'func': process_selenium_automation,
+            'inputs': lambda: {},
+            'outputs': [],
+            'cacheable': False,
+            'error': "❌ Selenium otomasyonu başarısız!",
+        },
+    ]
+
+def run_stages(stages, use_cache: bool = STAGE_CACHE) -> bool:
+    """Aşamaları sırayla çalıştırır; girdileri değişmemiş aşamaların çıktısı önbellekten gelir."""
+    for stage in stages:
+        log.info(f"🔸 {stage['title']}")
+        log.info("-" * 50)
+
+        key = stage_cache_key(stage) if use_cache and stage['cacheable'] else None
+        if key and restore_stage_outputs(stage, key):
+            log.info(f"⏩ Girdiler değişmemiş, önbellekteki çıktı kullanıldı ({key[:8]}).")
+            SOURCE_PAYLOADS.clear()
+            continue
+
+        metric_name = f"stage_{stage['name']}"
+        with METRICS.stage(metric_name), profiled(metric_name):
+            ok = stage['func']()
+        SOURCE_PAYLOADS.clear()
+        if not ok:
+            log.info(stage['error'])
+            return False
+
+        if key:
+            store_stage_outputs(stage, key)
+
+    return True
+
+def run_plan_mode() -> bool:
+    """
+    Adım 1-3'ü çalıştırır ve tarayıcı açmadan (Selenium yüklenmeden) değişiklik planını
+    çıkarır: silinecek fiyatlar, etiket/kategori eklemeleri ve önce/sonra değerleriyle
+    fiyat yazımları. Plan apply moduyla uygulanır.
+    """
+    data_stages = [stage for stage in build_stages() if stage['name'] != 'selenium']
+    if not run_stages(data_stages):
+        return False
+
+    log.info("🔸 PLAN ÇIKARILIYOR (tarayıcısız)")
+    log.info("-" * 50)
+    product_ids = get_xml_product_ids()
+    if not product_ids:
+        log.error("Ürün ID'leri alınamadı.")
+        return False
 
-def main():
-    """Ana fonksiyon - tüm işlemleri sırayla çalıştırır."""
-    print("=" * 80)
-    print("HAYDIGIY OTOMASYON PROGRAMI BAŞLATILIYOR")
-    print("=" * 80)
-    
     try:
-        # 1. ADIM: XML verilerini işle
-        print("\n🔸 ADIM 1: XML VERİLERİ İŞLENİYOR")
-        print("-" * 50)
-        if not process_xml_data():
-            print("❌ XML işleme başarısız! Program sonlandırılıyor.")
-            return
-        
-        # 2. ADIM: Excel verilerini işle
-        print("\n🔸 ADIM 2: EXCEL VERİLERİ İŞLENİYOR")
-        print("-" * 50)
-        if not process_excel_data_from_url():
-            print("❌ Excel işleme başarısız! Program sonlandırılıyor.")
-            return
-        
-        # 3. ADIM: Excel dosyalarını birleştir
-        print("\n🔸 ADIM 3: EXCEL DOSYALARI BİRLEŞTİRİLİYOR")
-        print("-" * 50)
-        if not merge_excel_data():
-            print("❌ Excel birleştirme başarısız! Program sonlandırılıyor.")
-            return
-        
-        # 4. ADIM: Selenium otomasyonu
-        print("\n🔸 ADIM 4: SELENİUM OTOMASYONU BAŞLATILIYOR")
-        print("-" * 50)
-        if not process_selenium_automation():
-            print("❌ Selenium otomasyonu başarısız!")
-            return
-        
-        print("\n" + "=" * 80)
-        print("✅ TÜM İŞLEMLER BAŞARIYLA TAMAMLANDI!")
-        print("=" * 80)
-        
-    except KeyboardInterrupt:
-        print("\n⚠️ Program kullanıcı tarafından durduruldu.")
+        target_prices = load_target_prices()
     except Exception as e:
-        print(f"\n❌ Beklenmeyen hata: {e}")
-        import traceback
-        traceback.print_exc()
+        log.error(f"Hedef fiyatlar okunamadı: {e}")
+        return False
 
-if __name__ == "__main__":
-    main()
+    snapshot = load_snapshot()
+    current_state, missing = current_state_from_snapshot(product_ids, snapshot)
+    if current_state:
+        log.info(f"{len(current_state)} ürünün durumu önceki çalışmadan alındı, {len(missing)} ürün HTTP ile okunacak.")
+    if missing:
+        current_state.update(read_current_state_http(missing))
+    plan = build_reconciliation_plan(current_state, target_prices)
+    plan['run_id'] = time.strftime("%Y%m%d-%H%M%S")
+    plan['mode'] = 'plan'
+    if snapshot:
+        plan['delta'] = {name: len(ids) for name, ids in snapshot_delta(snapshot, target_prices).items()}
+    save_plan(plan)
+    return True
+
+def run_apply_mode(plan_file: str = PLAN_FILE) -> bool:
+    """Plan modunda çıkarılan planı tarayıcıyla uygular; mevcut durum tekrar okunmaz."""
+    try:
+        with open(plan_file, "r", encoding="utf-8") as f:
+            plan = json.load(f)
+    except (OSError, ValueError) as e:
+        log.error(f"Plan dosyası okunamadı ({plan_file}): {e}")
+        return False
+
+    log.info(f"🔸 PLAN UYGULANIYOR ({plan_file}, run_id: {plan.get('run_id')})")
+    log.info("-" * 50)
+    session = prepare_selenium_session(plan=plan)
+    if session is None:
+        log.error("❌ Selenium hazırlığı başarısız!")
+        return False
+    return apply_selenium_changes(session)
+
+def run_reset_mode() -> bool:
+    """
+    İndirimi sıfırlar: NE6ZAB feed'indeki ürünlerin dolu kombinasyon fiyatlarını siler ve
+    indirim etiketi/kategorisini toplu olarak çıkarır. Hedef fiyat gerekmediği için
+    pandas/openpyxl yüklenmez.
+    """
+    log.info("🔸 İNDİRİM SIFIRLANIYOR")
+    log.info("-" * 50)
+    product_ids = get_xml_product_ids()
+    if not product_ids:
+        log.error("Ürün ID'leri alınamadı.")
+        return False
+
+    plan = {
+        'run_id': time.strftime("%Y%m%d-%H%M%S"),
+        'mode': 'reset',
+        # combination_id None: ürünün tüm dolu fiyatları canlı okunup silinir
+        'clears': [{'product_id': product_id, 'combination_id': None, 'before': None} for product_id in product_ids],
+        'removals': list(product_ids),
+        'bulk_remove': True,
+        'updates': [],
+        'unchanged': [],
+    }
+    session = prepare_selenium_session(plan=plan)
+    if session is None:
+        log.error("❌ Selenium hazırlığı başarısız!")
+        return False
+    session['plan_file'] = RESET_PLAN_FILE
+    return apply_selenium_changes(session)
 
+def run_full_mode() -> bool:
+    """XML → sipariş Excel'i → birleştirme → Selenium zincirinin tamamını çalıştırır."""
+    # Varsayılan olarak veri adımları ile tarayıcı hazırlığı paralel çalışır
+    if PIPELINE_CONCURRENT:
+        return run_pipeline_concurrently(build_stages())
+    return run_stages(build_stages())
 
+def run_named_stages(names, use_cache: bool = True) -> bool:
+    """Sadece adı verilen veri aşamalarını çalıştırır (girdi dosyaları hazır olmalı)."""
+    stages = [stage for stage in build_stages() if stage['name'] in names]
+    return run_stages(stages, use_cache=use_cache and STAGE_CACHE)
 
+def simulate_rules(merged_df, rules: RuleSet, launch_dates) -> dict:
+    """Tek bir kural setini önbellekteki veriye uygular; sonuç tablosu ve özet döner."""
+    start = time.perf_counter()
+    filtered = merged_df[rules.product_mask(merged_df)].copy()
+    result = apply_discount_rules(filtered, rules, launch_dates=launch_dates)
 
+    priced = result[result['VaryantFiyati'].notna()]
+    current = pd.to_numeric(priced['GuncelSatisFiyati'].astype(str).str.replace(',', '.', regex=False),
+                            errors='coerce')
+    multipliers = rules.multipliers(priced['SismeOrani'])
+    unknown_dates = int((~filtered['StokKodu'].astype(str).isin(launch_dates)).sum())
 
+    summary = {
+        'name': rules.name,
+        'source': rules.source,
+        'digest': rules.digest,
+        'filtered_products': len(filtered),
+        'discounted_products': len(result),
+        'priced_products': len(priced),
+        'tiers': {str(multiplier): int(count) for multiplier, count in multipliers.value_counts().sort_index().items()},
+        'average_discount_percent': round(float((1 - priced['VaryantFiyati'] / current).mean() * 100), 2) if len(priced) else None,
+        'total_price_reduction': round(float((current - priced['VaryantFiyati']).sum()), 2),
+        'products_without_launch_date': unknown_dates,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+    prices = dict(zip(priced['IdUrun'].astype(str), priced['VaryantFiyati'].round(2)))
+    return {'summary': summary, 'prices': prices}
+
+def run_simulate_mode(rule_files) -> bool:
+    """
+    Etkin kuralları (RULES) ve verilen alternatif kural setlerini aynı önbellekteki veriye
+    (ham feed, sipariş adetleri, Supabase tarih önbelleği) uygular ve sonuçları karşılaştırır.
+    Ağ erişimi yapılmaz; girdiler fetch ve aggregate komutlarıyla hazırlanır.
+    """
+    log.info("🔸 KURAL SİMÜLASYONU")
+    log.info("-" * 50)
+    try:
+        rule_sets = [RULES] + [RuleSet.from_file(path) for path in rule_files]
+    except (OSError, ValueError) as e:
+        log.error(f"Kural dosyası okunamadı: {e}")
+        return False
+
+    missing = [path for path in (RAW_PRODUCTS_FILE, "islenmis_veriler.xlsx") if not os.path.exists(path)]
+    if missing:
+        log.error(f"Simülasyon girdileri yok: {', '.join(missing)} (önce fetch ve aggregate çalıştırın)")
+        return False
+
+    raw_df = pd.read_pickle(RAW_PRODUCTS_FILE)
+    islenmis_df = pd.read_excel("islenmis_veriler.xlsx")
+    launch_dates = load_launch_dates()
+    if not launch_dates:
+        log.warning(f"{LAUNCH_DATES_FILE} yok; satışa giriş tarihi filtresi uygulanmayacak.")
+
+    # Kurallardan bağımsız birleştirme bir kez yapılır
+    merged_df = merge_order_counts(raw_df.copy(), islenmis_df)
+
+    results = []
+    for rules in rule_sets:
+        log.info(f"Kural seti: {rules.describe()}")
+        results.append(simulate_rules(merged_df, rules, launch_dates))
+
+    # Her alternatifi etkin kurallarla karşılaştır
+    baseline = results[0]['prices']
+    for result in results:
+        prices = result['prices']
+        common = baseline.keys() & prices.keys()
+        result['summary']['compared_to_baseline'] = {
+            'added': len(prices.keys() - baseline.keys()),
+            'removed': len(baseline.keys() - prices.keys()),
+            'price_changed': sum(1 for product_id in common if prices[product_id] != baseline[product_id]),
+        }
+
+    with open(SIMULATION_FILE, "w", encoding="utf-8") as f:
+        json.dump({
+            'created_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'products': len(raw_df),
+            'rule_sets': [result['summary'] for result in results],
+        }, f, ensure_ascii=False, indent=2)
+
+    log.info("=== SİMÜLASYON SONUCU ===")
+    log.info(f"{'Kural seti':<24}{'Süzülen':>10}{'İndirimli':>11}{'Ort. %':>8}{'Eklenen':>9}{'Çıkan':>7}{'Fiyat Δ':>9}")
+    for result in results:
+        summary = result['summary']
+        diff = summary['compared_to_baseline']
+        average = summary['average_discount_percent']
+        log.info(f"{summary['name'][:23]:<24}{summary['filtered_products']:>10}{summary['priced_products']:>11}"
+                 f"{'-' if average is None else average:>8}{diff['added']:>9}{diff['removed']:>7}{diff['price_changed']:>9}")
+    log.info(f"📁 Simülasyon dosyası: {SIMULATION_FILE}")
+    return True
+
+# Çoklu mağaza çalıştırıcı
+
+# ─────────── MAĞAZA PROFİLLERİ ───────────
+# stores komutu STORES_FILE'daki her profili kendi sürecinde ve kendi çalışma dizininde
+# (STORES_DIR/<ad>) çalıştırır: oturum, günlük, önbellek, HTTP bağlantıları ve tarayıcı
+# mağazalar arasında paylaşılmaz. Aynı anda en fazla STORES_MAX_PARALLEL mağaza çalışır.
+STORES_FILE         = os.environ.get("STORES_FILE", "magazalar.json")
+STORES_DIR          = os.environ.get("STORES_DIR", "magazalar")
+STORES_MAX_PARALLEL = int(os.environ.get("STORES_MAX_PARALLEL", "2"))
+STORES_SUMMARY_FILE = "magaza_ozeti.json"
+# ─────────────────────────────────────────
+
+# Profil alanı → alt sürece verilen ortam değişkeni
+STORE_PROFILE_ENV = {
+    'base_url': "ADMIN_BASE_URL",
+    'product_feed': "PRODUCT_FEED_TOKEN",
+    'product_feed_pages': "PRODUCT_FEED_PAGES",
+    'order_feed': "ORDER_FEED_TOKEN",
+    'discount_feed': "DISCOUNT_FEED_TOKEN",
+    'tag_id': "DISCOUNT_TAG_ID",
+    'category_id': "DISCOUNT_CATEGORY_ID",
+    'rules': "RULES_FILE",
+}
+STORE_PROFILE_KEYS = {'name', 'command', 'args', 'env'} | set(STORE_PROFILE_ENV)
+
+def load_store_profiles(path: str = STORES_FILE):
+    """
+    Mağaza profillerini JSON/YAML dosyasından okur ve doğrular (kural dosyaları dahil). Hatalı profil varsa hiçbir
+    mağaza başlatılmadan ValueError fırlatılır. (profiller, dosyadaki max_parallel) döner.
+
+    Biçim: {"max_parallel": 2, "stores": [{"name": "haydigiy", "product_feed": "2XO5DS",
+    "tag_id": 241, "env": {"HAYDIGIY_USER": "${HAYDIGIY_USER}"}}, ...]}
+    env değerlerindeki ${DEĞİŞKEN} ifadeleri ana sürecin ortamından doldurulur.
+    """
+    try:
+        config = load_config_file(path)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
+    profiles = config.get('stores') if isinstance(config, dict) else config
+    if not isinstance(profiles, list) or not profiles:
+        raise ValueError(f"{path}: 'stores' listesi boş veya yok")
+
+    names = set()
+    for index, profile in enumerate(profiles, 1):
+        if not isinstance(profile, dict):
+            raise ValueError(f"{path}: {index}. profil bir nesne değil")
+        name = str(profile.get('name', ""))
+        if not re.fullmatch(r"[A-Za-z0-9_.-]+", name):
+            raise ValueError(f"{path}: {index}. profilin adı geçersiz: {name!r}")
+        if name in names:
+            raise ValueError(f"{path}: '{name}' adı birden fazla profilde kullanılmış")
+        names.add(name)
+
+        unknown = set(profile) - STORE_PROFILE_KEYS
+        if unknown:
+            raise ValueError(f"{path}: '{name}' profilinde bilinmeyen alan(lar): {', '.join(sorted(unknown))}")
+        command = profile.get('command', 'full')
+        if command not in COMMANDS or command == 'stores':
+            raise ValueError(f"{path}: '{name}' profilinde geçersiz komut: {command!r}")
+        if not isinstance(profile.get('env', {}), dict) or not isinstance(profile.get('args', []), list):
+            raise ValueError(f"{path}: '{name}' profilinde 'env' nesne, 'args' liste olmalı")
+        if 'rules' in profile:
+            RuleSet.from_file(str(profile['rules']))
+
+    max_parallel = config.get('max_parallel') if isinstance(config, dict) else None
+    return profiles, max_parallel
+
+def store_environment(profile) -> dict:
+    """Profilin alt süreç ortamını hazırlar: ana ortam + profil alanları + profil env'i."""
+    env = dict(os.environ)
+    for key, variable in STORE_PROFILE_ENV.items():
+        if key in profile:
+            env[variable] = str(profile[key])
+    if 'rules' in profile:
+        # Alt süreç kendi dizininde çalışır
+        env['RULES_FILE'] = os.path.abspath(str(profile['rules']))
+    for variable, value in profile.get('env', {}).items():
+        env[variable] = os.path.expandvars(str(value))
+    env['STORE_NAME'] = profile['name']
+    # Özet için her mağazanın ölçümleri tutulur
+    env.setdefault('METRICS', "1")
+    env.pop('RUN_MODE', None)
+    return env
+
+def summarize_store_outputs(work_dir: str) -> dict:
+    """Mağaza dizinindeki ölçüm ve plan dosyalarından özet alanları çıkarır."""
+    summary = {}
+    try:
+        with open(os.path.join(work_dir, METRICS_JSON_FILE), "r", encoding="utf-8") as f:
+            metrics = json.load(f)
+        summary['peak_rss_bytes'] = metrics.get('peak_rss_bytes')
+        summary['http_bytes'] = metrics.get('http_bytes')
+    except (OSError, ValueError):
+        pass
+
+    for plan_file in (PLAN_FILE, RESET_PLAN_FILE):
+        path = os.path.join(work_dir, plan_file)
+        if not os.path.exists(path):
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                plan = json.load(f)
+        except (OSError, ValueError):
+            continue
+        summary['plan'] = {
+            'file': plan_file,
+            'run_id': plan.get('run_id'),
+            'clears': len(plan.get('clears', [])),
+            'removals': len(plan.get('removals', [])),
+            'price_sets': sum(1 for update in plan.get('updates', []) if update.get('set_price')),
+            'unchanged': len(plan.get('unchanged', [])),
+        }
+        break
+    return summary
+
+def run_store(profile, script: str, stores_dir: str = STORES_DIR) -> dict:
+    """Tek mağazanın komutunu ayrı bir süreçte çalıştırır; çıktısı dizinindeki run.log'a yazılır."""
+    name = profile['name']
+    command = profile.get('command', 'full')
+    work_dir = os.path.abspath(os.path.join(stores_dir, name))
+    os.makedirs(work_dir, exist_ok=True)
+    log_path = os.path.join(work_dir, "run.log")
+
+    log.info(f"🏬 {name}: {command} başlatıldı ({work_dir})")
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log_file:
+        completed = subprocess.run(
+            [sys.executable, script, command, *map(str, profile.get('args', []))],
+            cwd=work_dir, env=store_environment(profile),
+            stdout=log_file, stderr=subprocess.STDOUT,
+        )
+    seconds = time.perf_counter() - start
+
+    result = {
+        'name': name,
+        'command': command,
+        'ok': completed.returncode == 0,
+        'returncode': completed.returncode,
+        'seconds': round(seconds, 2),
+        'log': log_path,
+    }
+    result.update(summarize_store_outputs(work_dir))
+    if result['ok']:
+        log.info(f"✅ {name}: {seconds:.1f} sn")
+    else:
+        log.error(f"❌ {name}: çıkış kodu {completed.returncode}, ayrıntılar: {log_path}")
+    return result
+
+def run_stores(path: str = STORES_FILE, max_parallel: int = None) -> bool:
+    """
+    Mağaza profillerini paralel çalıştırır ve birleşik özeti STORES_DIR/magaza_ozeti.json'a
+    yazar. Eşzamanlılık üst sınırı: komut satırı > dosyadaki max_parallel > STORES_MAX_PARALLEL.
+    """
+    try:
+        profiles, file_max_parallel = load_store_profiles(path)
+    except (OSError, ValueError) as e:
+        log.error(f"Mağaza profilleri okunamadı: {e}")
+        return False
+
+    workers = max(1, min(len(profiles), max_parallel or file_max_parallel or STORES_MAX_PARALLEL))
+    log.info(f"🔸 {len(profiles)} MAĞAZA ÇALIŞTIRILIYOR (aynı anda en fazla {workers})")
+    log.info("-" * 50)
+
+    script = os.path.abspath(__file__)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="store") as executor:
+        results = list(executor.map(lambda profile: run_store(profile, script), profiles))
+    wall = time.perf_counter() - start
+
+    summary = {
+        'started_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'wall_seconds': round(wall, 2),
+        # Mağazalar sırayla çalışsaydı geçecek süre
+        'serial_seconds': round(sum(result['seconds'] for result in results), 2),
+        'max_parallel': workers,
+        'succeeded': sum(1 for result in results if result['ok']),
+        'failed': sum(1 for result in results if not result['ok']),
+        'stores': results,
+    }
+    os.makedirs(STORES_DIR, exist_ok=True)
+    summary_path = os.path.join(STORES_DIR, STORES_SUMMARY_FILE)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    log.info("=== MAĞAZA ÖZETİ ===")
+    for result in results:
+        plan = result.get('plan')
+        plan_text = (f", silinecek {plan['clears']}, yazılacak {plan['price_sets']}, "
+                     f"indirimden çıkan {plan['removals']}") if plan else ""
+        log.info(f"{'✅' if result['ok'] else '❌'} {result['name']} ({result['command']}): "
+                 f"{result['seconds']:.1f} sn{plan_text}")
+    log.info(f"Toplam: {summary['succeeded']} başarılı, {summary['failed']} başarısız; "
+             f"{wall:.1f} sn (sırayla {summary['serial_seconds']:.1f} sn)")
+    log.info(f"📁 Özet dosyası: {summary_path}")
+    return summary['failed'] == 0
+
+# Komut → (açıklama, çalıştırıcı). Sadece ilgili aşamanın kütüphaneleri yüklenir.
+COMMANDS = {
+    'full': ("Tüm zincir (varsayılan)", lambda args: run_full_mode()),
+    'fetch': ("XML feed'lerini indir ve süz → urun_verileri.xlsx",
+              lambda args: run_named_stages(['xml'], use_cache=not args.no_cache)),
+    'aggregate': ("Sipariş Excel'ini indir ve topla → islenmis_veriler.xlsx",
+                  lambda args: run_named_stages(['orders'], use_cache=not args.no_cache)),
+    'merge': ("Dosyaları birleştir, hedef fiyatları hesapla → guncellenmis_urun_verileri.xlsx",
+              lambda args: run_named_stages(['merge'], use_cache=not args.no_cache)),
+    'plan': ("Veri adımları + tarayıcısız değişiklik planı", lambda args: run_plan_mode()),
+    'reset': ("NE6ZAB ürünlerinin fiyatlarını sil, etiket/kategoriyi çıkar (pandas yüklenmez)",
+              lambda args: run_reset_mode()),
+    'apply': ("Kayıtlı planı tarayıcıyla uygula", lambda args: run_apply_mode(args.plan_file)),
+    'simulate': ("Alternatif kural setlerini (--compare-rules) önbellekteki veriye uygula ve karşılaştır",
+                 lambda args: run_simulate_mode(args.compare_rules)),
+    'stores': ("Mağaza profillerini (STORES_FILE) ayrı süreçlerde paralel çalıştır",
+               lambda args: run_stores(args.stores_file, args.parallel)),
+}
+
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Haydigiy varyasyon fiyatı otomasyonu.")
+    parser.add_argument("command", nargs="?", default=RUN_MODE, choices=list(COMMANDS),
+                        help="; ".join(f"{name}: {description}" for name, (description, _) in COMMANDS.items()))
+    parser.add_argument("--plan-file", default=PLAN_FILE, help="apply komutunun okuyacağı plan dosyası")
+    parser.add_argument("--no-cache", action="store_true", help="Aşama önbelleğini kullanma")
+    parser.add_argument("--rules", default=None, metavar="DOSYA",
+                        help="Kullanılacak kural dosyası (RULES_FILE ile aynı)")
+    parser.add_argument("--compare-rules", action="append", default=[], metavar="DOSYA",
+                        help="simulate komutunda karşılaştırılacak kural dosyası (birden fazla verilebilir)")
+    parser.add_argument("--stores-file", default=STORES_FILE, help="stores komutunun okuyacağı profil dosyası")
+    parser.add_argument("--parallel", type=int, default=None,
+                        help="stores komutunda aynı anda çalışacak en fazla mağaza (STORES_MAX_PARALLEL ile aynı)")
+    parser.add_argument("--profile", default=None, metavar="AŞAMALAR",
+                        help="Virgülle ayrılmış profillenecek aşamalar (PROFILE_STAGES ile aynı)")
+    parser.add_argument("--profile-mode", default=None, choices=["cprofile", "tracemalloc", "sample"],
+                        help="Profil türü (PROFILE_MODE ile aynı)")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    """Ana fonksiyon - komut satırındaki komutu (varsayılan: tüm zincir) çalıştırır."""
+    global PROFILE_STAGES, RULES
+    args = parse_args(argv)
+    setup_logging()
+
+    # Kurallar hiçbir adım başlamadan doğrulanır
+    rules_file = args.rules or RULES_FILE
+    if rules_file:
+        try:
+            RULES = RuleSet.from_file(rules_file)
+        except (OSError, ValueError) as e:
+            log.error(f"❌ Kural dosyası geçersiz: {e}")
+            return 2
+
+    if args.profile is not None:
+        PROFILE_STAGES = frozenset(name.strip() for name in args.profile.split(",") if name.strip())
+    if args.profile_mode is not None:
+        PROFILER.mode = args.profile_mode
+
+    log.info("=" * 80)
+    log.info(f"HAYDIGIY OTOMASYON PROGRAMI BAŞLATILIYOR ({args.command}{', ' + STORE_NAME if STORE_NAME else ''})")
+    log.info("=" * 80)
+    if rules_file:
+        log.info(f"Kurallar: {RULES.describe()}")
+
+    ok = False
+    try:
+        ok = COMMANDS[args.command][1](args)
+        if ok:
+            log.info("=" * 80)
+            log.info("✅ TÜM İŞLEMLER BAŞARIYLA TAMAMLANDI!")
+            log.info("=" * 80)
+
+    except KeyboardInterrupt:
+        log.warning("⚠️ Program kullanıcı tarafından durduruldu.")
+    except Exception as e:
+        log.exception(f"❌ Beklenmeyen hata: {e}")
+    finally:
+        if METRICS_ENABLED:
+            try:
+                METRICS.export()
+            except OSError as e:
+                log.error(f"Ölçümler kaydedilemedi: {e}")
+        if PROFILE_STAGES:
+            try:
+                PROFILER.export()
+            except OSError as e:
+                log.error(f"Profil çıktıları kaydedilemedi: {e}")
+
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+"""Feed sayfalarının parçalara bölünmesi (split_product_chunks) testleri."""
+import pytest
+
+import run_automation as automation
+
+
+def product_feed(count):
+    products = "".join(
+        f"<Product><IdUrun>{index}</IdUrun><UrunAdi>Ürün {index} &amp; Co</UrunAdi><StokKodu>SK{index}</StokKodu></Product>"
+        for index in range(count)
+    )
+    return f'<?xml version="1.0" encoding="utf-8"?><Products>{products}</Products>'
+
+
+@pytest.mark.parametrize("chunk_bytes", [1, 100, 1000, 10 ** 9])
+def test_chunks_preserve_every_product(chunk_bytes):
+    feed = product_feed(50)
+    chunks = automation.split_product_chunks(feed, chunk_bytes)
+
+    if chunk_bytes == 10 ** 9:
+        assert chunks == [feed]
+    else:
+        assert len(chunks) > 1
+        body = "".join(chunk[len("<Products>"):-len("</Products>")] for chunk in chunks)
+        assert body == feed[feed.find("<Product>"):feed.rfind("</Product>") + len("</Product>")]
+
+    ids = [product_id for chunk in chunks
+           for product_id in automation.parse_product_columns(chunk, 'etree')['IdUrun']]
+    assert ids == [str(index) for index in range(50)]
+
+
+def test_feed_without_products_is_single_chunk():
+    feed = "<Products></Products>"
+    assert automation.split_product_chunks(feed, 1) == [feed]
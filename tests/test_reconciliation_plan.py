@@ -0,0 +1,88 @@
+"""Değişiklik planı (build_reconciliation_plan) ve fiyat metni ayrıştırma testleri."""
+import pytest
+
+import run_automation as automation
+
+
+def combination(combination_id, text, price):
+    return {'combination_id': combination_id, 'text': text, 'price': price}
+
+
+def test_product_without_target_is_removed_and_cleared():
+    current_state = {'1': [combination('c1', "Beden: S", 99.9), combination('c2', "Beden: M", None)]}
+    plan = automation.build_reconciliation_plan(current_state, {})
+
+    assert plan['removals'] == ['1']
+    assert plan['bulk_remove'] is False
+    assert plan['clears'] == [{'product_id': '1', 'combination_id': 'c1', 'before': 99.9}]
+    assert plan['updates'] == [] and plan['unchanged'] == []
+
+
+def test_removal_does_not_retag_other_products():
+    current_state = {
+        '1': [combination('c1', "Beden: S", 99.9)],
+        '2': [combination('c2', "Beden: S", 50.0)],
+        '3': None,
+    }
+    plan = automation.build_reconciliation_plan(current_state, {'2': 50.0, '3': 70.0})
+
+    # İndirimden çıkan ürünün etiketi tek tek alınır; kategori toplu boşaltılmaz
+    assert plan['removals'] == ['1']
+    assert plan['bulk_remove'] is False
+    assert plan['unchanged'] == ['2']
+    assert [(update['product_id'], update['add_tags']) for update in plan['updates']] == [('3', True)]
+
+
+def test_unreadable_product_is_cleared_live_and_retagged():
+    plan = automation.build_reconciliation_plan({'1': None}, {'1': 120.0})
+
+    assert plan['clears'] == [{'product_id': '1', 'combination_id': None, 'before': None}]
+    assert plan['removals'] == []
+    assert plan['bulk_remove'] is False
+    assert plan['updates'] == [{
+        'product_id': '1', 'add_tags': True, 'set_price': True,
+        'combination_id': None, 'before': None, 'after': 120.0,
+    }]
+
+
+def test_already_correct_price_is_unchanged():
+    current_state = {'1': [combination('c1', "Beden: S", 149.99)]}
+    plan = automation.build_reconciliation_plan(current_state, {'1': 149.99})
+
+    assert plan['unchanged'] == ['1']
+    assert plan['clears'] == [] and plan['updates'] == []
+    assert plan['bulk_remove'] is False
+
+
+def test_price_on_wrong_combination_is_cleared():
+    current_state = {'1': [combination('c1', "Beden: M", 80.0), combination('c2', "Beden: S", 80.0)]}
+    plan = automation.build_reconciliation_plan(current_state, {'1': 90.0})
+
+    assert plan['clears'] == [{'product_id': '1', 'combination_id': 'c1', 'before': 80.0}]
+    assert plan['updates'] == [{
+        'product_id': '1', 'add_tags': False, 'set_price': True,
+        'combination_id': 'c2', 'before': 80.0, 'after': 90.0,
+    }]
+
+
+def test_new_target_product_gets_tags_and_price():
+    plan = automation.build_reconciliation_plan({}, {'2': 50.0})
+
+    assert plan['updates'] == [{
+        'product_id': '2', 'add_tags': True, 'set_price': True,
+        'combination_id': None, 'before': None, 'after': 50.0,
+    }]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("149,9900", 149.99),
+    ("1.249,99", 1249.99),
+    ("0", None),
+    ("null", None),
+    ("", None),
+    (None, None),
+    ("₺ 99,90", 99.9),
+    ("abc", None),
+])
+def test_parse_price_text(text, expected):
+    assert automation.parse_price_text(text) == expected
@@ -0,0 +1,34 @@
+"""
+reset komutu hedef fiyat kullanmaz; pandas/openpyxl yüklenmeden çalışmalıdır.
+Aynı süreçteki diğer testler pandas'ı yüklemiş olabileceği için ayrı süreçte çalıştırılır.
+"""
+import subprocess
+import sys
+
+from conftest import REPO_DIR
+
+RESET_SCRIPT = """
+import sys
+sys.path.insert(0, sys.argv[1])
+import run_automation as automation
+
+automation.setup_logging()
+automation.get_xml_product_ids = lambda: ['101', '102']
+automation.DriverManager.start = lambda self: True
+automation.DriverManager.maybe_recycle = lambda self: None
+automation.run_selenium_task = lambda manager, journal, task: True
+automation.bulk_edit_final_operations = lambda driver: True
+
+assert automation.run_reset_mode(), "reset başarısız"
+loaded = [name for name in ('pandas', 'numpy', 'openpyxl') if name in sys.modules]
+assert not loaded, f"reset sırasında yüklendi: {loaded}"
+"""
+
+
+def test_reset_does_not_load_pandas(tmp_path):
+    result = subprocess.run(
+        [sys.executable, "-c", RESET_SCRIPT, REPO_DIR],
+        cwd=tmp_path, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert (tmp_path / "sifirlama_plani.json").exists()
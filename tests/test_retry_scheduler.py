@@ -0,0 +1,55 @@
+"""RetryScheduler tekrar deneme ve dead-letter testleri."""
+import json
+
+import pytest
+
+import run_automation as automation
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    monkeypatch.setattr(automation, 'DEAD_LETTER_FILE', str(tmp_path / "dead.jsonl"))
+    return automation.RunJournal(filename=str(tmp_path / "journal.jsonl"))
+
+
+def task(product_id):
+    return {'operation': 'update', 'product_id': product_id, 'payload': {'product_id': product_id}}
+
+
+def test_transient_failure_is_retried(journal):
+    calls = []
+
+    def handler(task):
+        calls.append(task['product_id'])
+        return len(calls) > 1
+
+    scheduler = automation.RetryScheduler(journal, max_attempts=3, base_delay=0)
+    assert scheduler.run([task('1')], handler) == 1
+    assert calls == ['1', '1']
+    assert scheduler.dead_letters == []
+    assert journal.succeeded('update', '1')
+
+
+def test_exhausted_task_is_dead_lettered(journal):
+    def handler(task):
+        raise RuntimeError("zaman aşımı")
+
+    scheduler = automation.RetryScheduler(journal, max_attempts=3, base_delay=0)
+    assert scheduler.run([task('1')], handler) == 0
+
+    [entry] = scheduler.dead_letters
+    assert (entry['attempts'], entry['permanent'], entry['error']) == (3, False, "zaman aşımı")
+    assert automation.load_dead_letters(automation.DEAD_LETTER_FILE) == [json.loads(json.dumps(entry))]
+
+
+def test_permanent_error_is_not_retried(journal):
+    calls = []
+
+    def handler(task):
+        calls.append(task['product_id'])
+        raise automation.PermanentError("hedef kombinasyon yok")
+
+    scheduler = automation.RetryScheduler(journal, max_attempts=3, base_delay=0)
+    assert scheduler.run([task('1'), task('2')], handler) == 0
+    assert calls == ['1', '2']
+    assert [entry['permanent'] for entry in scheduler.dead_letters] == [True, True]
@@ -0,0 +1,129 @@
+"""
+Kural seti (RuleSet) testleri. Beklenen değerler satır satır çalışan eski kodun
+(filter_products, calculate_sisme_orani, filter_recent_dates, calculate_varyant_fiyati)
+aynı satırlardaki çıktısıdır; bilerek değiştirilen davranışlar ayrıca belirtilmiştir.
+"""
+import math
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+import run_automation as automation
+
+
+def values(series):
+    return [None if value is None or (isinstance(value, float) and math.isnan(value)) else value for value in series]
+
+
+def test_filter_products_matches_int_semantics():
+    products = pd.DataFrame({
+        automation.STOCK_COLUMN: ["a // b // c"] * 7 + ["a // b", "a//b//c"],
+        'SatistakiStokAdedi': ["25", " 30", "+26", "1_00", "30.0", "24", "abc", "30", "30"],
+        'UrununAktifBedenOrani': ["51"] * 9,
+    })
+    kept = automation.filter_products(products)
+    # int() boşluğu, işareti ve alt çizgiyi kabul eder; "30.0" ve "abc" elenir
+    assert kept['SatistakiStokAdedi'].tolist() == ["25", " 30", "+26", "1_00", "30"]
+
+
+@pytest.mark.parametrize("cell, expected", [
+    ("36 : 17 // 38 : 17 // 40 : 18 // 42 : 16 // 44 : 18 // 46 : 16", 0.0),
+    # Stoğu okunamayan referans atlanır, sıradaki referans beden kullanılır
+    ("S : abc // 36 : 20 // M : 10", 50.0),
+    ("S : abc // M : 10", None),
+    ("S : 1_0 // M : 10", 0.0),
+    (" S :  20 // M : 9 // L : 12", 40.0),
+    ("S : 0 // M : 10", None),
+    ("M : 10 // L : 20", None),
+    ("S : 20 // S : 10 // M : 15", 25.0),
+    ("S : 20 // garbage // M : 10", 50.0),
+    # Ortalama soldan sağa toplanır ve Python round ile yuvarlanır (yarım kuruş sınırı)
+    ("M : 36 // M : 56 // L : 50 // S : 24 // 38 : 35", -84.37),
+    (None, None),
+])
+def test_sisme_orani_matches_row_by_row(cell, expected):
+    df = automation.calculate_sisme_orani(pd.DataFrame({automation.STOCK_COLUMN: [cell]}))
+    assert values(df['SismeOrani']) == [expected]
+
+
+def test_sisme_orani_skips_part_with_extra_separator():
+    # Bilerek yapılan fark: eski kod bu parçada hata verip bütün kolonu boş bırakıyordu
+    df = automation.calculate_sisme_orani(pd.DataFrame({
+        automation.STOCK_COLUMN: ["S : 20 // M : 10 : 3 // L : 10", "S : 20 // M : 15"],
+    }))
+    assert values(df['SismeOrani']) == [50.0, 25.0]
+
+
+def test_filter_recent_dates_matches_row_by_row():
+    today = date.today()
+    window_start = today - timedelta(days=5)
+    rows = {
+        'iso': (today - timedelta(days=2)).isoformat() + "T10:00:00Z",
+        'plain': (today - timedelta(days=1)).isoformat(),
+        'boundary': window_start.isoformat(),
+        'unpadded': f"{today.year}-{today.month}-{today.day}",
+        'old': (window_start - timedelta(days=1)).isoformat(),
+        'bad_iso': (today - timedelta(days=2)).isoformat() + "Tgarbage",
+        'bad_hour': (today - timedelta(days=2)).isoformat() + "T25:00:00",
+        'text': "bilinmiyor",
+        'empty': None,
+        'number': 5,
+    }
+    df = pd.DataFrame({'key': list(rows), 'SatisaGirmeTarihi': list(rows.values())})
+    kept = automation.filter_recent_dates(df)
+    # Okunamayan ISO tarihler (bad_iso, bad_hour) eski koddaki gibi korunur
+    assert kept['key'].tolist() == ['old', 'bad_iso', 'bad_hour', 'text', 'empty', 'number']
+
+
+def test_varyant_fiyati_matches_row_by_row():
+    df = pd.DataFrame({
+        'GuncelSatisFiyati': ['149,90', 149.9, 104, '1_000', 'abc', None, 300, 50],
+        'SismeOrani': [70, 70.01, 39.99, 40, 55, 55, None, 100],
+    })
+    result = automation.calculate_varyant_fiyati(df)
+    assert values(result['VaryantFiyati']) == [109.99, 99.99, 99.99, 749.99, None, None, None, 34.99]
+
+
+def test_multipliers_first_matching_tier_wins():
+    rules = automation.RuleSet({'discount_tiers': [
+        {'min': 0, 'max': 50, 'multiplier': 0.9},
+        {'min': 40, 'multiplier': 0.5},
+        {'max': -20, 'multiplier': 0.8},
+    ]})
+    multipliers = rules.multipliers(pd.Series([45, 50, 60, -1, -30, float('nan')]))
+    assert multipliers.tolist() == [0.9, 0.9, 0.5, 1.0, 0.8, 1.0]
+
+
+def test_default_tiers_share_boundary():
+    assert automation.RuleSet().multipliers(pd.Series([39.99, 40, 70, 70.01])).tolist() == [1.0, 0.75, 0.75, 0.70]
+
+
+@pytest.mark.parametrize("config, message", [
+    ([], "nesne olmalı"),
+    ({'unknown': 1}, "Bilinmeyen kural"),
+    ({'product_filter': {'min_stok': 1}}, "product_filter: bilinmeyen"),
+    ({'product_filter': []}, "product_filter: nesne"),
+    ({'product_filter': {'min_stock': 2.5}}, "tam sayı"),
+    ({'product_filter': {'min_stock': -1}}, "en az 0"),
+    ({'product_filter': {'min_stock': True}}, "tam sayı"),
+    ({'name': ""}, "name"),
+    ({'inflation': {'reference_sizes': []}}, "reference_sizes"),
+    ({'inflation': {'min_ratio': "40"}}, "sayı olmalı"),
+    ({'launch_window_days': -1}, "launch_window_days"),
+    ({'discount_tiers': []}, "boş olmayan"),
+    ({'discount_tiers': [{'min': 40}]}, "'multiplier'"),
+    ({'discount_tiers': [{'multiplier': 0.5}]}, "'multiplier'"),
+    ({'discount_tiers': [{'min': 40, 'multiplier': 1.5}]}, "en fazla 1"),
+    ({'discount_tiers': [{'min': 40, 'step': 1, 'multiplier': 0.5}]}, "bilinmeyen"),
+    ({'discount_tiers': [{'min': 70, 'max': 40, 'multiplier': 0.5}]}, "büyük olamaz"),
+])
+def test_validate_rules_errors(config, message):
+    with pytest.raises(ValueError, match=message):
+        automation.validate_rules(config)
+
+
+def test_validate_rules_merges_defaults():
+    rules = automation.validate_rules({'product_filter': {'min_stock': 10}})
+    assert rules['product_filter'] == dict(automation.DEFAULT_RULES['product_filter'], min_stock=10)
+    assert rules['discount_tiers'] == automation.DEFAULT_RULES['discount_tiers']
@@ -0,0 +1,105 @@
+"""Önceki çalışma kaydı (snapshot) testleri."""
+import json
+import time
+
+import pytest
+
+import run_automation as automation
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return automation.RunJournal(filename=str(tmp_path / "journal.jsonl"))
+
+
+def entry(price, verified_ts=None, selected=True):
+    return {
+        'selected': selected, 'sisme_orani': None, 'varyant_fiyati': price,
+        'combination_id': 'c1', 'combination_text': "Beden: S",
+        'verified_ts': time.time() if verified_ts is None else verified_ts,
+    }
+
+
+def plan(**parts):
+    return dict({'run_id': 'r1', 'clears': [], 'removals': [], 'bulk_remove': False, 'updates': [], 'unchanged': []}, **parts)
+
+
+def update(product_id, after):
+    return {'product_id': product_id, 'add_tags': False, 'set_price': True,
+            'combination_id': 'c1', 'before': None, 'after': after}
+
+
+def write_snapshot(path, products):
+    path.write_text(json.dumps({'saved_ts': time.time(), 'products': products}), encoding="utf-8")
+
+
+def test_snapshot_delta():
+    snapshot = {'1': entry(10.0), '2': entry(20.0), '3': entry(30.0), '4': entry(None, selected=False)}
+    delta = automation.snapshot_delta(snapshot, {'1': 10.0, '2': 25.0, '4': 40.0, '5': 50.0})
+
+    assert delta == {'new': ['4', '5'], 'changed': ['2'], 'dropped': ['3'], 'same': ['1']}
+
+
+def test_current_state_from_snapshot_sends_stale_and_unknown_to_missing():
+    stale = time.time() - 10 * 3600
+    snapshot = {
+        '1': entry(10.0),
+        '2': entry(20.0, verified_ts=stale),
+        '3': entry(None, selected=False),
+        '4': dict(entry(40.0), combination_id=None),
+        '5': {k: v for k, v in entry(50.0).items() if k != 'verified_ts'},
+    }
+    current_state, missing = automation.current_state_from_snapshot(
+        ['1', '2', '3', '4', '5', '6'], snapshot, max_age_hours=5)
+
+    assert current_state == {'1': [{'text': "Beden: S", 'combination_id': 'c1', 'price': 10.0}]}
+    assert missing == ['2', '3', '4', '5', '6']
+
+
+def test_save_snapshot_keeps_only_confirmed_results(journal, tmp_path):
+    filename = tmp_path / "snapshot.json"
+    old = time.time() - 3600
+    write_snapshot(filename, {'3': entry(30.0, verified_ts=old), '4': entry(40.0, verified_ts=old)})
+
+    journal.record('update', '1', 'ok')
+    journal.record('update', '2', 'error')
+    journal.record('clear_product', '5', 'ok')
+    journal.record('clear_product', '6', 'error')
+    for product_id in ('5', '6', '7'):
+        journal.record('untag', product_id, 'ok')
+    journal.record('untag', '8', 'error')
+    journal.record('read', '4', 'ok')
+    automation.save_snapshot(plan(
+        updates=[update('1', 10.0), update('2', 20.0)],
+        unchanged=['3', '4'],
+        clears=[{'product_id': '5', 'combination_id': 'c9', 'before': 5.0},
+                {'product_id': '6', 'combination_id': 'c9', 'before': 6.0}],
+        removals=['5', '6', '7', '8'],
+    ), journal, {'4': [{'combination_id': 'c1', 'text': "Beden: S", 'price': 40.0}]}, filename=str(filename))
+
+    products = json.loads(filename.read_text(encoding="utf-8"))['products']
+    # Başarısız güncelleme (2), silinemeyen fiyat (6) ve etiketi alınamayan ürün (8) kayda girmez
+    assert sorted(products) == ['1', '3', '4', '5', '7']
+    assert products['1']['varyant_fiyati'] == 10.0 and products['1']['selected']
+    assert not products['5']['selected'] and not products['7']['selected']
+    # Önceki kayıttan taşınan ürünün doğrulama zamanı değişmez, canlı okunanınki yenilenir
+    assert products['3']['verified_ts'] == old
+    assert products['4']['verified_ts'] > old
+
+
+@pytest.mark.parametrize("outcome, saved", [('ok', ['1']), ('error', [])])
+def test_save_snapshot_reset_removals_follow_bulk_remove(journal, tmp_path, outcome, saved):
+    filename = tmp_path / "snapshot.json"
+    journal.record('bulk_remove', 'bulk', outcome)
+    automation.save_snapshot(plan(removals=['1'], bulk_remove=True), journal, filename=str(filename))
+
+    assert list(json.loads(filename.read_text(encoding="utf-8"))['products']) == saved
+
+
+def test_invalidate_snapshot(tmp_path):
+    filename = tmp_path / "snapshot.json"
+    write_snapshot(filename, {'1': entry(10.0), '2': entry(20.0), '3': entry(30.0)})
+    automation.invalidate_snapshot(['1', '3', '9'], filename=str(filename))
+
+    assert list(json.loads(filename.read_text(encoding="utf-8"))['products']) == ['2']
@@ -0,0 +1,21 @@
+"""Aşama önbelleği anahtarı ve önbelleğe alınabilirlik testleri."""
+import pytest
+
+import run_automation as automation
+
+
+def stage(name):
+    return next(stage for stage in automation.build_stages() if stage['name'] == name)
+
+
+@pytest.mark.parametrize("url, key, cacheable", [
+    ("https://example.supabase.co", "anahtar", False),
+    ("", "", True),
+])
+def test_merge_is_cached_only_without_supabase(monkeypatch, url, key, cacheable):
+    monkeypatch.setenv("SUPABASE_URL", url)
+    monkeypatch.setenv("SUPABASE_KEY", key)
+
+    # Satışa giriş tarihleri adımın içinde canlı sorgulanır; eski önbellek dosyası anahtara girmez
+    assert stage('merge')['cacheable'] is cacheable
+    assert 'launch_dates' not in stage('merge')['inputs']()